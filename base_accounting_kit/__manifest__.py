@@ -60,6 +60,8 @@
         'data/followup_levels.xml',
         'data/account_asset_data.xml',
         'data/recurring_entry_cron.xml',
+        'data/account_dashboard_cron.xml',
+        'data/account_reconcile_job_cron.xml',
         'data/multiple_invoice_data.xml',
         'views/assets.xml',
         'views/dashboard_views.xml',
@@ -71,6 +73,7 @@
         'views/account_payment_view.xml',
         'views/res_config_view.xml',
         'views/recurring_payments_view.xml',
+        'views/account_report_profile_views.xml',
         'views/account_followup.xml',
         'views/followup_report.xml',
         'wizard/asset_depreciation_confirmation_wizard_views.xml',
@@ -80,6 +83,7 @@
         'views/account_asset_templates.xml',
         'views/product_template_views.xml',
         'views/payment_matching.xml',
+        'views/account_reconcile_job_views.xml',
         'views/multiple_invoice_layout_view.xml',
         'views/multiple_invoice_form.xml',
         'wizard/financial_report.xml',
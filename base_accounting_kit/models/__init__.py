@@ -32,7 +32,14 @@ from . import product_template
 from . import recurring_payments
 from . import res_config_settings
 from . import res_partner
+from . import account_report_profile
+from . import account_dashboard_cache
 from . import account_dashboard
+from . import account_dashboard_rollup
+from . import account_dashboard_snapshot
+from . import account_dashboard_unreconciled
+from . import account_statement_partner
 from . import payment_matching
+from . import account_reconcile_job
 from . import multiple_invoice
 from . import multiple_invoice_layout
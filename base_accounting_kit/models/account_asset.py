@@ -225,6 +225,7 @@ class AccountAssetAsset(models.Model):
     @api.model
     def _cron_generate_entries(self):
         self.compute_generated_entries(datetime.today())
+        self.env['account.dashboard.snapshot']._trigger_prewarm()
 
     @api.model
     def compute_generated_entries(self, date, asset_type=None):
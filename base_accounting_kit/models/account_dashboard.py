@@ -6,18 +6,31 @@ from datetime import datetime
 
 from dateutil.relativedelta import relativedelta
 
-from odoo import models, api
+from odoo import models, api, fields, tools
 from odoo.http import request
 
+from .account_dashboard_cache import cached_dashboard
+from .account_report_profile import profiled
+
 
 class DashBoard(models.Model):
     _inherit = 'account.move'
 
+    def init(self):
+        super(DashBoard, self).init()
+        # dashboard queries filter on a company set and a date range
+        tools.create_index(self._cr, 'account_move_line_company_id_date_idx',
+                           'account_move_line', ['company_id', 'date'])
+        tools.create_index(self._cr, 'account_move_company_id_move_type_invoice_date_idx',
+                           'account_move', ['company_id', 'move_type', 'invoice_date'])
+
     # function to getting expenses
 
     # function to getting income of this year
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_income_this_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -34,21 +47,21 @@ class DashBoard(models.Model):
         else:
             states_arg = """ parent_state = 'posted'"""
 
-        self._cr.execute(('''select sum(debit)-sum(credit) as income ,to_char(account_move_line.date, 'Month')  as month ,
-                             internal_group from account_move_line ,account_account where 
-                             account_move_line.account_id=account_account.id AND internal_group = 'income' 
-                             AND to_char(DATE(NOW()), 'YY') = to_char(account_move_line.date, 'YY')
-                             AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
+        self._cr.execute(('''select sum(debit)-sum(credit) as income ,to_char(account_dashboard_rollup.date, 'Month')  as month ,
+                             internal_group from account_dashboard_rollup where 
+                             internal_group = 'income' 
+                             AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_year') + '''
+                             AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + '''
                              AND %s 
                              group by internal_group,month                  
                         ''') % (states_arg))
         record = self._cr.dictfetchall()
 
-        self._cr.execute(('''select sum(debit)-sum(credit) as expense ,to_char(account_move_line.date, 'Month')  as month ,
-                            internal_group from account_move_line ,account_account where 
-                            account_move_line.account_id=account_account.id AND internal_group = 'expense' 
-                            AND to_char(DATE(NOW()), 'YY') = to_char(account_move_line.date, 'YY')
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
+        self._cr.execute(('''select sum(debit)-sum(credit) as expense ,to_char(account_dashboard_rollup.date, 'Month')  as month ,
+                            internal_group from account_dashboard_rollup where 
+                            internal_group = 'expense' 
+                            AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_year') + '''
+                            AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + '''
                             AND %s 
                             group by internal_group,month                  
                         ''') % (states_arg))
@@ -115,6 +128,8 @@ class DashBoard(models.Model):
     # function to getting income of last year
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_income_last_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -131,21 +146,20 @@ class DashBoard(models.Model):
         else:
             states_arg = """ parent_state = 'posted'"""
 
-        self._cr.execute(('''select sum(debit)-sum(credit) as income ,to_char(account_move_line.date, 'Month')  as month ,
-                            internal_group from account_move_line ,account_account
-                            where account_move_line.account_id=account_account.id AND internal_group = 'income' 
-                            AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW())) -1 
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
+        self._cr.execute(('''select sum(debit)-sum(credit) as income ,to_char(account_dashboard_rollup.date, 'Month')  as month ,
+                            internal_group from account_dashboard_rollup where internal_group = 'income' 
+                            AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'last_year') + ''' 
+                            AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + '''
                             AND %s
                             group by internal_group,month                  
                  ''') % (states_arg))
         record = self._cr.dictfetchall()
 
-        self._cr.execute(('''select sum(debit)-sum(credit) as expense ,to_char(account_move_line.date, 'Month')  as month ,
-                            internal_group from account_move_line , account_account where 
-                            account_move_line.account_id=account_account.id AND internal_group = 'expense' 
-                            AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW())) -1 
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
+        self._cr.execute(('''select sum(debit)-sum(credit) as expense ,to_char(account_dashboard_rollup.date, 'Month')  as month ,
+                            internal_group from account_dashboard_rollup where 
+                            internal_group = 'expense' 
+                            AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'last_year') + ''' 
+                            AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + '''
                             AND %s 
                             group by internal_group,month                  
                          ''') % (states_arg))
@@ -212,6 +226,8 @@ class DashBoard(models.Model):
     # function to getting income of last month
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_income_last_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -225,7 +241,6 @@ class DashBoard(models.Model):
         for x in range(1, day + 1):
             day_list.append(x)
 
-        one_month_ago = (datetime.now() - relativedelta(months=1)).month
 
         states_arg = ""
         if post != ('posted',):
@@ -233,23 +248,23 @@ class DashBoard(models.Model):
         else:
             states_arg = """ parent_state = 'posted'"""
 
-        self._cr.execute(('''select sum(debit)-sum(credit) as income ,cast(to_char(account_move_line.date, 'DD')as int)
-                            as date , internal_group from account_move_line , account_account where   
-                            Extract(month FROM account_move_line.date) in ''' + str(tuple(company_id)) + ''' 
+        self._cr.execute(('''select sum(debit)-sum(credit) as income ,cast(to_char(account_dashboard_rollup.date, 'DD')as int)
+                            as date , internal_group from account_dashboard_rollup where   
+                            ''' + self._get_period_clause('account_dashboard_rollup.date', 'last_month') + ''' 
                             AND %s
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + ''' 
-                            AND account_move_line.account_id=account_account.id AND internal_group='income'   
+                            AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + ''' 
+                            AND internal_group='income'   
                             group by internal_group,date                 
                              ''') % (states_arg))
 
         record = self._cr.dictfetchall()
 
-        self._cr.execute(('''select sum(debit)-sum(credit) as expense ,cast(to_char(account_move_line.date, 'DD')as int)
-                            as date ,internal_group from account_move_line ,account_account where  
-                            Extract(month FROM account_move_line.date) in ''' + str(tuple(company_id)) + ''' 
+        self._cr.execute(('''select sum(debit)-sum(credit) as expense ,cast(to_char(account_dashboard_rollup.date, 'DD')as int)
+                            as date ,internal_group from account_dashboard_rollup where  
+                            ''' + self._get_period_clause('account_dashboard_rollup.date', 'last_month') + ''' 
                             AND %s
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + ''' 
-                            AND account_move_line.account_id=account_account.id AND internal_group='expense'
+                            AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + ''' 
+                            AND internal_group='expense'
                             group by internal_group,date                 
                                  ''') % (states_arg))
         result = self._cr.dictfetchall()
@@ -315,6 +330,8 @@ class DashBoard(models.Model):
     # function to getting income of this month
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_income_this_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -331,25 +348,22 @@ class DashBoard(models.Model):
         for x in range(1, day + 1):
             day_list.append(x)
 
-        self._cr.execute(('''select sum(debit)-sum(credit) as income ,cast(to_char(account_move_line.date, 'DD')as int)
-                            as date , internal_group from account_move_line , account_account
-                            where   Extract(month FROM account_move_line.date) = Extract(month FROM DATE(NOW()))  
-                            AND Extract(YEAR FROM account_move_line.date) = Extract(YEAR FROM DATE(NOW()))  
+        self._cr.execute(('''select sum(debit)-sum(credit) as income ,cast(to_char(account_dashboard_rollup.date, 'DD')as int)
+                            as date , internal_group from account_dashboard_rollup where   ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_month') + '''  
                             AND %s
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + ''' 
-                            AND account_move_line.account_id=account_account.id AND internal_group='income'
+                            AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + ''' 
+                            AND internal_group='income'
                             group by internal_group,date                 
                         ''') % (states_arg))
 
         record = self._cr.dictfetchall()
 
-        self._cr.execute(('''select sum(debit)-sum(credit) as expense ,cast(to_char(account_move_line.date, 'DD')as int)
-                            as date , internal_group from account_move_line , account_account where  
-                            Extract(month FROM account_move_line.date) = Extract(month FROM DATE(NOW()))  
-                            AND Extract(YEAR FROM account_move_line.date) = Extract(YEAR FROM DATE(NOW()))  
+        self._cr.execute(('''select sum(debit)-sum(credit) as expense ,cast(to_char(account_dashboard_rollup.date, 'DD')as int)
+                            as date , internal_group from account_dashboard_rollup where  
+                            ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_month') + '''  
                             AND %s
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + ''' 
-                            AND account_move_line.account_id=account_account.id AND internal_group='expense'
+                            AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + ''' 
+                            AND internal_group='expense'
                             group by internal_group,date                 
                          ''') % (states_arg))
         result = self._cr.dictfetchall()
@@ -415,6 +429,8 @@ class DashBoard(models.Model):
     # function to getting late bills
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_latebills(self, *post):
 
         company_id = self.get_current_company_value()
@@ -464,6 +480,8 @@ class DashBoard(models.Model):
     # function to getting over dues
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_overdues(self, *post):
 
         company_id = self.get_current_company_value()
@@ -508,6 +526,8 @@ class DashBoard(models.Model):
         return records
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_overdues_this_month_and_year(self, *post):
 
         states_arg = ""
@@ -524,8 +544,7 @@ class DashBoard(models.Model):
                                AND account_move.move_type = 'out_invoice'
                                AND payment_state = 'not_paid'
                                AND %s 
-                               AND Extract(month FROM account_move.invoice_date_due) = Extract(month FROM DATE(NOW()))
-                               AND Extract(YEAR FROM account_move.invoice_date_due) = Extract(YEAR FROM DATE(NOW()))
+                               AND ''' + self._get_period_clause('account_move.invoice_date_due', 'this_month') + '''
                                AND account_move.partner_id = res_partner.commercial_partner_id
                                AND account_move.company_id in ''' + str(tuple(company_id)) + '''
                                group by parent, due_partner, month
@@ -536,7 +555,7 @@ class DashBoard(models.Model):
                                             AND account_move.move_type = 'out_invoice'
                                             AND payment_state = 'not_paid'
                                             AND %s
-                                            AND Extract(YEAR FROM account_move.invoice_date_due) = Extract(YEAR FROM DATE(NOW()))
+                                            AND ''' + self._get_period_clause('account_move.invoice_date_due', 'this_year') + '''
                                             AND account_move.partner_id = res_partner.commercial_partner_id
                                             AND account_move.company_id in ''' + str(tuple(company_id)) + '''
     
@@ -565,6 +584,8 @@ class DashBoard(models.Model):
         return records
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_latebillss(self, *post):
         company_id = self.get_current_company_value()
 
@@ -583,8 +604,7 @@ class DashBoard(models.Model):
                                 AND account_move.move_type = 'in_invoice'
                                 AND payment_state = 'not_paid'
                                 AND %s 
-                                AND Extract(month FROM account_move.invoice_date_due) = Extract(month FROM DATE(NOW()))
-                                AND Extract(YEAR FROM account_move.invoice_date_due) = Extract(YEAR FROM DATE(NOW()))
+                                AND ''' + self._get_period_clause('account_move.invoice_date_due', 'this_month') + '''
                                 AND account_move.company_id in ''' + str(tuple(company_id)) + '''
                                 AND account_move.partner_id = res_partner.commercial_partner_id
                                 group by parent, bill_partner, month
@@ -595,7 +615,7 @@ class DashBoard(models.Model):
                                             AND account_move.move_type = 'in_invoice'
                                             AND payment_state = 'not_paid'
                                             AND %s
-                                            AND Extract(YEAR FROM account_move.invoice_date_due) = Extract(YEAR FROM DATE(NOW()))
+                                            AND ''' + self._get_period_clause('account_move.invoice_date_due', 'this_year') + '''
                                             AND account_move.partner_id = res_partner.commercial_partner_id
                                             AND account_move.company_id in ''' + str(tuple(company_id)) + '''
                                             group by parent, bill_partner
@@ -624,87 +644,63 @@ class DashBoard(models.Model):
         return records
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_top_10_customers_month(self, *post):
-        record_invoice = {}
-        record_refund = {}
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post[0] != 'posted':
-            states_arg = """ account_move.state in ('posted', 'draft')"""
-        else:
-            states_arg = """ account_move.state = 'posted'"""
-        if post[1] == 'this_month':
-            self._cr.execute((''' select res_partner.name as customers, account_move.commercial_partner_id as parent, 
-                                    sum(account_move.amount_total) as amount from account_move, res_partner
-                                    where account_move.commercial_partner_id = res_partner.id
-                                    AND account_move.company_id in %s 
-                                    AND account_move.move_type = 'out_invoice' 
-                                    AND %s   
-                                    AND Extract(month FROM account_move.invoice_date) = Extract(month FROM DATE(NOW()))
-                                    AND Extract(YEAR FROM account_move.invoice_date) = Extract(YEAR FROM DATE(NOW()))                      
-                                    group by parent, customers
-                                    order by amount desc 
-                                    limit 10
-                                    ''') % (tuple(company_id), states_arg))
-            record_invoice = self._cr.dictfetchall()
-            self._cr.execute((''' select res_partner.name as customers, account_move.commercial_partner_id as parent, 
-                                    sum(account_move.amount_total) as amount from account_move, res_partner
-                                    where account_move.commercial_partner_id = res_partner.id
-                                    AND account_move.company_id in %s
-                                    AND account_move.move_type = 'out_refund' 
-                                    AND %s      
-                                    AND Extract(month FROM account_move.invoice_date) = Extract(month FROM DATE(NOW()))
-                                    AND Extract(YEAR FROM account_move.invoice_date) = Extract(YEAR FROM DATE(NOW()))                   
-                                    group by parent, customers
-                                    order by amount desc 
-                                    limit 10
-                                    ''') % (tuple(company_id), states_arg))
-            record_refund = self._cr.dictfetchall()
-        else:
-            one_month_ago = (datetime.now() - relativedelta(months=1)).month
-            self._cr.execute((''' select res_partner.name as customers, account_move.commercial_partner_id as parent, 
-                                            sum(account_move.amount_total) as amount from account_move, res_partner
-                                            where account_move.commercial_partner_id = res_partner.id
-                                            AND account_move.company_id in %s
-                                            AND account_move.move_type = 'out_invoice' 
-                                            AND %s            
-                                            AND Extract(month FROM account_move.invoice_date) = ''' + str(
-                one_month_ago) + '''
-                                            group by parent, customers
-                                            order by amount desc 
-                                            limit 10
-                                            ''') % (tuple(company_id), states_arg))
-            record_invoice = self._cr.dictfetchall()
-            self._cr.execute((''' select res_partner.name as customers, account_move.commercial_partner_id as parent, 
-                                            sum(account_move.amount_total) as amount from account_move, res_partner
-                                            where account_move.commercial_partner_id = res_partner.id
-                                            AND account_move.company_id in %s 
-                                            AND account_move.move_type = 'out_refund' 
-                                            AND %s       
-                                            AND Extract(month FROM account_move.invoice_date) = ''' + str(
-                one_month_ago) + '''                  
-                                            group by parent, customers
-                                            order by amount desc 
-                                            limit 10
-                                            ''') % (tuple(company_id), states_arg))
-            record_refund = self._cr.dictfetchall()
-        summed = []
-        for out_sum in record_invoice:
-            parent = out_sum['parent']
-            su = out_sum['amount'] - \
-                 (list(filter(lambda refund: refund['parent'] == out_sum['parent'], record_refund))[0][
-                      'amount'] if len(
-                     list(filter(lambda refund: refund['parent'] == out_sum['parent'], record_refund))) > 0 else 0.0)
-            summed.append({
-                'customers': out_sum['customers'],
-                'amount': su,
-                'parent': parent
-            })
-        return summed
+        period = 'this_month' if post[1] == 'this_month' else 'last_month'
+        return self.get_top_customers(10, period, post[0] == 'posted')
+
+    @api.model
+    @profiled
+    def get_top_customers(self, limit=10, period='this_month', posted=False,
+                          company_ids=None):
+        """ Rank the commercial partners by their net revenue of the period,
+        customer invoices minus customer refunds, in company currency.
+
+        :param limit: number of customers to return
+        :param period: one of the periods of ``_get_period_range``
+        :param posted: only count posted moves instead of posted and draft
+        :param company_ids: companies to rank, the dashboard ones by default
+        :return: list of dicts with the keys customers, parent and amount
+        """
+        date_from, date_to = self._get_period_range(period)
+        # the signed total of a refund is negative, so both sums add up
+        self._cr.execute("""
+            SELECT p.name AS customers, ranked.parent, ranked.amount
+            FROM (
+                SELECT m.commercial_partner_id AS parent,
+                       COALESCE(SUM(m.amount_total_signed)
+                                FILTER (WHERE m.move_type = 'out_invoice'), 0)
+                       + COALESCE(SUM(m.amount_total_signed)
+                                  FILTER (WHERE m.move_type = 'out_refund'), 0)
+                       AS amount
+                FROM account_move m
+                WHERE m.company_id IN %(company_ids)s
+                  AND m.move_type IN ('out_invoice', 'out_refund')
+                  AND m.state IN %(states)s
+                  AND m.invoice_date >= %(date_from)s
+                  AND m.invoice_date < %(date_to)s
+                  AND m.commercial_partner_id IS NOT NULL
+                GROUP BY m.commercial_partner_id
+                ORDER BY amount DESC
+                LIMIT %(limit)s
+            ) ranked
+            JOIN res_partner p ON p.id = ranked.parent
+            ORDER BY ranked.amount DESC, p.name
+        """, {
+            'company_ids': tuple(company_ids or self.get_current_company_value()),
+            'states': ('posted',) if posted else ('posted', 'draft'),
+            'date_from': date_from,
+            'date_to': date_to,
+            'limit': limit,
+        })
+        return self._cr.dictfetchall()
 
     # function to get total invoice
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_total_invoice(self, *post):
 
         company_id = self.get_current_company_value()
@@ -743,6 +739,8 @@ class DashBoard(models.Model):
         return customer_invoice, credit_note, supplier_invoice, refund
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_total_invoice_current_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -755,14 +753,14 @@ class DashBoard(models.Model):
 
         self._cr.execute(('''select sum(amount_total_signed) as customer_invoice from account_move where move_type ='out_invoice'
                             AND   %s                               
-                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))     
+                            AND ''' + self._get_period_clause('account_move.date', 'this_year') + '''     
                             AND account_move.company_id in ''' + str(tuple(company_id)) + '''           
                         ''') % (states_arg))
         record_customer_current_year = self._cr.dictfetchall()
 
         self._cr.execute(('''select sum(-(amount_total_signed)) as supplier_invoice from account_move where move_type ='in_invoice'
                             AND  %s                              
-                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))     
+                            AND ''' + self._get_period_clause('account_move.date', 'this_year') + '''     
                             AND account_move.company_id in ''' + str(tuple(company_id)) + '''      
                         ''') % (states_arg))
         record_supplier_current_year = self._cr.dictfetchall()
@@ -771,7 +769,7 @@ class DashBoard(models.Model):
         self._cr.execute(('''select sum(amount_total_signed) - sum(amount_residual_signed)  as customer_invoice_paid from account_move where move_type ='out_invoice'
                                     AND   %s
                                     AND payment_state = 'paid'
-                                    AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))
+                                    AND ''' + self._get_period_clause('account_move.date', 'this_year') + '''
                                     AND account_move.company_id in ''' + str(tuple(company_id)) + '''
                                 ''') % (states_arg))
         record_paid_customer_invoice_current_year = self._cr.dictfetchall()
@@ -779,7 +777,7 @@ class DashBoard(models.Model):
         self._cr.execute(('''select sum(-(amount_total_signed)) - sum(-(amount_residual_signed))  as supplier_invoice_paid from account_move where move_type ='in_invoice'
                                     AND   %s
                                     AND  payment_state = 'paid'
-                                    AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))
+                                    AND ''' + self._get_period_clause('account_move.date', 'this_year') + '''
                                     AND account_move.company_id in ''' + str(tuple(company_id)) + '''
                                 ''') % (states_arg))
         result_paid_supplier_invoice_current_year = self._cr.dictfetchall()
@@ -804,6 +802,8 @@ class DashBoard(models.Model):
         return customer_invoice_current_year, credit_note_current_year, supplier_invoice_current_year, refund_current_year, paid_customer_invoice_current_year, paid_supplier_invoice_current_year, paid_customer_credit_current_year, paid_supplier_refund_current_year
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_total_invoice_current_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -816,16 +816,14 @@ class DashBoard(models.Model):
 
         self._cr.execute(('''select sum(amount_total_signed) as customer_invoice from account_move where move_type ='out_invoice'
                                     AND   %s                               
-                                    AND Extract(month FROM account_move.date) = Extract(month FROM DATE(NOW()))
-                                    AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))     
+                                    AND ''' + self._get_period_clause('account_move.date', 'this_month') + '''     
                                     AND account_move.company_id in ''' + str(tuple(company_id)) + '''           
                                 ''') % (states_arg))
         record_customer_current_month = self._cr.dictfetchall()
 
         self._cr.execute(('''select sum(-(amount_total_signed)) as supplier_invoice from account_move where move_type ='in_invoice'
                                     AND  %s                              
-                                    AND Extract(month FROM account_move.date) = Extract(month FROM DATE(NOW()))
-                                    AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))     
+                                    AND ''' + self._get_period_clause('account_move.date', 'this_month') + '''     
                                     AND account_move.company_id in ''' + str(tuple(company_id)) + '''      
                                 ''') % (states_arg))
         record_supplier_current_month = self._cr.dictfetchall()
@@ -834,8 +832,7 @@ class DashBoard(models.Model):
         self._cr.execute(('''select sum(amount_total_signed) - sum(amount_residual_signed)  as customer_invoice_paid from account_move where move_type ='out_invoice'
                                             AND   %s
                                             AND payment_state = 'paid'
-                                            AND Extract(month FROM account_move.date) = Extract(month FROM DATE(NOW()))
-                                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))
+                                            AND ''' + self._get_period_clause('account_move.date', 'this_month') + '''
                                             AND account_move.company_id in ''' + str(tuple(company_id)) + '''
                                         ''') % (states_arg))
         record_paid_customer_invoice_current_month = self._cr.dictfetchall()
@@ -843,8 +840,7 @@ class DashBoard(models.Model):
         self._cr.execute(('''select sum(-(amount_total_signed)) - sum(-(amount_residual_signed))  as supplier_invoice_paid from account_move where move_type ='in_invoice'
                                             AND   %s
                                             AND payment_state = 'paid'
-                                            AND Extract(month FROM account_move.date) = Extract(month FROM DATE(NOW()))
-                                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))
+                                            AND ''' + self._get_period_clause('account_move.date', 'this_month') + '''
                                             AND account_move.company_id in ''' + str(tuple(company_id)) + '''
                                         ''') % (states_arg))
         result_paid_supplier_invoice_current_month = self._cr.dictfetchall()
@@ -869,6 +865,8 @@ class DashBoard(models.Model):
         return customer_invoice_current_month, credit_note_current_month, supplier_invoice_current_month, refund_current_month, paid_customer_invoice_current_month, paid_supplier_invoice_current_month, paid_customer_credit_current_month, paid_supplier_refund_current_month, currency
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_total_invoice_this_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -881,8 +879,7 @@ class DashBoard(models.Model):
 
         self._cr.execute(('''select sum(amount_total) from account_move where move_type = 'out_invoice' 
                             AND %s
-                            AND Extract(month FROM account_move.date) = Extract(month FROM DATE(NOW()))      
-                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))   
+                            AND ''' + self._get_period_clause('account_move.date', 'this_month') + '''   
                             AND account_move.company_id in ''' + str(tuple(company_id)) + '''
                             ''') % (states_arg))
         record = self._cr.dictfetchall()
@@ -891,13 +888,13 @@ class DashBoard(models.Model):
     # function to get total invoice last month
 
     @api.model
+    @profiled
     def get_total_invoice_last_month(self):
 
-        one_month_ago = (datetime.now() - relativedelta(months=1)).month
 
         self._cr.execute('''select sum(amount_total) from account_move where move_type = 'out_invoice' AND
                                account_move.state = 'posted'
-                            AND Extract(month FROM account_move.date) = ''' + str(one_month_ago) + ''' 
+                            AND ''' + self._get_period_clause('account_move.date', 'last_month') + ''' 
                             ''')
         record = self._cr.dictfetchall()
         return record
@@ -905,11 +902,12 @@ class DashBoard(models.Model):
     # function to get total invoice last year
 
     @api.model
+    @profiled
     def get_total_invoice_last_year(self):
 
         self._cr.execute(''' select sum(amount_total) from account_move where move_type = 'out_invoice' 
                             AND account_move.state = 'posted'
-                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW())) - 1    
+                            AND ''' + self._get_period_clause('account_move.date', 'last_year') + '''    
                                 ''')
         record = self._cr.dictfetchall()
         return record
@@ -917,12 +915,14 @@ class DashBoard(models.Model):
     # function to get total invoice this year
 
     @api.model
+    @profiled
+    @cached_dashboard
     def get_total_invoice_this_year(self):
 
         company_id = self.get_current_company_value()
 
         self._cr.execute(''' select sum(amount_total) from account_move where move_type = 'out_invoice'
-                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW())) AND
+                            AND ''' + self._get_period_clause('account_move.date', 'this_year') + ''' AND
                                account_move.state = 'posted'   AND
                                 account_move.company_id in ''' + str(tuple(company_id)) + '''
                                     ''')
@@ -932,406 +932,208 @@ class DashBoard(models.Model):
     # function to get unreconcile items
 
     @api.model
+    @profiled
     def unreconcile_items(self):
         self._cr.execute('''
-                            select count(*) FROM account_move_line l,account_account a
-                            where L.account_id=a.id AND l.full_reconcile_id IS NULL AND 
-                            l.balance != 0 AND a.reconcile IS TRUE ''')
+            SELECT COUNT(*) AS count FROM account_move_line l
+            WHERE l.full_reconcile_id IS NULL AND l.account_reconcile
+            AND l.balance != 0
+        ''')
         record = self._cr.dictfetchall()
         return record
 
     # function to get unreconcile items this month
 
     @api.model
+    @profiled
+    @cached_dashboard
     def unreconcile_items_this_month(self, *post):
-        company_id = self.get_current_company_value()
-
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
-
-        qry = ''' select count(*) FROM account_move_line l,account_account a
-                              where Extract(month FROM l.date) = Extract(month FROM DATE(NOW())) AND
-                              Extract(YEAR FROM l.date) = Extract(YEAR FROM DATE(NOW())) AND
-                              L.account_id=a.id AND l.full_reconcile_id IS NULL AND 
-                              l.balance != 0 AND a.reconcile IS F 
-                              AND l.''' + states_arg + '''
-                              AND  l.company_id in ''' + str(tuple(company_id)) + '''                              
-                               '''
-
-        self._cr.execute((''' select count(*) FROM account_move_line l,account_account a
-                              where Extract(month FROM l.date) = Extract(month FROM DATE(NOW())) AND
-                              Extract(YEAR FROM l.date) = Extract(YEAR FROM DATE(NOW())) AND
-                              L.account_id=a.id AND l.full_reconcile_id IS NULL AND 
-                              l.balance != 0 AND a.reconcile IS TRUE 
-                              AND l.%s
-                              AND  l.company_id in ''' + str(tuple(company_id)) + '''                              
-                               ''') % (states_arg))
-        record = self._cr.dictfetchall()
-        return record
+        return self._get_unreconciled_count(
+            'this_month', post, self.get_current_company_value())
 
     # function to get unreconcile items last month
 
     @api.model
+    @profiled
     def unreconcile_items_last_month(self):
-
-        one_month_ago = (datetime.now() - relativedelta(months=1)).month
-
-        self._cr.execute('''  select count(*) FROM account_move_line l,account_account a 
-                              where Extract(month FROM l.date) = ''' + str(one_month_ago) + ''' AND
-                              L.account_id=a.id AND l.full_reconcile_id IS NULL AND l.balance != 0 AND a.reconcile IS TRUE 
-                         ''')
-        record = self._cr.dictfetchall()
-        return record
+        return self._get_unreconciled_count('last_month')
 
     # function to get unreconcile items this year
 
     @api.model
+    @profiled
+    @cached_dashboard
     def unreconcile_items_this_year(self, *post):
-        company_id = self.get_current_company_value()
-
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
+        return self._get_unreconciled_count(
+            'this_year', post, self.get_current_company_value())
 
-        self._cr.execute(('''  select count(*) FROM account_move_line l,account_account a
-                                  where Extract(year FROM l.date) = Extract(year FROM DATE(NOW())) AND
-                                  l.account_id=a.id AND l.full_reconcile_id IS NULL AND 
-                                  l.balance != 0 AND a.reconcile IS TRUE  
-                                  AND l.%s
-                                  AND  l.company_id in ''' + str(tuple(company_id)) + '''       
-                                  ''') % (states_arg))
+    @api.model
+    def _get_unreconciled_count(self, period, post=None, company_ids=None):
+        """ Count the open items of reconcilable accounts of the period. The
+        conditions match account_move_line_open_reconcilable_idx, so only
+        the open items are read."""
+        date_from, date_to = self._get_period_range(period)
+        query = '''
+            SELECT COUNT(*) AS count FROM account_move_line l
+            WHERE l.full_reconcile_id IS NULL AND l.account_reconcile
+            AND l.balance != 0
+            AND l.date >= %(date_from)s AND l.date < %(date_to)s
+        '''
+        if post is not None:
+            query += ' AND l.parent_state IN %(states)s'
+        if company_ids is not None:
+            query += ' AND l.company_id IN %(company_ids)s'
+        self._cr.execute(query, {
+            'date_from': date_from,
+            'date_to': date_to,
+            'states': tuple(self._get_dashboard_states(post)),
+            'company_ids': tuple(company_ids or [0]),
+        })
         record = self._cr.dictfetchall()
         return record
 
-    @api.model
-    def click_expense_month(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
-        self._cr.execute((''' select account_move_line.id from  account_account, account_move_line where 
-                            account_move_line.account_id = account_account.id AND account_account.internal_group = 'expense' AND  
-                            %s                
-                            AND Extract(month FROM account_move_line.date) = Extract(month FROM DATE(NOW()))
-                            AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW())) 
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
-                                 ''') % (states_arg))
-        record = [row[0] for row in self._cr.fetchall()]
-        return record
+    # drill-down domains of the dashboard tiles, paged lazily by the list view
 
     @api.model
-    def click_expense_year(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
+    def _get_dashboard_states(self, post):
         if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
-        self._cr.execute((''' select account_move_line.id from  account_account, account_move_line where
-                                account_move_line.account_id = account_account.id AND account_account.internal_group = 'expense' AND  
-                                %s                         
-                                AND Extract(YEAR FROM account_move_line.date) = Extract(YEAR FROM DATE(NOW())) 
-                                AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
-                                ''') % (states_arg))
-        record = [row[0] for row in self._cr.fetchall()]
-        return record
+            return ['posted', 'draft']
+        return ['posted']
 
     @api.model
-    def click_total_income_month(self, *post):
-        company_id = self.get_current_company_value()
+    def _get_period_domain(self, field_name, period):
+        date_from, date_to = self._get_period_range(period)
+        return [
+            (field_name, '>=', fields.Date.to_string(date_from)),
+            (field_name, '<', fields.Date.to_string(date_to)),
+        ]
 
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
+    @api.model
+    def _get_line_drilldown_domain(self, post, period, internal_groups):
+        return [
+            ('account_id.internal_group', 'in', internal_groups),
+            ('parent_state', 'in', self._get_dashboard_states(post)),
+            ('company_id', 'in', self.get_current_company_value()),
+        ] + self._get_period_domain('date', period)
 
-        self._cr.execute(('''select account_move_line.id from account_account, account_move_line where
-                                account_move_line.account_id = account_account.id AND account_account.internal_group = 'income'
-                               AND %s
-                               AND Extract(month FROM account_move_line.date) = Extract(month FROM DATE(NOW())) 
-                               AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW())) 
-                               AND account_move_line.company_id in ''' + str(tuple(company_id)) + ''' 
+    @api.model
+    def _get_move_drilldown_domain(self, post, period, move_type, paid=False):
+        domain = [
+            ('move_type', '=', move_type),
+            ('state', 'in', self._get_dashboard_states(post)),
+            ('company_id', 'in', self.get_current_company_value()),
+        ] + self._get_period_domain('date', period)
+        if paid:
+            domain.append(('payment_state', '=', 'paid'))
+        return domain
 
-                                     ''') % (states_arg))
-        record = [row[0] for row in self._cr.fetchall()]
-        return record
+    @api.model
+    def _get_unreconciled_drilldown_domain(self, post, period):
+        return [
+            ('account_reconcile', '=', True),
+            ('full_reconcile_id', '=', False),
+            ('balance', '!=', 0),
+            ('parent_state', 'in', self._get_dashboard_states(post)),
+            ('company_id', 'in', self.get_current_company_value()),
+        ] + self._get_period_domain('date', period)
 
     @api.model
-    def click_total_income_year(self, *post):
+    @profiled
+    def click_expense_month(self, *post):
+        return self._get_line_drilldown_domain(post, 'this_month', ['expense'])
 
-        company_id = self.get_current_company_value()
+    @api.model
+    @profiled
+    def click_expense_year(self, *post):
+        return self._get_line_drilldown_domain(post, 'this_year', ['expense'])
 
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
+    @api.model
+    @profiled
+    def click_total_income_month(self, *post):
+        return self._get_line_drilldown_domain(post, 'this_month', ['income'])
 
-        self._cr.execute((''' select account_move_line.id from account_account, account_move_line where                           
-                             account_move_line.account_id = account_account.id AND account_account.internal_group = 'income'
-                             AND %s
-                          AND Extract(YEAR FROM account_move_line.date) = Extract(YEAR FROM DATE(NOW())) 
-                          AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
-                        ''') % (states_arg))
-        record = [row[0] for row in self._cr.fetchall()]
-        return record
+    @api.model
+    @profiled
+    def click_total_income_year(self, *post):
+        return self._get_line_drilldown_domain(post, 'this_year', ['income'])
 
     @api.model
+    @profiled
     def click_profit_income_month(self, *post):
-
-        company_id = self.get_current_company_value()
-
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
-
-        self._cr.execute(('''select account_move_line.id from  account_account, account_move_line where 
-                                       account_move_line.account_id = account_account.id AND
-                                       %s AND
-                                       (account_account.internal_group = 'income' or    
-                                       account_account.internal_group = 'expense' ) 
-                                       AND Extract(month FROM account_move_line.date) = Extract(month FROM DATE(NOW())) 
-                                       AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW()))   
-                                       AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''        
-                                        ''') % (states_arg))
-        profit = [row[0] for row in self._cr.fetchall()]
-        return profit
+        return self._get_line_drilldown_domain(post, 'this_month', ['income', 'expense'])
 
     @api.model
+    @profiled
     def click_profit_income_year(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
-
-        self._cr.execute(('''select account_move_line.id from  account_account, account_move_line where 
-                                            account_move_line.account_id = account_account.id AND
-                                            %s AND
-                                           (account_account.internal_group = 'income' or    
-                                           account_account.internal_group = 'expense' )                                       
-                                           AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW()))  
-                                           AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''           
-                                            ''') % (states_arg))
-        profit = [row[0] for row in self._cr.fetchall()]
-        return profit
+        return self._get_line_drilldown_domain(post, 'this_year', ['income', 'expense'])
 
     @api.model
+    @profiled
     def click_bill_year(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ account_move.state in ('posted', 'draft')"""
-        else:
-            states_arg = """ account_move.state = 'posted'"""
-        self._cr.execute(('''select account_move.id from account_move where move_type ='in_invoice'
-                               AND  %s                              
-                               AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))     
-                               AND account_move.company_id in ''' + str(tuple(company_id)) + '''      
-                           ''') % (states_arg))
-        record_supplier_current_year = [row[0] for row in self._cr.fetchall()]
-        return record_supplier_current_year
+        return self._get_move_drilldown_domain(post, 'this_year', 'in_invoice')
 
     @api.model
+    @profiled
     def click_bill_year_paid(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ account_move.state in ('posted', 'draft')"""
-        else:
-            states_arg = """ account_move.state = 'posted'"""
-
-        self._cr.execute(('''select account_move.id from account_move where move_type ='in_invoice'
-                                       AND   %s
-                                       AND  payment_state = 'paid'
-                                       AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))
-                                       AND account_move.company_id in ''' + str(tuple(company_id)) + '''
-                                   ''') % (states_arg))
-        result_paid_supplier_invoice_current_year = [row[0] for row in self._cr.fetchall()]
-        return result_paid_supplier_invoice_current_year
+        return self._get_move_drilldown_domain(post, 'this_year', 'in_invoice', paid=True)
 
     @api.model
+    @profiled
     def click_invoice_year_paid(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ account_move.state in ('posted', 'draft')"""
-        else:
-            states_arg = """ account_move.state = 'posted'"""
-        self._cr.execute(('''select account_move.id from account_move where move_type ='out_invoice'
-                                       AND   %s
-                                       AND payment_state = 'paid'
-                                       AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))
-                                       AND account_move.company_id in ''' + str(tuple(company_id)) + '''
-                                   ''') % (states_arg))
-        record_paid_customer_invoice_current_year = [row[0] for row in self._cr.fetchall()]
-        return record_paid_customer_invoice_current_year
+        return self._get_move_drilldown_domain(post, 'this_year', 'out_invoice', paid=True)
 
     @api.model
+    @profiled
     def click_invoice_year(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ account_move.state in ('posted', 'draft')"""
-        else:
-            states_arg = """ account_move.state = 'posted'"""
-        self._cr.execute(('''select account_move.id  from account_move where move_type ='out_invoice'
-                               AND   %s                               
-                               AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))     
-                               AND account_move.company_id in ''' + str(tuple(company_id)) + '''           
-                           ''') % (states_arg))
-        record_customer_current_year = [row[0] for row in self._cr.fetchall()]
-        return record_customer_current_year
+        return self._get_move_drilldown_domain(post, 'this_year', 'out_invoice')
 
     @api.model
+    @profiled
     def click_bill_month(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ account_move.state in ('posted', 'draft')"""
-        else:
-            states_arg = """ account_move.state = 'posted'"""
-        self._cr.execute(('''select account_move.id from account_move where move_type ='in_invoice'
-                                            AND   %s
-                                            AND Extract(month FROM account_move.date) = Extract(month FROM DATE(NOW()))
-                                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))
-                                            AND account_move.company_id in ''' + str(tuple(company_id)) + '''
-                                        ''') % (states_arg))
-        bill_month = [row[0] for row in self._cr.fetchall()]
-        return bill_month
+        return self._get_move_drilldown_domain(post, 'this_month', 'in_invoice')
 
     @api.model
+    @profiled
     def click_bill_month_paid(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ account_move.state in ('posted', 'draft')"""
-        else:
-            states_arg = """ account_move.state = 'posted'"""
-        self._cr.execute(('''select account_move.id from account_move where move_type ='in_invoice'
-                                            AND   %s
-                                            AND Extract(month FROM account_move.date) = Extract(month FROM DATE(NOW()))
-                                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))
-                                            AND payment_state = 'paid'
-                                            AND account_move.company_id in ''' + str(tuple(company_id)) + '''
-                                        ''') % (states_arg))
-        result_paid_supplier_invoice_current_month = [row[0] for row in self._cr.fetchall()]
-        return result_paid_supplier_invoice_current_month
+        return self._get_move_drilldown_domain(post, 'this_month', 'in_invoice', paid=True)
 
     @api.model
+    @profiled
     def click_invoice_month_paid(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ account_move.state in ('posted', 'draft')"""
-        else:
-            states_arg = """ account_move.state = 'posted'"""
-        self._cr.execute(('''select account_move.id from account_move where move_type ='out_invoice'
-                                            AND   %s
-                                            AND Extract(month FROM account_move.date) = Extract(month FROM DATE(NOW()))
-                                            AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))
-                                            AND payment_state = 'paid'
-                                            AND account_move.company_id in ''' + str(tuple(company_id)) + '''
-                                        ''') % (states_arg))
-        record_paid_customer_invoice_current_month = [row[0] for row in self._cr.fetchall()]
-        return record_paid_customer_invoice_current_month
+        return self._get_move_drilldown_domain(post, 'this_month', 'out_invoice', paid=True)
 
     @api.model
+    @profiled
     def click_invoice_month(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ account_move.state in ('posted', 'draft')"""
-        else:
-            states_arg = """ account_move.state = 'posted'"""
-        self._cr.execute(('''select account_move.id from account_move where move_type ='out_invoice'
-                                    AND   %s                               
-                                    AND Extract(month FROM account_move.date) = Extract(month FROM DATE(NOW()))
-                                    AND Extract(YEAR FROM account_move.date) = Extract(YEAR FROM DATE(NOW()))     
-                                    AND account_move.company_id in ''' + str(tuple(company_id)) + '''           
-                                ''') % (states_arg))
-        record_customer_current_month = [row[0] for row in self._cr.fetchall()]
-        return record_customer_current_month
+        return self._get_move_drilldown_domain(post, 'this_month', 'out_invoice')
 
     @api.model
+    @profiled
     def click_unreconcile_month(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
-        qry = ''' select count(*) FROM account_move_line l,account_account a
-                              where Extract(month FROM l.date) = Extract(month FROM DATE(NOW())) AND
-                              Extract(YEAR FROM l.date) = Extract(YEAR FROM DATE(NOW())) AND
-                              L.account_id=a.id AND l.full_reconcile_id IS NULL AND 
-                              l.balance != 0 AND a.reconcile IS F 
-                              AND l.''' + states_arg + '''
-                              AND  l.company_id in ''' + str(tuple(company_id)) + '''                              
-                               '''
-
-        self._cr.execute((''' select l.id FROM account_move_line l,account_account a
-                              where Extract(month FROM l.date) = Extract(month FROM DATE(NOW())) AND
-                              Extract(YEAR FROM l.date) = Extract(YEAR FROM DATE(NOW())) AND
-                              L.account_id=a.id AND l.full_reconcile_id IS NULL AND 
-                              l.balance != 0 AND a.reconcile IS TRUE 
-                              AND l.%s
-                              AND  l.company_id in ''' + str(tuple(company_id)) + '''                              
-                               ''') % (states_arg))
-        record = [row[0] for row in self._cr.fetchall()]
-        return record
+        return self._get_unreconciled_drilldown_domain(post, 'this_month')
 
     @api.model
+    @profiled
     def click_unreconcile_year(self, *post):
-        company_id = self.get_current_company_value()
-        states_arg = ""
-        if post != ('posted',):
-            states_arg = """ parent_state in ('posted', 'draft')"""
-        else:
-            states_arg = """ parent_state = 'posted'"""
-        self._cr.execute(('''  select l.id FROM account_move_line l,account_account a
-                                  where Extract(year FROM l.date) = Extract(year FROM DATE(NOW())) AND
-                                  L.account_id=a.id AND l.full_reconcile_id IS NULL AND 
-                                  l.balance != 0 AND a.reconcile IS TRUE  
-                                  AND l.%s
-                                  AND  l.company_id in ''' + str(tuple(company_id)) + '''       
-                                  ''') % (states_arg))
-        record = [row[0] for row in self._cr.fetchall()]
-        return record
+        return self._get_unreconciled_drilldown_domain(post, 'this_year')
 
     # function to get unreconcile items last year
 
     @api.model
+    @profiled
     def unreconcile_items_last_year(self):
-
-        self._cr.execute('''  select count(*) FROM account_move_line l,account_account a
-                                      where Extract(year FROM l.date) = Extract(year FROM DATE(NOW())) - 1 AND
-                                      L.account_id=a.id AND l.full_reconcile_id IS NULL AND 
-                                      l.balance != 0 AND a.reconcile IS TRUE
-                                      ''')
-        record = self._cr.dictfetchall()
-        return record
+        return self._get_unreconciled_count('last_year')
 
     # function to get total income
 
     @api.model
+    @profiled
     def month_income(self):
 
         self._cr.execute(''' select sum(debit) as debit , sum(credit) as credit  from account_move, account_account,account_move_line
                             where  account_move.move_type = 'entry'  AND account_move.state = 'posted' AND  account_move_line.account_id=account_account.id AND
                              account_account.internal_group='income'
-                              AND to_char(DATE(NOW()), 'MM') = to_char(account_move_line.date, 'MM')
+                              AND ''' + self._get_period_clause('account_move_line.date', 'this_month') + '''
                               ''')
         record = self._cr.dictfetchall()
         return record
@@ -1339,6 +1141,8 @@ class DashBoard(models.Model):
     # function to get total income this month
 
     @api.model
+    @profiled
+    @cached_dashboard
     def month_income_this_month(self, *post):
         company_id = self.get_current_company_value()
 
@@ -1348,18 +1152,19 @@ class DashBoard(models.Model):
         else:
             states_arg = """ parent_state = 'posted'"""
 
-        self._cr.execute(('''select sum(debit) as debit, sum(credit) as credit from account_account, account_move_line where
-                            account_move_line.account_id = account_account.id AND account_account.internal_group = 'income'
+        self._cr.execute(('''select sum(debit) as debit, sum(credit) as credit from account_dashboard_rollup where
+                            internal_group = 'income'
                            AND %s
-                           AND Extract(month FROM account_move_line.date) = Extract(month FROM DATE(NOW())) 
-                           AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW())) 
-                           AND account_move_line.company_id in ''' + str(tuple(company_id)) + ''' 
+                           AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_month') + ''' 
+                           AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + ''' 
 
                                  ''') % (states_arg))
         record = self._cr.dictfetchall()
         return record
 
     @api.model
+    @profiled
+    @cached_dashboard
     def profit_income_this_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -1370,15 +1175,13 @@ class DashBoard(models.Model):
         else:
             states_arg = """ parent_state = 'posted'"""
 
-        self._cr.execute(('''select sum(debit) - sum(credit) as profit, account_account.internal_group from  account_account, account_move_line where 
+        self._cr.execute(('''select sum(debit) - sum(credit) as profit, internal_group from account_dashboard_rollup where 
                                   
-                                    account_move_line.account_id = account_account.id AND
                                     %s AND
-                                    (account_account.internal_group = 'income' or    
-                                    account_account.internal_group = 'expense' ) 
-                                    AND Extract(month FROM account_move_line.date) = Extract(month FROM DATE(NOW())) 
-                                    AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW()))   
-                                    AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''        
+                                    (internal_group = 'income' or    
+                                    internal_group = 'expense' ) 
+                                    AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_month') + '''   
+                                    AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + '''        
                                     group by internal_group 
                                      ''') % (states_arg))
         income = self._cr.dictfetchall()
@@ -1396,8 +1199,34 @@ class DashBoard(models.Model):
 
         return profit
 
+    @api.model
+    def _get_period_range(self, period):
+        """ Return the half-open [start, end) date range of a dashboard
+        period, so that the date columns can be matched on their index."""
+        today = fields.Date.context_today(self)
+        month_start = today.replace(day=1)
+        year_start = today.replace(month=1, day=1)
+        if period == 'this_month':
+            return month_start, month_start + relativedelta(months=1)
+        if period == 'last_month':
+            return month_start - relativedelta(months=1), month_start
+        if period == 'this_year':
+            return year_start, year_start + relativedelta(years=1)
+        if period == 'last_year':
+            return year_start - relativedelta(years=1), year_start
+        raise ValueError("Unknown dashboard period %r" % period)
+
+    @api.model
+    def _get_period_clause(self, column, period):
+        date_from, date_to = self._get_period_range(period)
+        return "%s >= '%s' AND %s < '%s'" % (column, date_from, column, date_to)
+
     def get_current_company_value(self):
 
+        # companies already resolved for this dashboard call
+        if self.env.context.get('dashboard_company_ids'):
+            return list(self.env.context['dashboard_company_ids'])
+
         cookies_cids = [int(r) for r in request.httprequest.cookies.get('cids').split(",")] \
             if request.httprequest.cookies.get('cids') \
             else [request.env.user.company_id.id]
@@ -1412,6 +1241,8 @@ class DashBoard(models.Model):
         return cookies_cids
 
     @api.model
+    @profiled
+    @cached_dashboard
     def profit_income_this_year(self, *post):
         company_id = self.get_current_company_value()
         states_arg = ""
@@ -1420,14 +1251,13 @@ class DashBoard(models.Model):
         else:
             states_arg = """ parent_state = 'posted'"""
 
-        self._cr.execute(('''select sum(debit) - sum(credit) as profit, account_account.internal_group from  account_account, account_move_line where 
+        self._cr.execute(('''select sum(debit) - sum(credit) as profit, internal_group from account_dashboard_rollup where 
                                         
-                                         account_move_line.account_id = account_account.id AND
                                          %s AND
-                                        (account_account.internal_group = 'income' or    
-                                        account_account.internal_group = 'expense' )                                       
-                                        AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW()))  
-                                        AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''           
+                                        (internal_group = 'income' or    
+                                        internal_group = 'expense' )                                       
+                                        AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_year') + '''  
+                                        AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + '''           
                                         group by internal_group 
                                          ''') % (states_arg))
         income = self._cr.dictfetchall()
@@ -1449,17 +1279,15 @@ class DashBoard(models.Model):
     # function to get total income last month
 
     @api.model
+    @profiled
     def month_income_last_month(self):
 
-        one_month_ago = (datetime.now() - relativedelta(months=1)).month
 
         self._cr.execute('''
-                            select sum(debit) as debit, sum(credit) as credit from  account_account, 
-        account_move_line where 
-         account_move_line.account_id = account_account.id 
-        AND account_account.internal_group = 'income' AND 
-        account_move_line.parent_state = 'posted'  
-        AND Extract(month FROM account_move_line.date) = ''' + str(one_month_ago) + '''
+                            select sum(debit) as debit, sum(credit) as credit from account_dashboard_rollup where 
+         internal_group = 'income' AND 
+        account_dashboard_rollup.parent_state = 'posted'  
+        AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'last_month') + '''
         ''')
 
         record = self._cr.dictfetchall()
@@ -1469,6 +1297,8 @@ class DashBoard(models.Model):
     # function to get total income this year
 
     @api.model
+    @profiled
+    @cached_dashboard
     def month_income_this_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -1479,11 +1309,11 @@ class DashBoard(models.Model):
         else:
             states_arg = """ parent_state = 'posted'"""
 
-        self._cr.execute((''' select sum(debit) as debit, sum(credit) as credit from account_account, account_move_line where                           
-                             account_move_line.account_id = account_account.id AND account_account.internal_group = 'income'
+        self._cr.execute((''' select sum(debit) as debit, sum(credit) as credit from account_dashboard_rollup where                           
+                             internal_group = 'income'
                              AND %s
-                          AND Extract(YEAR FROM account_move_line.date) = Extract(YEAR FROM DATE(NOW())) 
-                          AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
+                          AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_year') + ''' 
+                          AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + '''
                         ''') % (states_arg))
         record = self._cr.dictfetchall()
         return record
@@ -1491,12 +1321,13 @@ class DashBoard(models.Model):
     # function to get total income last year
 
     @api.model
+    @profiled
     def month_income_last_year(self):
 
-        self._cr.execute(''' select sum(debit) as debit, sum(credit) as credit from  account_account, account_move_line where
-                            account_move_line.parent_state = 'posted' 
-                            AND  account_move_line.account_id = account_account.id AND account_account.internal_group = 'income'
-                            AND Extract(YEAR FROM account_move_line.date) = Extract(YEAR FROM DATE(NOW())) - 1
+        self._cr.execute(''' select sum(debit) as debit, sum(credit) as credit from account_dashboard_rollup where
+                            account_dashboard_rollup.parent_state = 'posted' 
+                            AND  internal_group = 'income'
+                            AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'last_year') + '''
                          ''')
         record = self._cr.dictfetchall()
         return record
@@ -1504,6 +1335,7 @@ class DashBoard(models.Model):
     # function to get currency
 
     @api.model
+    @profiled
     def get_currency(self):
         company_ids = self.get_current_company_value()
         if 0 in company_ids:
@@ -1521,12 +1353,13 @@ class DashBoard(models.Model):
     # function to get total expense
 
     @api.model
+    @profiled
     def month_expense(self):
 
         self._cr.execute(''' select sum(debit) as debit , sum(credit) as credit from account_move, account_account,account_move_line
                             where account_move.move_type = 'entry'  AND account_move.state = 'posted' AND   account_move_line.account_id=account_account.id AND
                              account_account.internal_group='expense' 
-                             AND to_char(DATE(NOW()), 'MM') = to_char(account_move_line.date, 'MM')
+                             AND ''' + self._get_period_clause('account_move_line.date', 'this_month') + '''
                              ''')
         record = self._cr.dictfetchall()
         return record
@@ -1534,6 +1367,8 @@ class DashBoard(models.Model):
     # function to get total expense this month
 
     @api.model
+    @profiled
+    @cached_dashboard
     def month_expense_this_month(self, *post):
 
         company_id = self.get_current_company_value()
@@ -1544,13 +1379,12 @@ class DashBoard(models.Model):
         else:
             states_arg = """ parent_state = 'posted'"""
 
-        self._cr.execute((''' select sum(debit) as debit, sum(credit) as credit from  account_account, account_move_line where 
+        self._cr.execute((''' select sum(debit) as debit, sum(credit) as credit from account_dashboard_rollup where 
                         
-                            account_move_line.account_id = account_account.id AND account_account.internal_group = 'expense' AND  
+                            internal_group = 'expense' AND  
                             %s                
-                            AND Extract(month FROM account_move_line.date) = Extract(month FROM DATE(NOW()))
-                            AND Extract(year FROM account_move_line.date) = Extract(year FROM DATE(NOW())) 
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
+                            AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_month') + ''' 
+                            AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + '''
 
 
                                  ''') % (states_arg))
@@ -1560,6 +1394,8 @@ class DashBoard(models.Model):
     # function to get total expense this year
 
     @api.model
+    @profiled
+    @cached_dashboard
     def month_expense_this_year(self, *post):
 
         company_id = self.get_current_company_value()
@@ -1570,12 +1406,12 @@ class DashBoard(models.Model):
         else:
             states_arg = """ parent_state = 'posted'"""
 
-        self._cr.execute((''' select sum(debit) as debit, sum(credit) as credit from  account_account, account_move_line where
+        self._cr.execute((''' select sum(debit) as debit, sum(credit) as credit from account_dashboard_rollup where
                         
-                            account_move_line.account_id = account_account.id AND account_account.internal_group = 'expense' AND  
+                            internal_group = 'expense' AND  
                             %s                         
-                            AND Extract(YEAR FROM account_move_line.date) = Extract(YEAR FROM DATE(NOW())) 
-                            AND account_move_line.company_id in ''' + str(tuple(company_id)) + '''
+                            AND ''' + self._get_period_clause('account_dashboard_rollup.date', 'this_year') + ''' 
+                            AND account_dashboard_rollup.company_id in ''' + str(tuple(company_id)) + '''
 
 
 
@@ -1584,6 +1420,8 @@ class DashBoard(models.Model):
         return record
 
     @api.model
+    @profiled
+    @cached_dashboard
     def bank_balance(self, *post):
 
         company_id = self.get_current_company_value()
@@ -1620,3 +1458,165 @@ class DashBoard(models.Model):
 
         }
         return records
+
+    # function to get every tile and chart of the dashboard in one call
+
+    @api.model
+    @profiled
+    def get_dashboard_payload(self, filters=None):
+        """ Return every tile and chart of the dashboard with the time they
+        were computed at. The pre-warmed snapshot is served while it is
+        current, unless ``filters`` asks for a refresh."""
+        filters = filters or {}
+        posted = bool(filters.get('posted'))
+
+        # resolve the companies once and share them with every section
+        company_id = self.get_current_company_value()
+        versions = self.env['account.dashboard.ledger.version']._get_versions(
+            tuple(sorted(company_id)))
+        snapshots = self.env['account.dashboard.snapshot']
+        if not filters.get('refresh'):
+            payload = snapshots._get_snapshot(company_id, posted, versions)
+            if payload is not None:
+                # amounts are formatted in the language of the current user
+                currency = self.with_context(dashboard_company_ids=company_id).get_currency()
+                payload['get_currency'] = currency
+                payload['get_total_invoice_current_month'][-1] = currency
+                return payload
+
+        dashboard = self.with_context(dashboard_refresh=bool(filters.get('refresh')))
+        payload = dashboard._compute_dashboard_payload(company_id, posted, versions)
+        if filters.get('refresh'):
+            computed_at = snapshots._store_snapshot(company_id, posted, versions, payload)
+        else:
+            computed_at = fields.Datetime.now()
+        payload['computed_at'] = fields.Datetime.to_string(computed_at)
+        return payload
+
+    @api.model
+    def _compute_dashboard_payload(self, company_id, posted, versions):
+        post = ('posted',) if posted else (False,)
+        dashboard = self.with_context(
+            dashboard_company_ids=company_id,
+            dashboard_ledger_versions=versions)
+
+        payload = dashboard._get_dashboard_tiles(post)
+        payload.update({
+            'get_currency': dashboard.get_currency(),
+            'get_income_this_month': dashboard.get_income_this_month(*post),
+            'get_overdues_this_month_and_year':
+                dashboard.get_overdues_this_month_and_year(post[0], 'this_month'),
+            'get_latebillss': dashboard.get_latebillss(post[0], 'last_month'),
+            'get_top_10_customers_month':
+                dashboard.get_top_10_customers_month(post[0], 'this_month'),
+            'bank_balance': dashboard.bank_balance(*post),
+        })
+        payload['get_total_invoice_current_month'].append(payload['get_currency'])
+        return payload
+
+    @cached_dashboard
+    def _get_dashboard_tiles(self, post):
+        """ Compute the figures of the dashboard tiles with one aggregate
+        query per table instead of one query per tile."""
+        company_id = self.get_current_company_value()
+        states = tuple(self._get_dashboard_states(post))
+        month_start, month_end = self._get_period_range('this_month')
+        year_start, year_end = self._get_period_range('this_year')
+        params = {
+            'states': states,
+            'company_ids': tuple(company_id),
+            'month_start': month_start,
+            'month_end': month_end,
+            'year_start': year_start,
+            'year_end': year_end,
+        }
+
+        self._cr.execute('''
+            SELECT internal_group,
+                   COALESCE(SUM(debit) FILTER (WHERE
+                       date >= %(month_start)s AND date < %(month_end)s), 0) AS debit_this_month,
+                   COALESCE(SUM(credit) FILTER (WHERE
+                       date >= %(month_start)s AND date < %(month_end)s), 0) AS credit_this_month,
+                   COALESCE(SUM(debit), 0) AS debit_this_year,
+                   COALESCE(SUM(credit), 0) AS credit_this_year
+            FROM account_dashboard_rollup
+            WHERE internal_group IN ('income', 'expense')
+            AND date >= %(year_start)s AND date < %(year_end)s
+            AND parent_state IN %(states)s
+            AND company_id IN %(company_ids)s
+            GROUP BY internal_group
+            ORDER BY internal_group DESC
+        ''', params)
+        groups = self._cr.dictfetchall()
+        totals = dict((group['internal_group'], group) for group in groups)
+        empty = {
+            'debit_this_month': 0.0, 'credit_this_month': 0.0,
+            'debit_this_year': 0.0, 'credit_this_year': 0.0,
+        }
+        income = totals.get('income', empty)
+        expense = totals.get('expense', empty)
+
+        self._cr.execute('''
+            SELECT COUNT(*) FILTER (WHERE
+                       l.date >= %(month_start)s AND l.date < %(month_end)s) AS this_month,
+                   COUNT(*) AS this_year
+            FROM account_move_line l
+            WHERE l.full_reconcile_id IS NULL AND l.account_reconcile
+            AND l.balance != 0
+            AND l.date >= %(year_start)s AND l.date < %(year_end)s
+            AND l.parent_state IN %(states)s
+            AND l.company_id IN %(company_ids)s
+        ''', params)
+        unreconciled = self._cr.dictfetchone()
+
+        self._cr.execute('''
+            SELECT COALESCE(SUM(amount_total_signed) FILTER (WHERE
+                       move_type = 'out_invoice'), 0) AS customer_invoice,
+                   COALESCE(SUM(-amount_total_signed) FILTER (WHERE
+                       move_type = 'in_invoice'), 0) AS supplier_invoice,
+                   COALESCE(SUM(amount_total_signed - amount_residual_signed) FILTER (WHERE
+                       move_type = 'out_invoice' AND payment_state = 'paid'), 0) AS customer_invoice_paid,
+                   COALESCE(SUM(amount_residual_signed - amount_total_signed) FILTER (WHERE
+                       move_type = 'in_invoice' AND payment_state = 'paid'), 0) AS supplier_invoice_paid
+            FROM account_move
+            WHERE move_type IN ('out_invoice', 'in_invoice')
+            AND account_move.date >= %(month_start)s AND account_move.date < %(month_end)s
+            AND account_move.state IN %(states)s
+            AND account_move.company_id IN %(company_ids)s
+        ''', params)
+        invoices = self._cr.dictfetchone()
+
+        return {
+            'month_income_this_month': [{
+                'debit': income['debit_this_month'],
+                'credit': income['credit_this_month'],
+            }],
+            'month_income_this_year': [{
+                'debit': income['debit_this_year'],
+                'credit': income['credit_this_year'],
+            }],
+            'month_expense_this_month': [{
+                'debit': expense['debit_this_month'],
+                'credit': expense['credit_this_month'],
+            }],
+            'month_expense_this_year': [{
+                'debit': expense['debit_this_year'],
+                'credit': expense['credit_this_year'],
+            }],
+            'profit_income_this_month': [
+                group['debit_this_month'] - group['credit_this_month'] for group in groups],
+            'profit_income_this_year': [
+                group['debit_this_year'] - group['credit_this_year'] for group in groups],
+            'unreconcile_items_this_month': [{'count': unreconciled['this_month']}],
+            'unreconcile_items_this_year': [{'count': unreconciled['this_year']}],
+            'get_total_invoice_current_month': [
+                [invoices['customer_invoice']],
+                [0.0],
+                [invoices['supplier_invoice']],
+                [0.0],
+                [invoices['customer_invoice_paid']],
+                [invoices['supplier_invoice_paid']],
+                [0.0],
+                [0.0],
+            ],
+        }
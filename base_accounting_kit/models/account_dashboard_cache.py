@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+import copy
+import functools
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+DASHBOARD_CACHE_SIZE = 512
+
+# company ids whose ledger changed in a transaction not committed yet
+_pending_versions = weakref.WeakKeyDictionary()
+
+
+class DashboardLRUCache(object):
+    """ Least recently used mapping shared by the threads of a worker."""
+
+    def __init__(self, size):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+dashboard_cache = DashboardLRUCache(DASHBOARD_CACHE_SIZE)
+
+
+def _freeze(value):
+    """ Return a hashable equivalent of a dashboard method argument."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return tuple(sorted(_freeze(item) for item in value))
+    return value
+
+
+def cached_dashboard(method):
+    """ Cache the result of a dashboard method per database, company set,
+    arguments and day. An entry is only served while the ledger versions of
+    its companies are unchanged, and is recomputed when the context asks for
+    a ``dashboard_refresh``."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        company_ids = tuple(sorted(self.get_current_company_value()))
+        pending = _pending_versions.get(self._cr)
+        if pending and pending.intersection(company_ids):
+            # the ledger of this transaction differs from the committed one
+            return method(self, *args)
+        versions = self.env.context.get('dashboard_ledger_versions')
+        if versions is None:
+            versions = self.env['account.dashboard.ledger.version']._get_versions(company_ids)
+        key = (self._cr.dbname, method.__name__, company_ids, _freeze(args),
+               fields.Date.context_today(self), self.env.context.get('lang'))
+        entry = dashboard_cache.get(key)
+        if entry is not None and entry[0] == versions \
+                and not self.env.context.get('dashboard_refresh'):
+            return copy.deepcopy(entry[1])
+        result = method(self, *args)
+        dashboard_cache.set(key, (versions, copy.deepcopy(result)))
+        return result
+
+    return wrapper
+
+
+class DashboardLedgerVersion(models.Model):
+    _name = 'account.dashboard.ledger.version'
+    _description = 'Accounting Dashboard Ledger Version'
+    _log_access = False
+
+    company_id = fields.Many2one('res.company', string='Company',
+                                 required=True, readonly=True)
+    version = fields.Integer(string='Version', readonly=True)
+
+    _sql_constraints = [
+        ('company_uniq', 'unique(company_id)',
+         'A company can only have one ledger version.'),
+    ]
+
+    @api.model
+    def _get_versions(self, company_ids):
+        """ Return the ledger versions of the given companies as a tuple."""
+        self._cr.execute("""
+            SELECT company_id, version FROM account_dashboard_ledger_version
+            WHERE company_id IN %s
+        """, (tuple(company_ids) or (0,),))
+        versions = dict(self._cr.fetchall())
+        return tuple(versions.get(company_id, 0) for company_id in sorted(company_ids))
+
+    @api.model
+    def _bump_versions(self, company_ids):
+        """ Schedule a version bump of the given companies once the current
+        transaction is committed, so that no worker can cache figures read
+        from a snapshot older than the change."""
+        company_ids = set(company_ids) - {False, None}
+        if not company_ids:
+            return
+        cr = self._cr
+        pending = _pending_versions.get(cr)
+        if pending is None:
+            pending = _pending_versions[cr] = set()
+            registry = self.pool
+
+            def commit():
+                company_ids = _pending_versions.pop(cr, set())
+                if company_ids:
+                    DashboardLedgerVersion._commit_versions(registry, company_ids)
+
+            def rollback():
+                _pending_versions.pop(cr, None)
+
+            cr.postcommit.add(commit)
+            cr.postrollback.add(rollback)
+        pending.update(company_ids)
+
+    @staticmethod
+    def _commit_versions(registry, company_ids):
+        try:
+            with registry.cursor() as cr:
+                cr.autocommit(True)
+                cr.execute("""
+                    INSERT INTO account_dashboard_ledger_version (company_id, version)
+                    SELECT company_id, 1 FROM unnest(%s) AS company_id
+                    ON CONFLICT (company_id)
+                    DO UPDATE SET version = account_dashboard_ledger_version.version + 1
+                """, (sorted(company_ids),))
+        except Exception:
+            # figures can only be stale until the next successful bump
+            _logger.exception("Could not bump the dashboard ledger versions")
+            dashboard_cache.clear()
+
+
+class DashboardCacheMove(models.Model):
+    _inherit = 'account.move'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        moves = super(DashboardCacheMove, self).create(vals_list)
+        self.env['account.dashboard.ledger.version']._bump_versions(
+            moves.mapped('company_id').ids)
+        return moves
+
+    def write(self, vals):
+        company_ids = self.mapped('company_id').ids
+        result = super(DashboardCacheMove, self).write(vals)
+        self.env['account.dashboard.ledger.version']._bump_versions(
+            company_ids + self.mapped('company_id').ids)
+        return result
+
+    def unlink(self):
+        company_ids = self.mapped('company_id').ids
+        result = super(DashboardCacheMove, self).unlink()
+        self.env['account.dashboard.ledger.version']._bump_versions(company_ids)
+        return result
+
+
+class DashboardCacheMoveLine(models.Model):
+    _inherit = 'account.move.line'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(DashboardCacheMoveLine, self).create(vals_list)
+        self.env['account.dashboard.ledger.version']._bump_versions(
+            lines.mapped('company_id').ids)
+        return lines
+
+    def write(self, vals):
+        company_ids = self.mapped('company_id').ids
+        result = super(DashboardCacheMoveLine, self).write(vals)
+        self.env['account.dashboard.ledger.version']._bump_versions(
+            company_ids + self.mapped('company_id').ids)
+        return result
+
+    def unlink(self):
+        company_ids = self.mapped('company_id').ids
+        result = super(DashboardCacheMoveLine, self).unlink()
+        self.env['account.dashboard.ledger.version']._bump_versions(company_ids)
+        return result
+
+
+class DashboardCachePartialReconcile(models.Model):
+    _inherit = 'account.partial.reconcile'
+
+    # reconciliation changes residuals and payment states without a write
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super(DashboardCachePartialReconcile, self).create(vals_list)
+        self.env['account.dashboard.ledger.version']._bump_versions(
+            partials.mapped('company_id').ids)
+        return partials
+
+    def unlink(self):
+        company_ids = self.mapped('company_id').ids
+        result = super(DashboardCachePartialReconcile, self).unlink()
+        self.env['account.dashboard.ledger.version']._bump_versions(company_ids)
+        return result
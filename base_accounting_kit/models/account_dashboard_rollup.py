@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+import weakref
+
+from odoo import api, fields, models
+
+# move line fields whose change moves an amount to another rollup row
+ROLLUP_LINE_FIELDS = ['debit', 'credit', 'balance', 'date', 'account_id',
+                      'company_id', 'move_id']
+ROLLUP_MOVE_FIELDS = ['state', 'date', 'company_id']
+ROLLUP_ACCOUNT_FIELDS = ['user_type_id', 'internal_group']
+
+# ids of the move lines whose rollup delta an enclosing write applies, per
+# cursor, so that nested writes do not count their change twice
+_covered_lines = weakref.WeakKeyDictionary()
+
+
+class DashboardRollup(models.Model):
+    _name = 'account.dashboard.rollup'
+    _description = 'Accounting Dashboard Daily Rollup'
+    _log_access = False
+    _order = 'date desc'
+
+    company_id = fields.Many2one('res.company', string='Company',
+                                 readonly=True)
+    internal_group = fields.Char(string='Internal Group', readonly=True)
+    date = fields.Date(string='Date', readonly=True)
+    parent_state = fields.Char(string='Status', readonly=True)
+    debit = fields.Float(string='Debit', readonly=True)
+    credit = fields.Float(string='Credit', readonly=True)
+    balance = fields.Float(string='Balance', readonly=True)
+
+    def init(self):
+        self._cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS account_dashboard_rollup_key_idx
+            ON account_dashboard_rollup (company_id, date, internal_group, parent_state)
+        """)
+        self._cr.execute("SELECT 1 FROM account_dashboard_rollup LIMIT 1")
+        if not self._cr.fetchone():
+            self._rebuild_rollup()
+
+    @api.model
+    def _rebuild_rollup(self):
+        """ Recompute the whole rollup from the journal items."""
+        self._flush_rollup_sources()
+        self._cr.execute("DELETE FROM account_dashboard_rollup")
+        self._cr.execute("""
+            INSERT INTO account_dashboard_rollup
+                (company_id, internal_group, date, parent_state, debit, credit, balance)
+            SELECT l.company_id, a.internal_group, l.date, l.parent_state,
+                   SUM(l.debit), SUM(l.credit), SUM(l.balance)
+            FROM account_move_line l
+            JOIN account_account a ON a.id = l.account_id
+            GROUP BY l.company_id, a.internal_group, l.date, l.parent_state
+        """)
+
+    @api.model
+    def _apply_rollup_delta(self, where, params, sign):
+        """ Add (sign 1) or remove (sign -1) the amounts of the journal items
+        matching ``where`` to or from their rollup rows.
+
+        Only the rows of the given items are updated, in place, so that
+        concurrent postings only wait on each other when they hit the same
+        company, day, group and status.
+        """
+        self._flush_rollup_sources()
+        self._cr.execute("""
+            INSERT INTO account_dashboard_rollup AS r
+                (company_id, internal_group, date, parent_state, debit, credit, balance)
+            SELECT l.company_id, a.internal_group, l.date, l.parent_state,
+                   %s * SUM(l.debit), %s * SUM(l.credit), %s * SUM(l.balance)
+            FROM account_move_line l
+            JOIN account_account a ON a.id = l.account_id
+            WHERE """ + where + """
+            GROUP BY l.company_id, a.internal_group, l.date, l.parent_state
+            ORDER BY l.company_id, l.date, a.internal_group, l.parent_state
+            ON CONFLICT (company_id, date, internal_group, parent_state)
+            DO UPDATE SET debit = r.debit + EXCLUDED.debit,
+                          credit = r.credit + EXCLUDED.credit,
+                          balance = r.balance + EXCLUDED.balance
+        """, (sign, sign, sign) + tuple(params))
+
+    @api.model
+    def _update_lines_rollup(self, line_ids, write):
+        """ Move the amounts of the given journal items to their rollup rows
+        after ``write``, which changes them. Items already handled by an
+        enclosing call are left to it.
+        """
+        covered = _covered_lines.setdefault(self._cr, set())
+        line_ids = set(line_ids) - covered
+        if not line_ids:
+            return write()
+        covered |= line_ids
+        try:
+            self._apply_rollup_delta('l.id IN %s', (tuple(line_ids),), -1)
+            result = write()
+            self._apply_rollup_delta('l.id IN %s', (tuple(line_ids),), 1)
+        finally:
+            covered -= line_ids
+        return result
+
+    def _flush_rollup_sources(self):
+        self.env['account.move.line'].flush(
+            ['debit', 'credit', 'balance', 'date', 'account_id', 'company_id',
+             'parent_state'])
+        self.env['account.account'].flush(['internal_group'])
+
+
+class DashboardRollupMoveLine(models.Model):
+    _inherit = 'account.move.line'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(DashboardRollupMoveLine, self).create(vals_list)
+        if lines:
+            self.env['account.dashboard.rollup']._apply_rollup_delta(
+                'l.id IN %s', (tuple(lines.ids),), 1)
+        return lines
+
+    def write(self, vals):
+        if not any(field in vals for field in ROLLUP_LINE_FIELDS):
+            return super(DashboardRollupMoveLine, self).write(vals)
+        return self.env['account.dashboard.rollup']._update_lines_rollup(
+            self.ids, lambda: super(DashboardRollupMoveLine, self).write(vals))
+
+    def unlink(self):
+        # the delta of the removed items is applied before they are gone
+        return self.env['account.dashboard.rollup']._update_lines_rollup(
+            self.ids, lambda: super(DashboardRollupMoveLine, self).unlink())
+
+
+class DashboardRollupMove(models.Model):
+    _inherit = 'account.move'
+
+    def write(self, vals):
+        # posting, resetting to draft and cancelling all go through write
+        if not any(field in vals for field in ROLLUP_MOVE_FIELDS):
+            return super(DashboardRollupMove, self).write(vals)
+        return self.env['account.dashboard.rollup']._update_lines_rollup(
+            self.line_ids.ids,
+            lambda: super(DashboardRollupMove, self).write(vals))
+
+
+class DashboardRollupAccount(models.Model):
+    _inherit = 'account.account'
+
+    def write(self, vals):
+        # a new account type moves the items of the account to another group
+        if not self or not any(field in vals for field in ROLLUP_ACCOUNT_FIELDS):
+            return super(DashboardRollupAccount, self).write(vals)
+        Rollup = self.env['account.dashboard.rollup']
+        where = 'l.account_id IN %s'
+        Rollup._apply_rollup_delta(where, (tuple(self.ids),), -1)
+        result = super(DashboardRollupAccount, self).write(vals)
+        Rollup._apply_rollup_delta(where, (tuple(self.ids),), 1)
+        return result
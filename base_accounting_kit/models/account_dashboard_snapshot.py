@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+import json
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class DashboardSnapshot(models.Model):
+    """ Stored dashboard payload of a company set and posted filter.
+
+    A snapshot is served as long as it was computed today and the ledger of
+    its companies did not change since, so it never shows stale figures.
+    """
+    _name = 'account.dashboard.snapshot'
+    _description = 'Accounting Dashboard Snapshot'
+    _log_access = False
+    _order = 'computed_at desc'
+
+    company_key = fields.Char(string='Companies', required=True, readonly=True)
+    posted = fields.Boolean(string='Posted Entries Only', readonly=True)
+    ledger_versions = fields.Char(string='Ledger Versions', readonly=True)
+    payload = fields.Text(string='Payload', readonly=True)
+    computed_at = fields.Datetime(string='Computed At', readonly=True)
+
+    _sql_constraints = [
+        ('company_posted_uniq', 'unique(company_key, posted)',
+         'A company set can only have one snapshot per filter.'),
+    ]
+
+    @api.model
+    def _get_company_key(self, company_ids):
+        return ','.join(str(company_id) for company_id in
+                        sorted(set(company_ids) - {0, False}))
+
+    @api.model
+    def _get_snapshot(self, company_ids, posted, versions):
+        """ Return the stored payload if it is still current, else None."""
+        self._cr.execute("""
+            SELECT payload, ledger_versions, computed_at
+            FROM account_dashboard_snapshot
+            WHERE company_key = %s AND posted = %s
+        """, (self._get_company_key(company_ids), posted))
+        row = self._cr.fetchone()
+        if not row or row[1] != json.dumps(list(versions)):
+            return None
+        if fields.Date.context_today(self, row[2]) != fields.Date.context_today(self):
+            return None
+        payload = json.loads(row[0])
+        payload['computed_at'] = fields.Datetime.to_string(row[2])
+        return payload
+
+    @api.model
+    def _store_snapshot(self, company_ids, posted, versions, payload):
+        computed_at = fields.Datetime.now()
+        self._cr.execute("""
+            INSERT INTO account_dashboard_snapshot
+                (company_key, posted, ledger_versions, payload, computed_at)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (company_key, posted)
+            DO UPDATE SET ledger_versions = EXCLUDED.ledger_versions,
+                          payload = EXCLUDED.payload,
+                          computed_at = EXCLUDED.computed_at
+        """, (self._get_company_key(company_ids), posted,
+              json.dumps(list(versions)), json.dumps(payload, default=str),
+              computed_at))
+        return computed_at
+
+    @api.model
+    def _trigger_prewarm(self):
+        """ Have the pre-warm cron run again once the current transaction,
+        posting the day's recurring entries or depreciations, is committed."""
+        cron = self.env.ref(
+            'base_accounting_kit.account_dashboard_prewarm_cron',
+            raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _cron_prewarm_dashboard(self):
+        """ Compute the dashboard of every company for both filters. It runs
+        daily and is triggered by the recurring entries and depreciation
+        crons once their entries are posted, see _trigger_prewarm."""
+        Versions = self.env['account.dashboard.ledger.version']
+        for company in self.env['res.company'].search([]):
+            # the same company set as a single company dashboard session
+            company_ids = (company.id, 0)
+            dashboard = self.env['account.move'].with_company(company)
+            versions = Versions._get_versions(tuple(sorted(company_ids)))
+            for posted in (True, False):
+                payload = dashboard._compute_dashboard_payload(
+                    company_ids, posted, versions)
+                self._store_snapshot(company_ids, posted, versions, payload)
+            _logger.info("Dashboard of company %s pre-warmed", company.name)
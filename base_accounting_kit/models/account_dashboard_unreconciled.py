@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+from odoo import fields, models
+from odoo.tools import sql
+
+
+class UnreconciledMoveLine(models.Model):
+    """ Open journal items of reconcilable accounts, indexed on their own.
+
+    The reconcile flag of the account is copied on the items, so that a
+    partial index can hold the open ones only: counting them costs as much
+    as the open set, whatever the size of the ledger.
+    """
+    _inherit = 'account.move.line'
+
+    account_reconcile = fields.Boolean(related='account_id.reconcile',
+                                       string='Reconcilable Account',
+                                       store=True, readonly=True)
+
+    def _auto_init(self):
+        # fill the column in one statement instead of computing it per line
+        if not sql.column_exists(self._cr, self._table, 'account_reconcile'):
+            sql.create_column(self._cr, self._table, 'account_reconcile', 'boolean')
+            self._cr.execute("""
+                UPDATE account_move_line l SET account_reconcile = a.reconcile
+                FROM account_account a
+                WHERE a.id = l.account_id
+            """)
+        return super(UnreconciledMoveLine, self)._auto_init()
+
+    def init(self):
+        super(UnreconciledMoveLine, self).init()
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS account_move_line_open_reconcilable_idx
+            ON account_move_line (company_id, date, parent_state, balance)
+            WHERE full_reconcile_id IS NULL AND account_reconcile
+        """)
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+
+import logging
+from collections import defaultdict
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class ReconcileJob(models.Model):
+    """ Background auto-reconciliation of bank statement lines.
+
+    The lines are matched by the reconciliation models in chunks, each
+    chunk being committed with its log, so that a job interrupted by a
+    crash or a time limit resumes with the lines not logged yet.
+    """
+    _name = 'account.reconcile.job'
+    _description = 'Bank Statement Auto-Reconciliation Job'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True, readonly=True)
+    company_id = fields.Many2one('res.company', string='Company',
+                                 required=True, readonly=True)
+    user_id = fields.Many2one('res.users', string='Requested By',
+                              readonly=True)
+    st_line_ids = fields.Many2many('account.bank.statement.line',
+                                   'account_reconcile_job_st_line_rel',
+                                   'job_id', 'st_line_id',
+                                   string='Statement Lines', readonly=True)
+    state = fields.Selection([('queued', 'Queued'),
+                              ('running', 'Running'),
+                              ('done', 'Done'),
+                              ('failed', 'Failed')],
+                             string='Status', default='queued',
+                             required=True, readonly=True)
+    chunk_size = fields.Integer(string='Chunk Size', default=500,
+                                help='Number of statement lines matched and '
+                                     'committed at once.')
+    line_count = fields.Integer(string='Lines', readonly=True)
+    processed_count = fields.Integer(string='Processed', readonly=True)
+    matched_count = fields.Integer(string='Auto-Matched', readonly=True)
+    manual_count = fields.Integer(string='Left for Review', readonly=True)
+    failed_count = fields.Integer(string='Failed', readonly=True)
+    progress = fields.Float(string='Progress', compute='_compute_progress')
+    log_ids = fields.One2many('account.reconcile.job.log', 'job_id',
+                              string='Log', readonly=True)
+    error = fields.Text(string='Error', readonly=True)
+    started_at = fields.Datetime(string='Started At', readonly=True)
+    done_at = fields.Datetime(string='Done At', readonly=True)
+
+    @api.depends('line_count', 'processed_count')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = job.line_count and 100.0 * job.processed_count / job.line_count or 0.0
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # the job runs with the rights of its user, who can only be the
+        # one asking for it
+        for vals in vals_list:
+            vals['user_id'] = self.env.user.id
+        return super(ReconcileJob, self).create(vals_list)
+
+    def write(self, vals):
+        if 'user_id' in vals and not self.env.su:
+            raise UserError(_("The user of a reconciliation job cannot be changed."))
+        return super(ReconcileJob, self).write(vals)
+
+    @api.model
+    def _enqueue(self, st_lines):
+        """ Create a job per company for the given statement lines that are
+            not reconciled yet, and wake the cron up to run them.
+        """
+        st_lines = st_lines.filtered(lambda line: not line.is_reconciled)
+        if not st_lines:
+            raise UserError(_("All the statement lines are already reconciled."))
+        jobs = self
+        for company in st_lines.mapped('company_id'):
+            company_lines = st_lines.filtered(lambda line: line.company_id == company)
+            statements = company_lines.mapped('statement_id')
+            jobs |= self.create({
+                'name': ', '.join(statements.mapped('display_name')) or _('Statement Lines'),
+                'company_id': company.id,
+                'st_line_ids': [(6, 0, company_lines.ids)],
+                'line_count': len(company_lines),
+            })
+        self.env.ref('base_accounting_kit.account_reconcile_job_cron')._trigger()
+        return jobs
+
+    def action_requeue(self):
+        self.filtered(lambda job: job.state == 'failed').write({'state': 'queued', 'error': False})
+        self.env.ref('base_accounting_kit.account_reconcile_job_cron')._trigger()
+
+    @api.model
+    def _cron_process_jobs(self):
+        # running jobs were interrupted, they resume where they stopped
+        for job in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            job._process()
+
+    def _process(self):
+        self.ensure_one()
+        # match with the rights of the user who asked for the job
+        job = self.with_user(self.user_id or self.env.user).with_company(self.company_id)
+        self.write({'state': 'running', 'started_at': self.started_at or fields.Datetime.now()})
+        self.env.cr.commit()
+        reconcile_models = job.env['account.reconcile.model'].search([
+            ('rule_type', '!=', 'writeoff_button'),
+            ('company_id', '=', self.company_id.id),
+        ])
+        try:
+            while True:
+                st_lines = job._get_pending_lines()
+                if not st_lines:
+                    break
+                job._process_chunk(st_lines, reconcile_models)
+                self.env.cr.commit()
+                _logger.info("Auto-reconciliation job %s: %s/%s lines processed",
+                             self.id, self.processed_count, self.line_count)
+        except Exception as e:
+            self.env.cr.rollback()
+            self.env.clear()
+            _logger.exception("Auto-reconciliation job %s failed", self.id)
+            self.write({'state': 'failed', 'error': str(e)})
+        else:
+            self.write({'state': 'done', 'done_at': fields.Datetime.now()})
+        self.env.cr.commit()
+
+    def _get_pending_lines(self):
+        """ Returns the next chunk of lines of the job that are not logged yet."""
+        self.flush()
+        self._cr.execute("""
+            SELECT rel.st_line_id
+            FROM account_reconcile_job_st_line_rel rel
+            WHERE rel.job_id = %s
+            AND NOT EXISTS (
+                SELECT 1 FROM account_reconcile_job_log log
+                WHERE log.job_id = rel.job_id AND log.st_line_id = rel.st_line_id
+            )
+            ORDER BY rel.st_line_id
+            LIMIT %s
+        """, (self.id, self.chunk_size or 500))
+        return self.env['account.bank.statement.line'].browse(
+            [row[0] for row in self._cr.fetchall()])
+
+    def _process_chunk(self, st_lines, reconcile_models):
+        """ Match a chunk of lines, then log them and update the counters.
+            A chunk failing as a whole is retried line by line, so that only
+            the faulty lines are logged as failed.
+        """
+        try:
+            with self.env.cr.savepoint():
+                log_vals = self._match_lines(st_lines, reconcile_models)
+        except Exception:
+            self.env.clear()
+            log_vals = []
+            for st_line in st_lines:
+                try:
+                    with self.env.cr.savepoint():
+                        log_vals += self._match_lines(st_line, reconcile_models)
+                except Exception as e:
+                    self.env.clear()
+                    log_vals.append({
+                        'job_id': self.id,
+                        'st_line_id': st_line.id,
+                        'status': 'failed',
+                        'message': str(e),
+                    })
+        self.env['account.reconcile.job.log'].create(log_vals)
+        statuses = [vals['status'] for vals in log_vals]
+        self.write({
+            'processed_count': self.processed_count + len(log_vals),
+            'matched_count': self.matched_count + statuses.count('matched'),
+            'manual_count': self.manual_count + statuses.count('manual'),
+            'failed_count': self.failed_count + statuses.count('failed'),
+        })
+
+    def _match_lines(self, st_lines, reconcile_models):
+        """ Apply the reconciliation models to the lines and return the
+            values of their log.
+        """
+        log_vals = []
+        done_lines = st_lines.filtered('is_reconciled')
+        for st_line in done_lines:
+            log_vals.append({
+                'job_id': self.id,
+                'st_line_id': st_line.id,
+                'status': 'skipped',
+                'message': _("Already reconciled."),
+            })
+        st_lines -= done_lines
+        if not st_lines:
+            return log_vals
+
+        partner_map = st_lines._get_partner_map()
+        results = reconcile_models._apply_rules(st_lines, partner_map=partner_map)
+
+        # set the partners found on the lines left for review, one write per partner
+        lines_by_partner = defaultdict(list)
+        for st_line in st_lines:
+            result = results.get(st_line.id, {})
+            if result.get('status') == 'reconciled':
+                log_vals.append({
+                    'job_id': self.id,
+                    'st_line_id': st_line.id,
+                    'status': 'matched',
+                    'model_id': result.get('model') and result['model'].id,
+                    'partner_id': st_line.partner_id.id,
+                    'message': _("Reconciled with %s journal items.") % len(result.get('reconciled_lines') or []),
+                })
+                continue
+            partner_id = st_line.partner_id.id or partner_map.get(st_line.id)
+            if not st_line.partner_id and partner_id:
+                lines_by_partner[partner_id].append(st_line.id)
+            aml_ids = result.get('aml_ids') or []
+            log_vals.append({
+                'job_id': self.id,
+                'st_line_id': st_line.id,
+                'status': 'manual',
+                'model_id': result.get('model') and result['model'].id,
+                'partner_id': partner_id,
+                'message': aml_ids and _("%s journal items proposed.") % len(aml_ids) or _("No match found."),
+            })
+        StatementLine = self.env['account.bank.statement.line']
+        for partner_id, st_line_ids in lines_by_partner.items():
+            StatementLine.browse(st_line_ids).write({'partner_id': partner_id})
+        return log_vals
+
+
+class ReconcileJobLog(models.Model):
+    _name = 'account.reconcile.job.log'
+    _description = 'Bank Statement Auto-Reconciliation Log'
+    _order = 'id'
+
+    job_id = fields.Many2one('account.reconcile.job', string='Job',
+                             required=True, ondelete='cascade', index=True)
+    st_line_id = fields.Many2one('account.bank.statement.line',
+                                 string='Statement Line', ondelete='cascade')
+    status = fields.Selection([('matched', 'Auto-Matched'),
+                               ('manual', 'Left for Review'),
+                               ('skipped', 'Skipped'),
+                               ('failed', 'Failed')],
+                              string='Status', required=True)
+    model_id = fields.Many2one('account.reconcile.model',
+                               string='Reconciliation Model')
+    partner_id = fields.Many2one('res.partner', string='Partner')
+    message = fields.Char(string='Message')
+
+
+class AccountBankStatementJob(models.Model):
+    _inherit = 'account.bank.statement'
+
+    def action_auto_reconcile_in_background(self):
+        jobs = self.env['account.reconcile.job']._enqueue(self.mapped('line_ids'))
+        action = self.env['ir.actions.act_window']._for_xml_id(
+            'base_accounting_kit.action_account_reconcile_job')
+        if len(jobs) == 1:
+            action.update({'views': [(False, 'form')], 'res_id': jobs.id})
+        else:
+            action['domain'] = [('id', 'in', jobs.ids)]
+        return action
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+import functools
+import json
+import logging
+import threading
+import time
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+_call_logger = logging.getLogger(__name__ + '.calls')
+
+# 'model' records the calls in account.report.profile, 'log' logs them as
+# JSON lines, anything else disables the profiling
+PROFILE_MODE_PARAM = 'base_accounting_kit.profile_mode'
+PROFILE_SIZE_PARAM = 'base_accounting_kit.profile_buffer_size'
+PROFILE_BUFFER_SIZE = 1000
+PROFILE_PARAMS_SIZE = 1000
+
+_profile_local = threading.local()
+
+
+def _get_query_stats():
+    """ Return the number of queries and the SQL time of the current
+    thread, as counted by the cursors for the request log."""
+    thread = threading.current_thread()
+    if not hasattr(thread, 'query_count'):
+        thread.query_count = 0
+        thread.query_time = 0
+    return thread.query_count, thread.query_time
+
+
+def profiled(method):
+    """ Profile the calls of a dashboard or report entry point when the
+    ``base_accounting_kit.profile_mode`` system parameter is set."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        mode = self.env['ir.config_parameter'].sudo().get_param(PROFILE_MODE_PARAM)
+        if mode not in ('model', 'log'):
+            return method(self, *args, **kwargs)
+        return self.env['account.report.profile']._profile_call(
+            mode, method, self, args, kwargs)
+
+    return wrapper
+
+
+class ReportProfile(models.Model):
+    """ Ring buffer of the profiled dashboard and report calls."""
+    _name = 'account.report.profile'
+    _description = 'Accounting Report Call Profile'
+    _log_access = False
+    _order = 'total_time desc'
+    _rec_name = 'entry_point'
+
+    entry_point = fields.Char(string='Entry Point', readonly=True)
+    params = fields.Text(string='Parameters', readonly=True)
+    depth = fields.Integer(string='Depth', readonly=True,
+                           help='Number of profiled calls this one is nested in.')
+    query_count = fields.Integer(string='Queries', readonly=True)
+    sql_time = fields.Float(string='SQL Time (ms)', readonly=True)
+    python_time = fields.Float(string='Python Time (ms)', readonly=True)
+    total_time = fields.Float(string='Total Time (ms)', readonly=True)
+    rows_scanned = fields.Integer(string='Rows Scanned', readonly=True)
+    failed = fields.Boolean(string='Failed', readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True)
+    company_ids = fields.Char(string='Companies', readonly=True)
+    called_at = fields.Datetime(string='Called At', readonly=True)
+
+    @api.model
+    def _get_rows_scanned(self):
+        self._cr.execute("""
+            SELECT COALESCE(SUM(COALESCE(seq_tup_read, 0)
+                                + COALESCE(idx_tup_fetch, 0)), 0)
+            FROM pg_stat_xact_user_tables
+        """)
+        return int(self._cr.fetchone()[0])
+
+    @api.model
+    def _profile_call(self, mode, method, records, args, kwargs):
+        depth = getattr(_profile_local, 'depth', 0)
+        rows_before = self._get_rows_scanned()
+        count_before, sql_before = _get_query_stats()
+        start = time.perf_counter()
+        failed = True
+        _profile_local.depth = depth + 1
+        try:
+            result = method(records, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            _profile_local.depth = depth
+            total_time = time.perf_counter() - start
+            query_count, sql_time = _get_query_stats()
+            query_count -= count_before
+            sql_time -= sql_before
+            # an aborted transaction cannot be asked for its statistics
+            rows_scanned = 0 if failed else self._get_rows_scanned() - rows_before
+            params = repr(args) + (repr(kwargs) if kwargs else '')
+            vals = {
+                'entry_point': '%s.%s' % (records._name, method.__name__),
+                'params': params[:PROFILE_PARAMS_SIZE],
+                'depth': depth,
+                'query_count': query_count,
+                'sql_time': round(sql_time * 1000, 3),
+                'python_time': round((total_time - sql_time) * 1000, 3),
+                'total_time': round(total_time * 1000, 3),
+                'rows_scanned': rows_scanned,
+                'failed': failed,
+                'user_id': self.env.uid,
+                'company_ids': ','.join(str(company_id) for company_id in (
+                    records.env.context.get('dashboard_company_ids')
+                    or records.env.companies.ids)),
+                'called_at': fields.Datetime.now(),
+            }
+            if mode == 'log':
+                _call_logger.info(json.dumps(vals, default=str))
+            else:
+                self._store_call(vals)
+
+    @api.model
+    def _store_call(self, vals):
+        """ Insert the call in its own transaction, so that it is kept when
+        the profiled one is rolled back, and drop the calls beyond the
+        buffer size, oldest first."""
+        size = int(self.env['ir.config_parameter'].sudo().get_param(
+            PROFILE_SIZE_PARAM, PROFILE_BUFFER_SIZE))
+        columns = sorted(vals)
+        try:
+            with self.pool.cursor() as cr:
+                cr.execute("""
+                    INSERT INTO account_report_profile (%s) VALUES (%s)
+                """ % (', '.join(columns), ', '.join(['%s'] * len(columns))),
+                           [vals[column] for column in columns])
+                # whatever ids were skipped by rollbacks or concurrent calls
+                cr.execute("""
+                    DELETE FROM account_report_profile
+                    WHERE id <= (SELECT id FROM account_report_profile
+                                 ORDER BY id DESC OFFSET %s LIMIT 1)
+                """, (size,))
+        except Exception:
+            _logger.warning("Could not record the profile of %s",
+                            vals['entry_point'], exc_info=True)
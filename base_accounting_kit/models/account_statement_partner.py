@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+
+from odoo import api, fields, models
+from odoo.addons.base.models.res_bank import sanitize_account_number
+from odoo.tools import sql
+
+
+class StatementLinePartner(models.Model):
+    """ Partner resolution of imported statement lines.
+
+    The account number of a line is kept sanitized like the bank accounts'
+    one, so that both are matched on equality, and partner names are looked
+    up through a lowercase index. Every lookup is done once per batch of
+    lines and resolved in memory.
+    """
+    _inherit = 'account.bank.statement.line'
+
+    account_number_key = fields.Char(compute='_compute_account_number_key',
+                                     string='Sanitized Account Number',
+                                     store=True, readonly=True)
+
+    @api.depends('account_number')
+    def _compute_account_number_key(self):
+        for line in self:
+            line.account_number_key = line.account_number and sanitize_account_number(line.account_number) or False
+
+    def _auto_init(self):
+        # fill the column in one statement instead of computing it per line
+        if not sql.column_exists(self._cr, self._table, 'account_number_key'):
+            sql.create_column(self._cr, self._table, 'account_number_key', 'varchar')
+            self._cr.execute("""
+                UPDATE account_bank_statement_line
+                SET account_number_key = NULLIF(upper(regexp_replace(account_number, '\\W+', '', 'g')), '')
+                WHERE account_number IS NOT NULL
+            """)
+        return super(StatementLinePartner, self)._auto_init()
+
+    def _get_partner_map(self):
+        """ Returns the partner of every statement line: its own one, else the
+            holder of its bank account, else the commercial partner bearing its
+            partner name (case insensitive).
+
+            :return: dict mapping the line ids to a partner id or None
+        """
+        if not self:
+            return {}
+        self.flush(['partner_id', 'account_number_key', 'partner_name', 'move_id'])
+        self.env['account.move'].flush(['partner_bank_id'])
+        self._cr.execute("""
+            SELECT st_line.id, st_line.partner_id, st_line.account_number_key,
+                   lower(st_line.partner_name) AS partner_name, move.partner_bank_id
+            FROM account_bank_statement_line st_line
+            JOIN account_move move ON move.id = st_line.move_id
+            WHERE st_line.id IN %s
+        """, [tuple(self.ids)])
+        rows = self._cr.dictfetchall()
+        unresolved = [row for row in rows if not row['partner_id']]
+
+        bank_partners, number_partners = self._get_bank_account_partners(
+            set(row['partner_bank_id'] for row in unresolved if row['partner_bank_id']),
+            set(row['account_number_key'] for row in unresolved if row['account_number_key']))
+        name_partners = self._get_partner_name_partners(
+            set(row['partner_name'] for row in unresolved if row['partner_name']))
+
+        result = {}
+        for row in rows:
+            result[row['id']] = (row['partner_id']
+                                 or bank_partners.get(row['partner_bank_id'])
+                                 or number_partners.get(row['account_number_key'])
+                                 or name_partners.get(row['partner_name']))
+        return result
+
+    @api.model
+    def _get_bank_account_partners(self, bank_ids, account_numbers):
+        """ Returns the holders of the given bank accounts and of the bank
+            accounts having the given sanitized numbers, the record rules of
+            the bank accounts applied: identical accounts may exist in a company
+            we don't have access to.
+        """
+        if not bank_ids and not account_numbers:
+            return {}, {}
+        banks = self.env['res.partner.bank'].with_context(active_test=False).search([
+            '|', ('id', 'in', list(bank_ids)), ('sanitized_acc_number', 'in', list(account_numbers)),
+        ], order='id')
+        bank_partners = {}
+        number_partners = {}
+        for bank in banks:
+            bank_partners[bank.id] = bank.partner_id.id
+            number_partners.setdefault(bank.sanitized_acc_number, bank.partner_id.id)
+        return bank_partners, number_partners
+
+    @api.model
+    def _get_partner_name_partners(self, names):
+        """ Returns the commercial partners named like the given lowercase
+            names, the record rules of the partners applied.
+        """
+        if not names:
+            return {}
+        Partner = self.env['res.partner']
+        # By definition the commercial partner doesn't have a parent_id set
+        query = Partner._where_calc([('parent_id', '=', False)])
+        Partner._apply_ir_rules(query, 'read')
+        from_clause, where_clause, where_clause_params = query.get_sql()
+        Partner.flush(['name', 'parent_id'])
+        self._cr.execute("""
+            SELECT "res_partner".id, lower("res_partner".name)
+            FROM %s
+            WHERE %s AND lower("res_partner".name) IN %%s
+            ORDER BY "res_partner".id
+        """ % (from_clause, where_clause), where_clause_params + [tuple(names)])
+        name_partners = {}
+        for partner_id, name in self._cr.fetchall():
+            name_partners.setdefault(name, partner_id)
+        return name_partners
+
+
+class PartnerNameIndex(models.Model):
+    _inherit = 'res.partner'
+
+    def init(self):
+        super(PartnerNameIndex, self).init()
+        self._cr.execute("""
+            CREATE INDEX IF NOT EXISTS res_partner_commercial_lower_name_idx
+            ON res_partner (lower(name))
+            WHERE parent_id IS NULL
+        """)
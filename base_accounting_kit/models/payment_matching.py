@@ -1,10 +1,113 @@
 # -*- coding: utf-8 -*-
 
+import base64
+import bisect
 import copy
+import json
+import re
+import time
+from collections import defaultdict
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 from odoo.osv import expression
-from odoo.tools.misc import formatLang, format_date, parse_date
+from odoo.tools.misc import formatLang, format_date, get_lang, parse_date
+
+# shortest reference token worth matching, to skip words like "inv" or "no"
+REFERENCE_TOKEN_MIN_SIZE = 4
+
+# bounds of the search of open items summing up to a statement line amount
+COMBINATION_MAX_ITEMS = 4
+COMBINATION_TIME_BUDGET = 0.1
+# the halves of the meet in the middle are sorted and searched within the
+# time budget, which bounds the number of candidates, see _max_candidates
+COMBINATION_MAX_HALVES = 20000
+
+
+def _normalize_reference(value):
+    """ Returns the reference in uppercase without separators, so that
+    'INV/2021/0001' and 'inv 2021-0001' give the same token."""
+    return re.sub(r'[\W_]+', '', value or '').upper()
+
+
+def _count_halves(size, half_size):
+    """ Returns the number of combinations of up to ``half_size`` items among
+    ``size`` ones, the empty one included."""
+    count = term = 1
+    for items in range(1, half_size + 1):
+        term = term * (size - items + 1) // items
+        count += term
+    return count
+
+
+def _max_candidates(max_items):
+    """ Returns the number of items whose combinations of up to
+    ``max_items`` items can be searched, about 200 for 4 items."""
+    half_size = (max_items + 1) // 2
+    size = 0
+    while _count_halves(size + 1, half_size) <= COMBINATION_MAX_HALVES:
+        size += 1
+    return size
+
+
+def _find_amount_combinations(target, amounts, max_items=COMBINATION_MAX_ITEMS, tolerance=0,
+                              time_budget=COMBINATION_TIME_BUDGET, limit=5):
+    """ Returns up to ``limit`` combinations of at most ``max_items`` keys of
+    ``amounts`` whose values sum up to ``target``, within ``tolerance``.
+
+    Meet in the middle: the sums of all the combinations of up to half the
+    items are sorted once, then every such half, in the order of its items,
+    looks for its complement by bisection among the halves made of later
+    items only. Only the first ``_max_candidates(max_items)`` keys of
+    ``amounts`` are used, once the amounts above the target are left out,
+    the others are not searched at all. The search stops once
+    ``limit`` exact combinations are found or when ``time_budget`` seconds
+    are spent, keeping what was found.
+
+    :param target: amount to reach, in cents
+    :param amounts: dict mapping keys to amounts in cents, the most likely
+        to be part of a combination first
+    :return: list of (difference, keys) sorted by difference then size
+    """
+    deadline = time.perf_counter() + time_budget
+    keys = list(amounts)
+    if all(amount * target > 0 for amount in amounts.values()):
+        # without opposite amounts, an item above the target cannot be part of a combination
+        keys = [key for key in keys if abs(amounts[key]) <= abs(target) + tolerance]
+    half_size = (max_items + 1) // 2
+    size = min(len(keys), _max_candidates(max_items))
+    keys = keys[:size]
+    values = [amounts[key] for key in keys]
+    # (sum, first index, last index, indexes) of the combinations of up to half_size items, by size
+    halves = [(0, size, -1, ())]
+    previous = [(0, -1, -1, ())]
+    for dummy in range(half_size):
+        current = []
+        for total, first, last, indexes in previous:
+            if time.perf_counter() > deadline:
+                break
+            current += [(total + values[i], first if indexes else i, i, indexes + (i,))
+                        for i in range(last + 1, size)]
+        halves += current
+        previous = current
+    sorted_halves = sorted(halves)
+    sums = [half[0] for half in sorted_halves]
+
+    found = {}
+    exact_count = 0
+    for count, (first_sum, dummy, first_last, first) in enumerate(halves):
+        if exact_count >= limit or not count % 100 and time.perf_counter() > deadline:
+            break
+        start = bisect.bisect_left(sums, target - first_sum - tolerance)
+        stop = bisect.bisect_right(sums, target - first_sum + tolerance)
+        for second_sum, second_first, dummy, second in sorted_halves[start:stop]:
+            if second_first <= first_last or len(first) + len(second) > max_items:
+                continue
+            indexes = first + second
+            if indexes and indexes not in found:
+                found[indexes] = abs(target - first_sum - second_sum)
+                exact_count += not found[indexes]
+    combinations = sorted((difference, len(indexes), indexes) for indexes, difference in found.items())
+    return [(difference, [keys[i] for i in indexes]) for difference, dummy, indexes in combinations[:limit]]
 
 
 class AccountReconciliation(models.AbstractModel):
@@ -81,79 +184,126 @@ class AccountReconciliation(models.AbstractModel):
         domain = self._domain_move_lines_for_reconciliation(st_line, aml_accounts, partner_id, excluded_ids=excluded_ids, search_str=search_str, mode=mode)
         recs_count = self.env['account.move.line'].search_count(domain)
 
+        self.env['account.move'].flush()
+        self.env['account.move.line'].flush()
+        self.env['account.bank.statement'].flush()
+        res = self._search_move_lines_for_bank_statement_line(st_line, domain, limit=limit)
+
+        aml_recs = self.env['account.move.line'].browse([i[0] for i in res])
+        target_currency = st_line.currency_id or st_line.journal_id.currency_id or st_line.journal_id.company_id.currency_id
+        return self._prepare_move_lines(aml_recs, target_currency=target_currency, target_date=st_line.date, recs_count=recs_count)
+
+    @api.model
+    def get_move_lines_page_for_bank_statement_line(self, st_line_id, partner_id=None, excluded_ids=None, search_str=False, limit=None, mode=None, page_token=False, with_count=False):
+        """ Returns a page of the move lines for the bank statement
+            reconciliation widget, in the order of
+            get_move_lines_for_bank_statement_line.
+
+            The next page starts after the sort key of the last line of the
+            previous one, given back as an opaque token, so that scrolling
+            neither skips rows with an OFFSET nor counts them again.
+
+            :param page_token: token returned with the previous page, False for
+                the first page
+            :param with_count: whether to count the lines matching the domain,
+                only done on the first page, the count being carried by the
+                token and decreased page after page
+            :return: dict with the formatted 'lines', the 'next_token' (False
+                on the last page) and the 'approximate_count' of the lines left
+                from this page on (None if not counted)
+        """
+        st_line = self.env['account.bank.statement.line'].browse(st_line_id)
+
+        aml_accounts = [
+            st_line.journal_id.default_account_id.id
+        ]
+
+        if partner_id is None:
+            partner_id = st_line.partner_id.id
+
+        domain = self._domain_move_lines_for_reconciliation(st_line, aml_accounts, partner_id, excluded_ids=excluded_ids, search_str=search_str, mode=mode)
+        if page_token:
+            after, count = self._decode_page_token(page_token, st_line, mode)
+        else:
+            after = None
+            count = with_count and self.env['account.move.line'].search_count(domain) or None
+            self.env['account.move'].flush()
+            self.env['account.move.line'].flush()
+            self.env['account.bank.statement'].flush()
+
+        # one more row tells whether there is a next page
+        res = self._search_move_lines_for_bank_statement_line(st_line, domain, limit=limit and limit + 1, after=after)
+        next_token = False
+        if limit and len(res) > limit:
+            res = res[:limit]
+            left = count is not None and max(count - limit, 1) or None
+            next_token = self._encode_page_token(st_line, mode, res[-1], left)
+        elif count is not None:
+            count = len(res)
+
+        aml_recs = self.env['account.move.line'].browse([i[0] for i in res])
+        target_currency = st_line.currency_id or st_line.journal_id.currency_id or st_line.journal_id.company_id.currency_id
+        lines = self._prepare_move_lines(aml_recs, target_currency=target_currency, target_date=st_line.date, recs_count=count or 0)
+        return {
+            'lines': lines,
+            'next_token': next_token,
+            'approximate_count': count,
+        }
+
+    @api.model
+    def _search_move_lines_for_bank_statement_line(self, st_line, domain, limit=None, after=None):
+        """ Returns the (id, amount_mismatch, maturity_key) rows of the move
+            lines matching domain, the ones of the statement line's amount
+            first, then by maturity date (undated last) and id.
+
+            :param after: sort key of the row to start after, if any
+        """
         from_clause, where_clause, where_clause_params = self.env['account.move.line']._where_calc(domain).get_sql()
+        amount_mismatch = '("account_move_line".debit - "account_move_line".credit) != %s' % st_line.amount
+        maturity_key = "COALESCE(\"account_move_line\".date_maturity, 'infinity'::date)"
+        conditions = where_clause and [where_clause] or []
+        params = list(where_clause_params)
+        if after:
+            conditions.append('({0}, {1}, "account_move_line".id) > (%s, %s::date, %s)'.format(amount_mismatch, maturity_key))
+            params += list(after)
         query_str = '''
-            SELECT "account_move_line".id FROM {from_clause}
+            SELECT "account_move_line".id, {amount_mismatch}, {maturity_key}::text
+            FROM {from_clause}
             {where_str}
-            ORDER BY ("account_move_line".debit - "account_move_line".credit) = {amount} DESC,
-                "account_move_line".date_maturity ASC,
-                "account_move_line".id ASC
+            ORDER BY {amount_mismatch}, {maturity_key}, "account_move_line".id
             {limit_str}
         '''.format(
+            amount_mismatch=amount_mismatch,
+            maturity_key=maturity_key,
             from_clause=from_clause,
-            where_str=where_clause and (" WHERE %s" % where_clause) or '',
-            amount=st_line.amount,
+            where_str=conditions and (" WHERE %s" % ' AND '.join(conditions)) or '',
             limit_str=limit and ' LIMIT %s' or '',
         )
-        params = where_clause_params + (limit and [limit] or [])
-        self.env['account.move'].flush()
-        self.env['account.move.line'].flush()
-        self.env['account.bank.statement'].flush()
+        params += limit and [limit] or []
         self._cr.execute(query_str, params)
-        res = self._cr.fetchall()
-
-        aml_recs = self.env['account.move.line'].browse([i[0] for i in res])
-        target_currency = st_line.currency_id or st_line.journal_id.currency_id or st_line.journal_id.company_id.currency_id
-        return self._prepare_move_lines(aml_recs, target_currency=target_currency, target_date=st_line.date, recs_count=recs_count)
+        return self._cr.fetchall()
 
     @api.model
-    def _get_bank_statement_line_partners(self, st_lines):
-        params = []
+    def _encode_page_token(self, st_line, mode, row, count):
+        line_id, amount_mismatch, maturity_key = row
+        key = [st_line.id, mode, amount_mismatch, maturity_key, line_id, count]
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
 
-        # Add the res.partner.ban's IR rules. In case partners are not shared between companies,
-        # identical bank accounts may exist in a company we don't have access to.
-        ir_rules_query = self.env['res.partner.bank']._where_calc([])
-        self.env['res.partner.bank']._apply_ir_rules(ir_rules_query, 'read')
-        from_clause, where_clause, where_clause_params = ir_rules_query.get_sql()
-        if where_clause:
-            where_bank = ('AND %s' % where_clause).replace('res_partner_bank', 'bank')
-            params += where_clause_params
-        else:
-            where_bank = ''
+    @api.model
+    def _decode_page_token(self, page_token, st_line, mode):
+        """ Returns the sort key and the count carried by a page token."""
+        try:
+            st_line_id, token_mode, amount_mismatch, maturity_key, line_id, count = json.loads(
+                base64.urlsafe_b64decode(page_token.encode()).decode())
+        except (TypeError, ValueError):
+            raise UserError(_("Invalid page token."))
+        if st_line_id != st_line.id or token_mode != mode:
+            raise UserError(_("This page token belongs to another list of journal items."))
+        return (amount_mismatch, maturity_key, line_id), count
 
-        # Add the res.partner's IR rules. In case partners are not shared between companies,
-        # identical partners may exist in a company we don't have access to.
-        ir_rules_query = self.env['res.partner']._where_calc([])
-        self.env['res.partner']._apply_ir_rules(ir_rules_query, 'read')
-        from_clause, where_clause, where_clause_params = ir_rules_query.get_sql()
-        if where_clause:
-            where_partner = ('AND %s' % where_clause).replace('res_partner', 'p3')
-            params += where_clause_params
-        else:
-            where_partner = ''
-
-        query = '''
-            SELECT
-                st_line.id                          AS id,
-                COALESCE(p1.id,p2.id,p3.id)         AS partner_id
-            FROM account_bank_statement_line st_line
-            JOIN account_move move ON move.id = st_line.move_id
-        '''
-        query += "LEFT JOIN res_partner_bank bank ON bank.id = move.partner_bank_id OR bank.sanitized_acc_number ILIKE regexp_replace(st_line.account_number, '\W+', '', 'g') %s\n" % (where_bank)
-        query += 'LEFT JOIN res_partner p1 ON st_line.partner_id=p1.id \n'
-        query += 'LEFT JOIN res_partner p2 ON bank.partner_id=p2.id \n'
-        # By definition the commercial partner_id doesn't have a parent_id set
-        query += 'LEFT JOIN res_partner p3 ON p3.name ILIKE st_line.partner_name %s AND p3.parent_id is NULL \n' % (where_partner)
-        query += 'WHERE st_line.id IN %s'
-
-        params += [tuple(st_lines.ids)]
-
-        self._cr.execute(query, params)
-
-        result = {}
-        for res in self._cr.dictfetchall():
-            result[res['id']] = res['partner_id']
-        return result
+    @api.model
+    def _get_bank_statement_line_partners(self, st_lines):
+        return st_lines._get_partner_map()
 
     @api.model
     def get_bank_statement_line_data(self, st_line_ids, excluded_ids=None):
@@ -179,12 +329,18 @@ class AccountReconciliation(models.AbstractModel):
         # Make a search to preserve the table's order.
         bank_statement_lines = self.env['account.bank.statement.line'].search([('id', 'in', st_line_ids)])
         results['value_max'] = len(bank_statement_lines)
+        if not bank_statement_lines:
+            return results
         reconcile_model = self.env['account.reconcile.model'].search([('rule_type', '!=', 'writeoff_button')])
 
         # Search for missing partners when opening the reconciliation widget.
-        if bank_statement_lines:
-            partner_map = self._get_bank_statement_line_partners(bank_statement_lines)
-            matching_amls = reconcile_model._apply_rules(bank_statement_lines, excluded_ids=excluded_ids, partner_map=partner_map)
+        partner_map = self._get_bank_statement_line_partners(bank_statement_lines)
+        matching_amls = reconcile_model._apply_rules(bank_statement_lines, excluded_ids=excluded_ids, partner_map=partner_map)
+
+        # Index the open receivable/payable items once for the lines no rule matched.
+        unmatched_lines = bank_statement_lines.filtered(lambda l: not matching_amls[l.id].get('status') and not matching_amls[l.id]['aml_ids'])
+        open_items = unmatched_lines and self._get_open_items_index(unmatched_lines, excluded_ids=excluded_ids)
+        used_aml_ids = set(aml_id for res in matching_amls.values() for aml_id in res.get('aml_ids') or [])
 
         # Iterate on st_lines to keep the same order in the results list.
         bank_statements_left = self.env['account.bank.statement']
@@ -195,6 +351,9 @@ class AccountReconciliation(models.AbstractModel):
                 results['reconciled_aml_ids'] += reconciled_move_lines and reconciled_move_lines.ids or []
             else:
                 aml_ids = matching_amls[line.id]['aml_ids']
+                if line in unmatched_lines:
+                    aml_ids = self._match_open_items(open_items, line, partner_map.get(line.id), used_aml_ids)
+                    used_aml_ids.update(aml_ids)
                 bank_statements_left += line.statement_id
                 target_currency = line.currency_id or line.journal_id.currency_id or line.journal_id.company_id.currency_id
 
@@ -215,6 +374,181 @@ class AccountReconciliation(models.AbstractModel):
 
         return results
 
+    @api.model
+    def _get_open_items_index(self, st_lines, excluded_ids=None):
+        """ Returns the open receivable/payable items of the statement lines'
+            companies, read with one query and indexed by amount and reference
+            for _match_open_items.
+
+            :return: dict with 'items' mapping the item ids to their partner,
+                'amounts' mapping (company_id, amount_residual) to item ids and
+                'references' mapping the normalized move names, refs and payment
+                references to item ids
+        """
+        Account_move_line = self.env['account.move.line']
+        domain = self._domain_open_items(st_lines.mapped('company_id'), excluded_ids=excluded_ids)
+        query = Account_move_line._where_calc(domain)
+        Account_move_line._apply_ir_rules(query, 'read')
+        from_clause, where_clause, where_clause_params = query.get_sql()
+        Account_move_line.flush()
+        self.env['account.move'].flush(['name', 'ref', 'payment_reference'])
+        self._cr.execute("""
+            SELECT l.id, l.company_id, l.partner_id, l.amount_residual,
+                   move.name, move.ref, move.payment_reference
+            FROM account_move_line l
+            JOIN account_move move ON move.id = l.move_id
+            WHERE l.id IN (SELECT "account_move_line".id FROM {0} WHERE {1})
+        """.format(from_clause, where_clause), where_clause_params)
+
+        currencies = dict((company.id, company.currency_id) for company in st_lines.mapped('company_id'))
+        index = {
+            'items': {},
+            'amounts': defaultdict(set),
+            'references': defaultdict(set),
+        }
+        for aml_id, company_id, partner_id, amount_residual, name, ref, payment_reference in self._cr.fetchall():
+            index['items'][aml_id] = partner_id
+            index['amounts'][(company_id, currencies[company_id].round(amount_residual))].add(aml_id)
+            for reference in (name, ref, payment_reference):
+                token = _normalize_reference(reference)
+                if len(token) >= REFERENCE_TOKEN_MIN_SIZE:
+                    index['references'][token].add(aml_id)
+        return index
+
+    @api.model
+    def _domain_open_items(self, companies, excluded_ids=None):
+        """ Returns the domain of the open receivable/payable items."""
+        domain = [
+            ('company_id', 'in', companies.ids),
+            ('parent_state', '=', 'posted'),
+            ('reconciled', '=', False),
+            ('full_reconcile_id', '=', False),
+            ('account_reconcile', '=', True),
+            ('account_internal_type', 'in', ('receivable', 'payable')),
+            ('amount_residual', '!=', 0.0),
+        ]
+        if excluded_ids:
+            domain.append(('id', 'not in', list(excluded_ids)))
+        return domain
+
+    @api.model
+    def _match_open_items(self, index, st_line, partner_id=None, used_aml_ids=()):
+        """ Returns the id of the only open item whose residual is the
+            statement line's amount and which is referenced by the line, or
+            else the only one of its partner with that amount, as a list.
+        """
+        company = st_line.company_id
+        if st_line.foreign_currency_id or st_line.currency_id != company.currency_id:
+            return []
+        candidates = index['amounts'].get((company.id, company.currency_id.round(st_line.amount)), set()) - set(used_aml_ids)
+        if not candidates:
+            return []
+
+        tokens = set()
+        for reference in (st_line.payment_ref, st_line.ref):
+            tokens.add(_normalize_reference(reference))
+            tokens.update(_normalize_reference(word) for word in (reference or '').split())
+        referenced = set()
+        for token in tokens:
+            if len(token) >= REFERENCE_TOKEN_MIN_SIZE:
+                referenced |= index['references'].get(token, set())
+        partner_id = st_line.partner_id.id or partner_id
+
+        matches = candidates & referenced
+        if partner_id:
+            partner_candidates = set(aml_id for aml_id in candidates if index['items'][aml_id] == partner_id)
+            matches = matches & partner_candidates or matches or partner_candidates
+        return len(matches) == 1 and list(matches) or []
+
+    @api.model
+    def get_move_line_combinations_for_bank_statement_line(self, st_line_id, partner_id=None, excluded_ids=None, max_items=COMBINATION_MAX_ITEMS, tolerance=0.0, limit=5):
+        """ Returns the combinations of open items of a partner whose
+            residual amounts sum up to the amount of a statement line, formatted
+            for the bank statement reconciliation widget.
+
+            :param st_line_id: id of the statement line
+            :param partner_id: optional partner id, the statement line's one by
+                default
+            :param excluded_ids: optional move lines ids excluded from the
+                combinations
+            :param max_items: maximum number of items of a combination
+            :param tolerance: accepted difference with the statement line amount
+            :param limit: maximum number of combinations
+            :return: dict with the 'combinations', a list of dicts with the
+                'difference' and the formatted 'lines' of each combination, the
+                closest first, and whether the search was 'truncated' to the
+                partner's oldest open items
+        """
+        st_line = self.env['account.bank.statement.line'].browse(st_line_id)
+        if partner_id is None:
+            partner_id = st_line.partner_id.id
+        target_currency = st_line.currency_id or st_line.journal_id.currency_id or st_line.journal_id.company_id.currency_id
+        combinations, truncated = self._get_amount_combinations(
+            st_line, partner_id, excluded_ids=excluded_ids, max_items=max_items, tolerance=tolerance, limit=limit)
+        return {
+            'combinations': [{
+                'difference': difference,
+                'lines': self._prepare_move_lines(amls, target_currency=target_currency, target_date=st_line.date),
+            } for difference, amls in combinations],
+            'truncated': truncated,
+        }
+
+    @api.model
+    def _get_amount_combinations(self, st_line, partner_id, excluded_ids=None, max_items=COMBINATION_MAX_ITEMS, tolerance=0.0, limit=5):
+        """ Returns up to limit (difference, move lines) combinations of the
+            open items of the partner matching the statement line amount, see
+            _find_amount_combinations, and whether the partner has more open
+            items than the search can look at, the oldest due being searched.
+            Only the statement lines in company currency are matched.
+        """
+        company = st_line.company_id
+        if not partner_id or st_line.foreign_currency_id or st_line.currency_id != company.currency_id:
+            return [], False
+        domain = self._domain_open_items(company, excluded_ids=excluded_ids) + [('partner_id', '=', partner_id)]
+        max_candidates = _max_candidates(max_items)
+        # one more item tells whether some are left out
+        items = self.env['account.move.line'].search_read(domain, ['amount_residual'], order='date_maturity, id', limit=max_candidates + 1)
+        truncated = len(items) > max_candidates
+        factor = 10 ** company.currency_id.decimal_places
+        amounts = dict((item['id'], int(round(item['amount_residual'] * factor))) for item in items[:max_candidates])
+        combinations = _find_amount_combinations(int(round(st_line.amount * factor)), amounts, max_items=max_items,
+                                                 tolerance=int(round(tolerance * factor)), limit=limit)
+        return [(difference / factor, self.env['account.move.line'].browse(aml_ids))
+                for difference, aml_ids in combinations], truncated
+
+    @api.model
+    def compute_taxes_batch(self, requests):
+        """ Computes the taxes of several write-offs of the reconciliation
+            widget at once, like account.tax's json_friendly_compute_all.
+
+            The taxes of all the requests, their children and repartition lines
+            are read together once, and identical requests are computed once.
+
+            :param requests: list of dicts with the 'tax_ids', the 'amount', the
+                'currency_id' and whether to 'force_price_include' of each
+                write-off
+            :return: list of the compute_all results, in the order of requests
+        """
+        Tax = self.env['account.tax']
+        all_taxes = Tax.browse(set(tax_id for request in requests for tax_id in request['tax_ids']))
+        # read the tax trees in batch, compute_all then walks them from the cache
+        all_taxes.mapped('children_tax_ids.children_tax_ids')
+        (all_taxes | all_taxes.children_tax_ids).mapped('invoice_repartition_line_ids.tag_ids')
+        (all_taxes | all_taxes.children_tax_ids).mapped('refund_repartition_line_ids.tag_ids')
+
+        results = {}
+        res = []
+        for request in requests:
+            key = (tuple(request['tax_ids']), request['amount'], request.get('currency_id'),
+                   bool(request.get('force_price_include')))
+            if key not in results:
+                taxes = Tax.browse(key[0]).with_prefetch(all_taxes._prefetch_ids)
+                if key[3]:
+                    taxes = taxes.with_context(force_price_include=True)
+                results[key] = taxes.json_friendly_compute_all(request['amount'], currency_id=key[2])
+            res.append(results[key])
+        return res
+
     @api.model
     def get_bank_statement_data(self, bank_statement_line_ids, srch_domain=[]):
         """ Get statement lines of the specified statements or all unreconciled
@@ -275,9 +609,11 @@ class AccountReconciliation(models.AbstractModel):
         return self._prepare_move_lines(lines, target_currency=target_currency,recs_count=recs_count)
 
     @api.model
-    def get_all_data_for_manual_reconciliation(self, partner_ids, account_ids):
+    def get_all_data_for_manual_reconciliation(self, partner_ids, account_ids, lazy=False):
         """ Returns the data required for the invoices & payments matching of partners/accounts.
             If an argument is None, fetch all related reconciliations. Use [] to fetch nothing.
+            In lazy mode, the rows come without their reconciliation proposition, see
+            get_data_for_manual_reconciliation.
         """
         MoveLine = self.env['account.move.line']
         aml_ids = self._context.get('active_ids') and self._context.get('active_model') == 'account.move.line' and tuple(self._context.get('active_ids'))
@@ -303,15 +639,15 @@ class AccountReconciliation(models.AbstractModel):
         # is never done.
         accounts_data = []
         if not partner_ids or not any(partner_ids):
-            accounts_data = self.get_data_for_manual_reconciliation('account', account_ids)
+            accounts_data = self.get_data_for_manual_reconciliation('account', account_ids, lazy=lazy)
         return {
-            'customers': self.get_data_for_manual_reconciliation('partner', partner_ids, 'receivable'),
-            'suppliers': self.get_data_for_manual_reconciliation('partner', partner_ids, 'payable'),
+            'customers': self.get_data_for_manual_reconciliation('partner', partner_ids, 'receivable', lazy=lazy),
+            'suppliers': self.get_data_for_manual_reconciliation('partner', partner_ids, 'payable', lazy=lazy),
             'accounts': accounts_data,
         }
 
     @api.model
-    def get_data_for_manual_reconciliation(self, res_type, res_ids=None, account_type=None):
+    def get_data_for_manual_reconciliation(self, res_type, res_ids=None, account_type=None, lazy=False):
         """ Returns the data required for the invoices & payments matching of partners/accounts (list of dicts).
             If no res_ids is passed, returns data for all partners/accounts that can be reconciled.
 
@@ -320,6 +656,8 @@ class AccountReconciliation(models.AbstractModel):
                 of the id, use [] to prevent from fetching any data at all.
             :param account_type: if a partner is both customer and vendor, you can use 'payable' to reconcile
                 the vendor-related journal entries and 'receivable' for the customer-related entries.
+            :param lazy: only return the header of the rows, without their reconciliation proposition, to be
+                fetched page by page with get_manual_reconciliation_propositions
         """
 
         Account = self.env['account.account']
@@ -372,13 +710,14 @@ class AccountReconciliation(models.AbstractModel):
             )
         """.format(inner_where=is_partner and 'AND l.partner_id = p.id' or ' ')
         query = ("""
-            SELECT {select} account_id, account_name, account_code, max_date
+            SELECT {select} account_id, account_name, account_code, max_date, line_count
             FROM (
                     SELECT {inner_select}
                         a.id AS account_id,
                         a.name AS account_name,
                         a.code AS account_code,
-                        MAX(l.write_date) AS max_date
+                        MAX(l.write_date) AS max_date,
+                        COUNT(l.id) AS line_count
                     FROM
                         account_move_line l
                         RIGHT JOIN account_account a ON (a.id = l.account_id)
@@ -433,33 +772,73 @@ class AccountReconciliation(models.AbstractModel):
             mode = 'customers' if account_type == 'receivable' else 'suppliers'
 
         # Fetch other data
+        accounts = dict((account.id, account) for account in Account.browse(set(row['account_id'] for row in rows)))
         for row in rows:
-            account = Account.browse(row['account_id'])
+            account = accounts[row['account_id']]
             currency = account.currency_id or account.company_id.currency_id
             row['currency_id'] = currency.id
-            partner_id = is_partner and row['partner_id'] or None
-            rec_prop = aml_ids and self.env['account.move.line'].browse(aml_ids) or self._get_move_line_reconciliation_proposition(account.id, partner_id)
-            row['reconciliation_proposition'] = self._prepare_move_lines(rec_prop, target_currency=currency)
             row['mode'] = mode
             row['company_id'] = account.company_id.id
+        if lazy:
+            return rows
+        self._set_manual_reconciliation_propositions(rows)
 
         # Return the partners with a reconciliation proposition first, since they are most likely to
         # be reconciled.
         return [r for r in rows if r['reconciliation_proposition']] + [r for r in rows if not r['reconciliation_proposition']]
 
     @api.model
-    def process_move_lines(self, data):
+    def get_manual_reconciliation_propositions(self, rows):
+        """ Returns the reconciliation propositions of a page of the rows
+            returned by get_data_for_manual_reconciliation in lazy mode.
+
+            :param rows: list of dicts with the 'mode', the 'account_id' and,
+                unless the mode is 'accounts', the 'partner_id' of the rows
+            :return: list of the formatted propositions, in the order of rows
+        """
+        rows = [{
+            'mode': row['mode'],
+            'account_id': row['account_id'],
+            'partner_id': row.get('partner_id') or False,
+        } for row in rows]
+        self._set_manual_reconciliation_propositions(rows)
+        return [row['reconciliation_proposition'] for row in rows]
+
+    @api.model
+    def _set_manual_reconciliation_propositions(self, rows):
+        """ Sets the formatted reconciliation proposition of manual
+            reconciliation rows, the opposite lines of all the rows being
+            looked for at once.
+        """
+        aml_ids = self._context.get('active_ids') and self._context.get('active_model') == 'account.move.line' and tuple(self._context.get('active_ids'))
+        accounts = dict((account.id, account) for account in self.env['account.account'].browse(set(row['account_id'] for row in rows)))
+        keys = [(row['account_id'], row['mode'] != 'accounts' and row['partner_id'] or None) for row in rows]
+        propositions = not aml_ids and self._get_move_line_reconciliation_propositions(keys) or {}
+        for row, key in zip(rows, keys):
+            account = accounts[row['account_id']]
+            currency = account.currency_id or account.company_id.currency_id
+            rec_prop = aml_ids and self.env['account.move.line'].browse(aml_ids) or propositions.get(key, self.env['account.move.line'])
+            row['reconciliation_proposition'] = self._prepare_move_lines(rec_prop, target_currency=currency)
+
+    @api.model
+    def process_move_lines(self, data, batch=False):
         """ Used to validate a batch of reconciliations in a single call
             :param data: list of dicts containing:
                 - 'type': either 'partner' or 'account'
                 - 'id': id of the affected res.partner or account.account
                 - 'mv_line_ids': ids of existing account.move.line to reconcile
                 - 'new_mv_line_dicts': list of dicts containing values suitable for account_move_line.create()
+            :param batch: create the write-offs of all the reconciliations together and flush once at the end,
+                see _process_move_lines_batch
+            :returns: in batch mode, the result of every reconciliation, in the order of data
         """
 
         Partner = self.env['res.partner']
         Account = self.env['account.account']
 
+        if batch:
+            return self._process_move_lines_batch(data)
+
         for datum in data:
             if len(datum['mv_line_ids']) >= 1 or len(datum['mv_line_ids']) + len(datum['new_mv_line_dicts']) >= 2:
                 self._process_move_lines(datum['mv_line_ids'], datum['new_mv_line_dicts'])
@@ -627,37 +1006,56 @@ class AccountReconciliation(models.AbstractModel):
         context = dict(self._context or {})
         ret = []
 
-        for line in move_lines:
-            company_currency = line.company_id.currency_id
-            line_currency = (line.currency_id and line.amount_currency) and line.currency_id or company_currency
+        # read every line at once, then convert and format them from memory
+        rows = self._read_move_lines_for_widget(move_lines)
+        format_line_date, format_amount = self._get_widget_formatters()
+        Currency = self.env['res.currency']
+        Company = self.env['res.company']
+        rates = {}
+        account_names = dict(self.env['account.account'].browse(
+            set(row['account_id'] for row in rows.values())).name_get())
+        journal_names = dict(self.env['account.journal'].browse(
+            set(row['journal_id'] for row in rows.values())).name_get())
+
+        def convert(amount, from_currency, to_currency, company, date):
+            key = (from_currency.id, to_currency.id, company.id, date)
+            if key not in rates:
+                rates[key] = Currency._get_conversion_rate(from_currency, to_currency, company, date)
+            return to_currency.round(amount * rates[key])
+
+        for line_id in move_lines.ids:
+            line = rows[line_id]
+            company_currency = Currency.browse(line['company_currency_id'])
+            aml_currency = line['currency_id'] and Currency.browse(line['currency_id'])
+            line_currency = (aml_currency and line['amount_currency']) and aml_currency or company_currency
             ret_line = {
-                'id': line.id,
-                'name': line.name and line.name != '/' and line.move_id.name != line.name and line.move_id.name + ': ' + line.name or line.move_id.name,
-                'ref': line.move_id.ref or '',
+                'id': line_id,
+                'name': line['name'] and line['name'] != '/' and line['move_name'] != line['name'] and line['move_name'] + ': ' + line['name'] or line['move_name'],
+                'ref': line['move_ref'] or '',
                 # For reconciliation between statement transactions and already registered payments (eg. checks)
                 # NB : we don't use the 'reconciled' field because the line we're selecting is not the one that gets reconciled
-                'account_id': [line.account_id.id, line.account_id.display_name],
-                'already_paid': line.account_id.internal_type == 'liquidity',
-                'account_code': line.account_id.code,
-                'account_name': line.account_id.name,
-                'account_type': line.account_id.internal_type,
-                'date_maturity': format_date(self.env, line.date_maturity),
-                'date': format_date(self.env, line.date),
-                'journal_id': [line.journal_id.id, line.journal_id.display_name],
-                'partner_id': line.partner_id.id,
-                'partner_name': line.partner_id.name,
+                'account_id': [line['account_id'], account_names[line['account_id']]],
+                'already_paid': line['account_type'] == 'liquidity',
+                'account_code': line['account_code'],
+                'account_name': line['account_name'],
+                'account_type': line['account_type'],
+                'date_maturity': format_line_date(line['date_maturity']),
+                'date': format_line_date(line['date']),
+                'journal_id': [line['journal_id'], journal_names[line['journal_id']]],
+                'partner_id': line['partner_id'] or False,
+                'partner_name': line['partner_name'] or False,
                 'currency_id': line_currency.id,
             }
 
-            debit = line.debit
-            credit = line.credit
-            amount = line.amount_residual
-            amount_currency = line.amount_residual_currency
+            debit = line['debit']
+            credit = line['credit']
+            amount = line['amount_residual']
+            amount_currency = line['amount_residual_currency']
 
             # For already reconciled lines, don't use amount_residual(_currency)
-            if line.account_id.internal_type == 'liquidity':
+            if line['account_type'] == 'liquidity':
                 amount = debit - credit
-                amount_currency = line.amount_currency
+                amount_currency = line['amount_currency']
 
             target_currency = target_currency or company_currency
 
@@ -690,33 +1088,84 @@ class AccountReconciliation(models.AbstractModel):
                     amount = amount
                     amount_currency = amount_currency
                     total_amount = debit - credit
-                    total_amount_currency = line.amount_currency
+                    total_amount_currency = line['amount_currency']
 
             if target_currency != company_currency:
                 if line_currency == target_currency:
                     amount = amount_currency
                     amount_currency = ""
-                    total_amount = line.amount_currency
+                    total_amount = line['amount_currency']
                     total_amount_currency = ""
                 else:
-                    amount_currency = line.currency_id and amount_currency or amount
-                    company = line.account_id.company_id
-                    date = target_date or line.date
-                    amount = company_currency._convert(amount, target_currency, company, date)
-                    total_amount = company_currency._convert((line.debit - line.credit), target_currency, company, date)
-                    total_amount_currency = line.currency_id and line.amount_currency or (line.debit - line.credit)
+                    amount_currency = aml_currency and amount_currency or amount
+                    company = Company.browse(line['account_company_id'])
+                    date = target_date or line['date']
+                    amount = convert(amount, company_currency, target_currency, company, date)
+                    total_amount = convert((debit - credit), company_currency, target_currency, company, date)
+                    total_amount_currency = aml_currency and line['amount_currency'] or (debit - credit)
 
             ret_line['recs_count'] = recs_count
             ret_line['debit'] = amount > 0 and amount or 0
             ret_line['credit'] = amount < 0 and -amount or 0
             ret_line['amount_currency'] = amount_currency
-            ret_line['amount_str'] = formatLang(self.env, abs(amount), currency_obj=target_currency)
-            ret_line['total_amount_str'] = formatLang(self.env, abs(total_amount), currency_obj=target_currency)
-            ret_line['amount_currency_str'] = amount_currency and formatLang(self.env, abs(amount_currency), currency_obj=line_currency) or ""
-            ret_line['total_amount_currency_str'] = total_amount_currency and formatLang(self.env, abs(total_amount_currency), currency_obj=line_currency) or ""
+            ret_line['amount_str'] = format_amount(abs(amount), target_currency)
+            ret_line['total_amount_str'] = format_amount(abs(total_amount), target_currency)
+            ret_line['amount_currency_str'] = amount_currency and format_amount(abs(amount_currency), line_currency) or ""
+            ret_line['total_amount_currency_str'] = total_amount_currency and format_amount(abs(total_amount_currency), line_currency) or ""
             ret.append(ret_line)
         return ret
 
+    @api.model
+    def _read_move_lines_for_widget(self, move_lines):
+        """ Read the columns shown by the reconciliation widget for all the
+        given move lines with one query, as dictionaries keyed by line id."""
+        if not move_lines:
+            return {}
+        self.env['account.move.line'].flush()
+        self._cr.execute("""
+            SELECT l.id, l.name, l.date, l.date_maturity, l.debit, l.credit,
+                   l.amount_currency, l.amount_residual, l.amount_residual_currency,
+                   l.currency_id, l.partner_id, l.account_id, l.journal_id,
+                   m.name AS move_name, m.ref AS move_ref,
+                   a.code AS account_code, a.name AS account_name,
+                   a.internal_type AS account_type, a.company_id AS account_company_id,
+                   p.name AS partner_name, c.currency_id AS company_currency_id
+            FROM account_move_line l
+            JOIN account_move m ON m.id = l.move_id
+            JOIN account_account a ON a.id = l.account_id
+            JOIN res_company c ON c.id = l.company_id
+            LEFT JOIN res_partner p ON p.id = l.partner_id
+            WHERE l.id IN %s
+        """, [tuple(move_lines.ids)])
+        return dict((row['id'], row) for row in self._cr.dictfetchall())
+
+    @api.model
+    def _get_widget_formatters(self):
+        """ Return functions formatting dates and amounts like format_date
+        and formatLang do, computed once per date and once per currency."""
+        lang = get_lang(self.env)
+        dates = {}
+        patterns = {}
+
+        def format_line_date(value):
+            if value not in dates:
+                dates[value] = format_date(self.env, value)
+            return dates[value]
+
+        def format_amount(value, currency):
+            if currency.id not in patterns:
+                patterns[currency.id] = ('%.' + str(currency.decimal_places) + 'f',
+                                         currency.symbol, currency.position)
+            pattern, symbol, position = patterns[currency.id]
+            res = lang.format(pattern, value, grouping=True)
+            if symbol and position == 'after':
+                res = '%s\N{NO-BREAK SPACE}%s' % (res, symbol)
+            elif symbol and position == 'before':
+                res = '%s\N{NO-BREAK SPACE}%s' % (symbol, res)
+            return res
+
+        return format_line_date, format_amount
+
     @api.model
     def _get_statement_line(self, st_line):
         """ Returns the data required by the bank statement reconciliation widget to display a statement line """
@@ -762,54 +1211,67 @@ class AccountReconciliation(models.AbstractModel):
     @api.model
     def _get_move_line_reconciliation_proposition(self, account_id, partner_id=None):
         """ Returns two lines whose amount are opposite """
+        key = (account_id, partner_id or None)
+        return self._get_move_line_reconciliation_propositions([key]).get(key, self.env['account.move.line'])
 
+    @api.model
+    def _get_move_line_reconciliation_propositions(self, keys):
+        """ Returns, for every (account_id, partner_id) key, two lines of that
+            account (and partner, unless it is None) whose amounts are opposite.
+
+            The open lines of all the keys are matched with a single hash join
+            on their residual amount, instead of one self-join per key.
+
+            :param keys: list of (account_id, partner_id or None) tuples
+            :return: dict mapping the keys having a proposition to the lines
+        """
         Account_move_line = self.env['account.move.line']
 
+        # a move line in the context makes the single key query return nothing
+        if not keys or self.env.context.get('move_line_id'):
+            return {}
+
         ir_rules_query = Account_move_line._where_calc([])
         Account_move_line._apply_ir_rules(ir_rules_query, 'read')
         from_clause, where_clause, where_clause_params = ir_rules_query.get_sql()
         where_str = where_clause and (" WHERE %s" % where_clause) or ''
 
-        # Get pairs
         query = """
-            SELECT a.id, b.id
-            FROM account_move_line a, account_move_line b,
-                 account_move move_a, account_move move_b,
-                 account_journal journal_a, account_journal journal_b
-            WHERE a.id != b.id
-            AND move_a.id = a.move_id
-            AND move_a.state = 'posted' 
-            AND move_a.journal_id = journal_a.id
-            AND move_b.id = b.move_id
-            AND move_b.journal_id = journal_b.id
-            AND move_b.state = 'posted' 
-            AND a.amount_residual = -b.amount_residual
-            AND a.balance != 0.0
-            AND b.balance != 0.0
-            AND NOT a.reconciled
-            AND a.account_id = %s
-            AND (%s IS NULL AND b.account_id = %s)
-            AND (%s IS NULL AND NOT b.reconciled OR b.id = %s)
-            AND (%s is NULL OR (a.partner_id = %s AND b.partner_id = %s))
-            AND a.id IN (SELECT "account_move_line".id FROM {0})
-            AND b.id IN (SELECT "account_move_line".id FROM {0})
-            ORDER BY a.date desc
-            LIMIT 1
+            WITH proposition_key AS (
+                SELECT DISTINCT account_id, partner_id
+                FROM unnest(%s::int[], %s::int[]) AS k(account_id, partner_id)
+            ),
+            candidate AS (
+                SELECT k.account_id, COALESCE(k.partner_id, 0) AS partner_key,
+                       l.id, l.date, l.amount_residual
+                FROM proposition_key k
+                JOIN account_move_line l ON l.account_id = k.account_id
+                    AND (k.partner_id IS NULL OR l.partner_id = k.partner_id)
+                JOIN account_move move ON move.id = l.move_id
+                WHERE move.state = 'posted'
+                AND l.balance != 0.0
+                AND NOT l.reconciled
+                AND l.id IN (SELECT "account_move_line".id FROM {0})
+            )
+            SELECT DISTINCT ON (a.account_id, a.partner_key)
+                   a.account_id, a.partner_key, a.id, b.id
+            FROM candidate a
+            JOIN candidate b ON b.account_id = a.account_id
+                AND b.partner_key = a.partner_key
+                AND b.amount_residual = -a.amount_residual
+                AND b.id != a.id
+            ORDER BY a.account_id, a.partner_key, a.date desc
             """.format(from_clause + where_str)
-        move_line_id = self.env.context.get('move_line_id') or None
         params = [
-            account_id,
-            move_line_id, account_id,
-            move_line_id, move_line_id,
-            partner_id, partner_id, partner_id,
-        ] + where_clause_params + where_clause_params
+            [key[0] for key in keys],
+            [key[1] for key in keys],
+        ] + where_clause_params
         self.env.cr.execute(query, params)
 
-        pairs = self.env.cr.fetchall()
-
-        if pairs:
-            return Account_move_line.browse(pairs[0])
-        return Account_move_line
+        propositions = {}
+        for account_id, partner_key, line_a_id, line_b_id in self.env.cr.fetchall():
+            propositions[(account_id, partner_key or None)] = Account_move_line.browse([line_a_id, line_b_id])
+        return propositions
 
     @api.model
     def _process_move_lines(self, move_line_ids, new_mv_line_dicts):
@@ -825,22 +1287,87 @@ class AccountReconciliation(models.AbstractModel):
 
         # Create writeoff move lines
         if len(new_mv_line_dicts) > 0:
-            company_currency = account_move_line[0].account_id.company_id.currency_id
-            same_currency = False
-            currencies = list(set([aml.currency_id or company_currency for aml in account_move_line]))
-            if len(currencies) == 1 and currencies[0] != company_currency:
-                same_currency = True
-            # We don't have to convert debit/credit to currency as all values in the reconciliation widget are displayed in company currency
-            # If all the lines are in the same currency, create writeoff entry with same currency also
+            self._prepare_writeoff_currency(account_move_line, new_mv_line_dicts)
             for mv_line_dict in new_mv_line_dicts:
-                if not same_currency:
-                    mv_line_dict['amount_currency'] = False
                 writeoff_lines += account_move_line._create_writeoff([mv_line_dict])
 
             (account_move_line + writeoff_lines).reconcile()
         else:
             account_move_line.reconcile()
 
+    @api.model
+    def _prepare_writeoff_currency(self, move_lines, new_mv_line_dicts):
+        company_currency = move_lines[0].account_id.company_id.currency_id
+        same_currency = False
+        currencies = list(set([aml.currency_id or company_currency for aml in move_lines]))
+        if len(currencies) == 1 and currencies[0] != company_currency:
+            same_currency = True
+        # We don't have to convert debit/credit to currency as all values in the reconciliation widget are displayed in company currency
+        # If all the lines are in the same currency, create writeoff entry with same currency also
+        for mv_line_dict in new_mv_line_dicts:
+            if not same_currency:
+                mv_line_dict['amount_currency'] = False
+
+    @api.model
+    def _process_move_lines_batch(self, data):
+        """ Validate the reconciliations of process_move_lines together: the
+            write-off entries of all of them, one per write-off like
+            _process_move_lines does, are created with one create per journal
+            and posted at once, then every reconciliation is done and
+            the whole is flushed a single time at the end.
+
+            :returns: list of dicts with the 'writeoff_line_ids' and the
+                'reconciled_line_ids' of every reconciliation, in the order of data
+        """
+        AccountMoveLine = self.env['account.move.line']
+        AccountMove = self.env['account.move']
+        groups = []
+        writeoff_vals_by_journal = defaultdict(list)
+        for datum in data:
+            move_line_ids = datum['mv_line_ids']
+            new_mv_line_dicts = datum['new_mv_line_dicts']
+            move_lines = AccountMoveLine.browse(move_line_ids)
+            group = {'move_lines': move_lines, 'writeoff_moves': []}
+            groups.append(group)
+            if not (len(move_line_ids) >= 1 or len(move_line_ids) + len(new_mv_line_dicts) >= 2):
+                continue
+            if len(move_line_ids) < 1 or len(move_line_ids) + len(new_mv_line_dicts) < 2:
+                raise UserError(_('A reconciliation must involve at least 2 move lines.'))
+            if new_mv_line_dicts:
+                self._prepare_writeoff_currency(move_lines, new_mv_line_dicts)
+                # a write-off entry per dict, like _process_move_lines
+                for mv_line_dict in new_mv_line_dicts:
+                    for move_vals in move_lines._prepare_writeoff_moves([mv_line_dict]):
+                        writeoff_vals_by_journal[move_vals['journal_id']].append((group, move_vals))
+
+        writeoff_moves = AccountMove
+        for journal_id, group_vals in writeoff_vals_by_journal.items():
+            moves = AccountMove.create([move_vals for group, move_vals in group_vals])
+            for (group, move_vals), move in zip(group_vals, moves):
+                group['writeoff_moves'].append(move)
+            writeoff_moves |= moves
+        if writeoff_moves:
+            writeoff_moves.action_post()
+
+        results = []
+        partners = self.env['res.partner']
+        for datum, group in zip(data, groups):
+            move_lines = group['move_lines']
+            writeoff_lines = AccountMoveLine
+            for move in group['writeoff_moves']:
+                writeoff_lines += move.line_ids.filtered(lambda r: r.account_id == move_lines[0].account_id).sorted(key='id')[-1:]
+            if move_lines:
+                (move_lines + writeoff_lines).reconcile()
+            if datum['type'] == 'partner':
+                partners |= partners.browse(datum['id'])
+            results.append({
+                'writeoff_line_ids': writeoff_lines.ids,
+                'reconciled_line_ids': (move_lines + writeoff_lines).ids,
+            })
+        partners.mark_as_reconciled()
+        self.env['base'].flush()
+        return results
+
 
 class AccountInvoiceLine(models.Model):
     _inherit = 'account.move.line'
@@ -851,6 +1378,20 @@ class AccountInvoiceLine(models.Model):
             :param writeoff_vals: list of dicts containing values suitable for account_move_line.create(). The data in vals will
                 be processed to create bot writeoff account.move.line and their enclosing account.move.
         """
+        writeoff_moves = self.env['account.move'].create(self._prepare_writeoff_moves(writeoff_vals))
+        line_to_reconcile = self.env['account.move.line']
+        for writeoff_move in writeoff_moves:
+            line_to_reconcile += writeoff_move.line_ids.filtered(lambda r: r.account_id == self[0].account_id).sorted(key='id')[-1:]
+
+        #post all the writeoff moves at once
+        if writeoff_moves:
+            writeoff_moves.action_post()
+
+        # Return the writeoff move.line which is to be reconciled
+        return line_to_reconcile
+
+    def _prepare_writeoff_moves(self, writeoff_vals):
+        """ Returns the values of the writeoff moves of _create_writeoff, one per journal."""
         def compute_writeoff_counterpart_vals(values):
             line_values = values.copy()
             line_values['debit'], line_values['credit'] = line_values['credit'], line_values['debit']
@@ -869,9 +1410,8 @@ class AccountInvoiceLine(models.Model):
         partner_id = self.env['res.partner']._find_accounting_partner(self[0].partner_id).id
         company_currency = self[0].account_id.company_id.currency_id
         writeoff_currency = self[0].account_id.currency_id or company_currency
-        line_to_reconcile = self.env['account.move.line']
-        # Iterate and create one writeoff by journal
-        writeoff_moves = self.env['account.move']
+        # Iterate and prepare one writeoff by journal
+        writeoff_moves = []
         for journal_id, lines in writeoff_dict.items():
             total = 0
             total_currency = 0
@@ -919,22 +1459,14 @@ class AccountInvoiceLine(models.Model):
                 'partner_id': partner_id
                 })
 
-            # Create the move
-            writeoff_move = self.env['account.move'].create({
+            # Prepare the move
+            writeoff_moves.append({
                 'journal_id': journal_id,
                 'date': date,
                 'state': 'draft',
                 'line_ids': [(0, 0, line) for line in writeoff_lines],
             })
-            writeoff_moves += writeoff_move
-            line_to_reconcile += writeoff_move.line_ids.filtered(lambda r: r.account_id == self[0].account_id).sorted(key='id')[-1:]
-
-        #post all the writeoff moves at once
-        if writeoff_moves:
-            writeoff_moves.action_post()
-
-        # Return the writeoff move.line which is to be reconciled
-        return line_to_reconcile
+        return writeoff_moves
 
 
 class AccountBankStatement(models.Model):
@@ -1092,8 +1624,8 @@ class AccountBankStatementLine(models.Model):
                 self._prepare_move_line_for_currency(aml_dict, date)
 
             # Create write-offs
-            for aml_dict in new_aml_dicts:
-                aml_obj.with_context(check_move_validity=False).create(aml_dict)
+            if new_aml_dicts:
+                aml_obj.with_context(check_move_validity=False).create(new_aml_dicts)
 
             # Create counterpart move lines and reconcile them
             aml_to_reconcile = []
@@ -165,6 +165,7 @@ class RecurringPayments(models.Model):
             move_id = self.env['account.move'].create(vals)
             if tmpl_id.journal_state == 'posted':
                 move_id.post()
+        self.env['account.dashboard.snapshot']._trigger_prewarm()
 
 
     class GetAllRecurringEntries(models.TransientModel):
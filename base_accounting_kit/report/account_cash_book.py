@@ -24,6 +24,8 @@ from datetime import time
 from odoo import models, api, _
 from odoo.exceptions import UserError
 
+from ..models.account_report_profile import profiled
+
 
 class ReportCashBook(models.AbstractModel):
     _name = 'report.base_accounting_kit.report_cash_book'
@@ -35,6 +37,7 @@ class ReportCashBook(models.AbstractModel):
         cr = self.env.cr
         move_line = self.env['account.move.line']
         move_lines = {x: [] for x in accounts.ids}
+        init_balances = {}
 
         # Prepare initial sql query and Get the initial move lines
         if init_balance:
@@ -62,6 +65,7 @@ class ReportCashBook(models.AbstractModel):
             params = (tuple(accounts.ids),) + tuple(init_where_params)
             cr.execute(sql, params)
             for row in cr.dictfetchall():
+                init_balances[row['account_id']] = row['balance']
                 move_lines[row.pop('account_id')].append(row)
         sql_sort = 'l.date, l.move_id'
         if sortby == 'sort_journal_partner':
@@ -83,7 +87,7 @@ class ReportCashBook(models.AbstractModel):
             accounts = self.env['account.account'].search([('id','in',accounts)])
 
         # Get move lines base on sql query and Calculate the total balance of move lines
-        sql = ('''SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate, j.code AS lcode, l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit, COALESCE(l.credit,0) AS credit, COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) AS balance,\
+        sql = ('''SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate, j.code AS lcode, l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit, COALESCE(l.credit,0) AS credit, SUM(COALESCE(l.debit,0) - COALESCE(l.credit,0)) OVER (PARTITION BY l.account_id ORDER BY ''' + sql_sort + ''', l.id) AS balance,\
                 m.name AS move_name, c.symbol AS currency_code, p.name AS partner_name\
                 FROM account_move_line l\
                 JOIN account_move m ON (l.move_id=m.id)\
@@ -91,15 +95,13 @@ class ReportCashBook(models.AbstractModel):
                 LEFT JOIN res_partner p ON (l.partner_id=p.id)\
                 JOIN account_journal j ON (l.journal_id=j.id)\
                 JOIN account_account acc ON (l.account_id = acc.id) \
-                WHERE l.account_id IN %s ''' + filters + ''' GROUP BY l.id, l.account_id, l.date, j.code, l.currency_id, l.amount_currency, l.ref, l.name, m.name, c.symbol, p.name ORDER BY ''' + sql_sort)
+                WHERE l.account_id IN %s ''' + filters + ''' ORDER BY ''' + sql_sort + ', l.id')
         params = (tuple(accounts.ids),) + tuple(where_params)
         cr.execute(sql, params)
 
+        # the running balance of the query starts from the initial balance
         for row in cr.dictfetchall():
-            balance = 0
-            for line in move_lines.get(row['account_id']):
-                balance += line['debit'] - line['credit']
-            row['balance'] += balance
+            row['balance'] += init_balances.get(row['account_id'], 0.0)
             move_lines[row.pop('account_id')].append(row)
 
         # Calculate the debit, credit and balance for Accounts
@@ -125,6 +127,7 @@ class ReportCashBook(models.AbstractModel):
         return account_res
 
     @api.model
+    @profiled
     def _get_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get('active_model'):
             raise UserError(
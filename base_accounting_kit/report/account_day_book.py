@@ -20,23 +20,29 @@
 #
 #############################################################################
 import time
-from datetime import timedelta, datetime
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
 
 from odoo import models, api, _
 from odoo.exceptions import UserError
 
+from ..models.account_report_profile import profiled
+
 
 class DayBookPdfReport(models.AbstractModel):
     _name = 'report.base_accounting_kit.day_book_report_template'
     _description = 'Day Book Report'
 
-    def _get_account_move_entry(self, accounts, form_data, pass_date):
+    def _get_account_move_entries(self, accounts, form_data, date_from,
+                                  date_to):
+        """ Return the days between ``date_from`` and ``date_to`` having move
+        lines, with their lines and their debit, credit and balance.
+
+        The lines of the whole range are read in one query ordered by date,
+        and grouped by day as they are read.
+        """
         cr = self.env.cr
-        move_line = self.env['account.move.line']
-        tables, where_clause, where_params = move_line._query_get()
-        wheres = [""]
-        if where_clause.strip():
-            wheres.append(where_clause.strip())
         if form_data['target_move'] == 'posted':
             target_move = "AND m.state = 'posted'"
         else:
@@ -44,7 +50,7 @@ class DayBookPdfReport(models.AbstractModel):
         sql = ('''
                 SELECT l.id AS lid, acc.name as accname, l.account_id AS account_id, l.date AS ldate, j.code AS lcode, l.currency_id, 
                 l.amount_currency, l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit, COALESCE(l.credit,0) AS credit, 
-                COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) AS balance,
+                COALESCE(l.debit,0) - COALESCE(l.credit,0) AS balance,
                 m.name AS move_name, c.symbol AS currency_code, p.name AS partner_name
                 FROM account_move_line l
                 JOIN account_move m ON (l.move_id=m.id)
@@ -52,28 +58,34 @@ class DayBookPdfReport(models.AbstractModel):
                 LEFT JOIN res_partner p ON (l.partner_id=p.id)
                 JOIN account_journal j ON (l.journal_id=j.id)
                 JOIN account_account acc ON (l.account_id = acc.id) 
-                WHERE l.account_id IN %s AND l.journal_id IN %s ''' + target_move + ''' AND l.date = %s
-                GROUP BY l.id, l.account_id, l.date,
-                     j.code, l.currency_id, l.amount_currency, l.ref, l.name, m.name, c.symbol, p.name , acc.name
-                     ORDER BY l.date DESC
+                WHERE l.account_id IN %s AND l.journal_id IN %s ''' + target_move + '''
+                AND l.date BETWEEN %s AND %s
+                ORDER BY l.date, l.id
         ''')
         params = (
-        tuple(accounts.ids), tuple(form_data['journal_ids']), pass_date)
+            tuple(accounts.ids), tuple(form_data['journal_ids']), date_from,
+            date_to)
         cr.execute(sql, params)
-        data = cr.dictfetchall()
-        res = {}
-        debit = credit = balance = 0.00
-        for line in data:
-            debit += line['debit']
-            credit += line['credit']
-            balance += line['balance']
-        res['debit'] = debit
-        res['credit'] = credit
-        res['balance'] = balance
-        res['lines'] = data
-        return res
+        record = []
+        for day, lines in groupby(cr.dictfetchall(),
+                                  key=itemgetter('ldate')):
+            lines = list(lines)
+            debit = credit = balance = 0.00
+            for line in lines:
+                debit += line['debit']
+                credit += line['credit']
+                balance += line['balance']
+            record.append({
+                'date': day,
+                'debit': debit,
+                'credit': credit,
+                'balance': balance,
+                'child_lines': lines,
+            })
+        return record
 
     @api.model
+    @profiled
     def _get_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get('active_model'):
             raise UserError(
@@ -96,24 +108,9 @@ class DayBookPdfReport(models.AbstractModel):
         date_start = datetime.strptime(form_data['date_from'],
                                        '%Y-%m-%d').date()
         date_end = datetime.strptime(form_data['date_to'], '%Y-%m-%d').date()
-        days = date_end - date_start
-        dates = []
-        record = []
-        for i in range(days.days + 1):
-            dates.append(date_start + timedelta(days=i))
-        for head in dates:
-            pass_date = str(head)
-            accounts_res = self.with_context(
-                data['form'].get('used_context', {}))._get_account_move_entry(
-                accounts, form_data, pass_date)
-            if accounts_res['lines']:
-                record.append({
-                    'date': head,
-                    'debit': accounts_res['debit'],
-                    'credit': accounts_res['credit'],
-                    'balance': accounts_res['balance'],
-                    'child_lines': accounts_res['lines']
-                })
+        record = self.with_context(
+            data['form'].get('used_context', {}))._get_account_move_entries(
+            accounts, form_data, date_start, date_end)
         return {
             'doc_ids': docids,
             'doc_model': model,
@@ -25,6 +25,8 @@ import time
 from odoo import api, models, _
 from odoo.exceptions import UserError
 
+from ..models.account_report_profile import profiled
+
 
 class ReportFinancial(models.AbstractModel):
     _name = 'report.base_accounting_kit.report_cash_flow'
@@ -198,6 +200,7 @@ class ReportFinancial(models.AbstractModel):
         return lines
 
     @api.model
+    @profiled
     def _get_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get(
                 'active_model') or not self.env.context.get('active_id'):
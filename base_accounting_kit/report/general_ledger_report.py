@@ -20,16 +20,52 @@
 #
 #############################################################################
 
+import csv
+import hashlib
+import io
+import os
+import shutil
+import tempfile
 import time
+import uuid
 
-from odoo import api, models, _
+from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from odoo.tools.misc import xlsxwriter
+
+from ..models.account_report_profile import profiled
+
+# rows fetched at once from the server side cursor of the exports
+EXPORT_CHUNK_SIZE = 2000
+# bytes of an export file read at once to store it
+EXPORT_FILE_CHUNK_SIZE = 1024 * 1024
+# rows of an XLSX worksheet, header included
+XLSX_MAX_ROWS = 1048576
 
 
 class ReportGeneralLedger(models.AbstractModel):
     _name = 'report.base_accounting_kit.report_general_ledger'
     _description = 'General Ledger Report'
 
+    def _get_move_line_filters(self, initial_bal=False):
+        """ Return the WHERE filters of the move lines of the report, on the
+        ``l`` (account_move_line) and ``m`` (account_move) aliases, starting
+        with AND, and their parameters. The initial balance filters take the
+        lines before the start date."""
+        MoveLine = self.env['account.move.line']
+        if initial_bal:
+            MoveLine = MoveLine.with_context(
+                date_from=self.env.context.get('date_from'), date_to=False,
+                initial_bal=True)
+        tables, where_clause, where_params = MoveLine._query_get()
+        wheres = [""]
+        if where_clause.strip():
+            wheres.append(where_clause.strip())
+        filters = " AND ".join(wheres)
+        filters = filters.replace('account_move_line__move_id', 'm').replace(
+            'account_move_line', 'l')
+        return filters, tuple(where_params)
+
     def _get_account_move_entry(self, accounts, init_balance, sortby,
                                 display_account):
         """
@@ -50,21 +86,13 @@ class ReportGeneralLedger(models.AbstractModel):
         }
         """
         cr = self.env.cr
-        MoveLine = self.env['account.move.line']
         move_lines = {x: [] for x in accounts.ids}
+        init_balances = {}
 
         # Prepare initial sql query and Get the initial move lines
         if init_balance:
-            init_tables, init_where_clause, init_where_params = MoveLine.with_context(
-                date_from=self.env.context.get('date_from'), date_to=False,
-                initial_bal=True)._query_get()
-            init_wheres = [""]
-            if init_where_clause.strip():
-                init_wheres.append(init_where_clause.strip())
-            init_filters = " AND ".join(init_wheres)
-            filters = init_filters.replace('account_move_line__move_id',
-                                           'm').replace('account_move_line',
-                                                        'l')
+            filters, init_where_params = self._get_move_line_filters(
+                initial_bal=True)
             sql = ("""SELECT 0 AS lid, l.account_id AS account_id, '' AS ldate, '' AS lcode, 0.0 AS amount_currency, '' AS lref, 'Initial Balance' AS lname, COALESCE(SUM(l.debit),0.0) AS debit, COALESCE(SUM(l.credit),0.0) AS credit, COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) as balance, '' AS lpartner_id,\
                 '' AS move_name, '' AS mmove_id, '' AS currency_code,\
                 NULL AS currency_id,\
@@ -77,9 +105,10 @@ class ReportGeneralLedger(models.AbstractModel):
                 LEFT JOIN account_move i ON (m.id =i.id)\
                 JOIN account_journal j ON (l.journal_id=j.id)\
                 WHERE l.account_id IN %s""" + filters + ' GROUP BY l.account_id')
-            params = (tuple(accounts.ids),) + tuple(init_where_params)
+            params = (tuple(accounts.ids),) + init_where_params
             cr.execute(sql, params)
             for row in cr.dictfetchall():
+                init_balances[row['account_id']] = row['balance']
                 move_lines[row.pop('account_id')].append(row)
 
         sql_sort = 'l.date, l.move_id'
@@ -87,16 +116,10 @@ class ReportGeneralLedger(models.AbstractModel):
             sql_sort = 'j.code, p.name, l.move_id'
 
         # Prepare sql query base on selected parameters from wizard
-        tables, where_clause, where_params = MoveLine._query_get()
-        wheres = [""]
-        if where_clause.strip():
-            wheres.append(where_clause.strip())
-        filters = " AND ".join(wheres)
-        filters = filters.replace('account_move_line__move_id', 'm').replace(
-            'account_move_line', 'l')
+        filters, where_params = self._get_move_line_filters()
 
         # Get move lines base on sql query and Calculate the total balance of move lines
-        sql = ('''SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate, j.code AS lcode, l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit, COALESCE(l.credit,0) AS credit, COALESCE(SUM(l.debit),0) - COALESCE(SUM(l.credit), 0) AS balance,\
+        sql = ('''SELECT l.id AS lid, l.account_id AS account_id, l.date AS ldate, j.code AS lcode, l.currency_id, l.amount_currency, l.ref AS lref, l.name AS lname, COALESCE(l.debit,0) AS debit, COALESCE(l.credit,0) AS credit, SUM(COALESCE(l.debit,0) - COALESCE(l.credit,0)) OVER (PARTITION BY l.account_id ORDER BY ''' + sql_sort + ''', l.id) AS balance,\
             m.name AS move_name, c.symbol AS currency_code, p.name AS partner_name\
             FROM account_move_line l\
             JOIN account_move m ON (l.move_id=m.id)\
@@ -104,15 +127,13 @@ class ReportGeneralLedger(models.AbstractModel):
             LEFT JOIN res_partner p ON (l.partner_id=p.id)\
             JOIN account_journal j ON (l.journal_id=j.id)\
             JOIN account_account acc ON (l.account_id = acc.id) \
-            WHERE l.account_id IN %s ''' + filters + ''' GROUP BY l.id, l.account_id, l.date, j.code, l.currency_id, l.amount_currency, l.ref, l.name, m.name, c.symbol, p.name ORDER BY ''' + sql_sort)
-        params = (tuple(accounts.ids),) + tuple(where_params)
+            WHERE l.account_id IN %s ''' + filters + ''' ORDER BY ''' + sql_sort + ', l.id')
+        params = (tuple(accounts.ids),) + where_params
         cr.execute(sql, params)
 
+        # the running balance of the query starts from the initial balance
         for row in cr.dictfetchall():
-            balance = 0
-            for line in move_lines.get(row['account_id']):
-                balance += line['debit'] - line['credit']
-            row['balance'] += balance
+            row['balance'] += init_balances.get(row['account_id'], 0.0)
             move_lines[row.pop('account_id')].append(row)
 
         # Calculate the debit, credit and balance for Accounts
@@ -137,7 +158,237 @@ class ReportGeneralLedger(models.AbstractModel):
 
         return account_res
 
+    def _get_export_accounts(self, accounts, init_balance, display_account):
+        """ Return the accounts of the export in the order of the report, as
+        tuples of the account, its initial debit and credit and its debit and
+        credit over the period.
+
+        The totals are summed up before the move lines are read, so that the
+        accounts are filtered the way the report does it without keeping the
+        move lines in memory.
+        """
+        cr = self.env.cr
+        totals = {}
+        for initial_bal in ([True, False] if init_balance else [False]):
+            filters, where_params = self._get_move_line_filters(
+                initial_bal=initial_bal)
+            cr.execute("""
+                SELECT l.account_id, COALESCE(SUM(l.debit), 0),
+                       COALESCE(SUM(l.credit), 0)
+                FROM account_move_line l
+                JOIN account_move m ON (l.move_id=m.id)
+                WHERE l.account_id IN %s""" + filters + """
+                GROUP BY l.account_id
+            """, (tuple(accounts.ids),) + where_params)
+            for account_id, debit, credit in cr.fetchall():
+                totals.setdefault(account_id, {})[initial_bal] = (debit, credit)
+
+        export_accounts = []
+        for account in accounts:
+            account_totals = totals.get(account.id, {})
+            init = account_totals.get(True, (0.0, 0.0))
+            period = account_totals.get(False, (0.0, 0.0))
+            currency = account.currency_id or account.company_id.currency_id
+            balance = init[0] - init[1] + period[0] - period[1]
+            if display_account == 'movement' and not account_totals:
+                continue
+            if display_account == 'not_zero' and currency.is_zero(balance):
+                continue
+            export_accounts.append((account, init, period))
+        return export_accounts
+
+    def _get_export_header(self):
+        return [_('Account'), _('Date'), _('JRNL'), _('Partner'), _('Ref'),
+                _('Move'), _('Entry Label'), _('Debit'), _('Credit'),
+                _('Balance'), _('Currency Amount'), _('Currency')]
+
+    def _iter_export_rows(self, accounts, init_balance, sortby,
+                          display_account):
+        """ Yield the rows of the general ledger export: a row per account
+        with its totals, followed by its initial balance and its move lines
+        with their running balance, summed up by the database.
+
+        The move lines are read through a server side cursor, by chunks of
+        ``EXPORT_CHUNK_SIZE``.
+        """
+        # the queries below, and the named cursor on the connection above all,
+        # must see the pending changes
+        self.env['account.move.line'].flush()
+        self.env['account.move'].flush(['name', 'state'])
+        export_accounts = self._get_export_accounts(accounts, init_balance,
+                                                    display_account)
+        if not export_accounts:
+            return
+
+        sql_sort = 'l.date, l.move_id'
+        if sortby == 'sort_journal_partner':
+            sql_sort = 'j.code, p.name, l.move_id'
+        filters, where_params = self._get_move_line_filters()
+        account_ids = [account.id for account, init, period in export_accounts]
+        sql = ("""
+            SELECT l.account_id, l.date, j.code, p.name, l.ref, m.name,
+                   l.name, COALESCE(l.debit, 0), COALESCE(l.credit, 0),
+                   SUM(COALESCE(l.debit, 0) - COALESCE(l.credit, 0)) OVER (
+                       PARTITION BY l.account_id
+                       ORDER BY """ + sql_sort + """, l.id),
+                   l.amount_currency, c.symbol
+            FROM account_move_line l
+            JOIN unnest(%s::integer[]) WITH ORDINALITY AS a(account_id, sequence)
+                ON (a.account_id = l.account_id)
+            JOIN account_move m ON (l.move_id=m.id)
+            LEFT JOIN res_currency c ON (l.currency_id=c.id)
+            LEFT JOIN res_partner p ON (l.partner_id=p.id)
+            JOIN account_journal j ON (l.journal_id=j.id)
+            WHERE l.account_id IN %s""" + filters + """
+            ORDER BY a.sequence, """ + sql_sort + """, l.id
+        """)
+        params = (account_ids, tuple(account_ids)) + where_params
+
+        # a named cursor keeps the result on the server, in the transaction
+        # of the environment
+        cursor = self.env.cr._cnx.cursor(
+            'general_ledger_export_%s' % uuid.uuid4().hex)
+        try:
+            cursor.execute(sql, params)
+
+            def fetch_lines():
+                while True:
+                    chunk = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+                    if not chunk:
+                        return
+                    yield from chunk
+
+            lines = fetch_lines()
+            line = next(lines, None)
+            for account, init, period in export_accounts:
+                debit = init[0] + period[0]
+                credit = init[1] + period[1]
+                yield [account.code, None, None, None, None, None,
+                       account.name, debit, credit, debit - credit, None, None]
+                init_balance_amount = init[0] - init[1]
+                if init_balance:
+                    yield [account.code, None, None, None, None, None,
+                           _('Initial Balance'), init[0], init[1],
+                           init_balance_amount, None, None]
+                while line and line[0] == account.id:
+                    (account_id, date, journal_code, partner_name, ref,
+                     move_name, name, debit, credit, balance,
+                     amount_currency, currency_code) = line
+                    yield [account.code, date, journal_code, partner_name,
+                           ref, move_name, name, debit, credit,
+                           init_balance_amount + balance, amount_currency,
+                           currency_code]
+                    line = next(lines, None)
+        finally:
+            cursor.close()
+
+    def _write_export_csv(self, export_file, rows):
+        text = io.TextIOWrapper(export_file, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(self._get_export_header())
+        for row in rows:
+            if row[1]:
+                row[1] = fields.Date.to_string(row[1])
+            writer.writerow(row)
+        text.flush()
+        text.detach()
+
+    def _write_export_xlsx(self, export_file, rows):
+        workbook = xlsxwriter.Workbook(export_file, {'constant_memory': True})
+        bold = workbook.add_format({'bold': True})
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        header = self._get_export_header()
+        worksheet = None
+        row_index = XLSX_MAX_ROWS
+        for row in rows:
+            # go on in a new worksheet once one is full
+            if row_index == XLSX_MAX_ROWS:
+                worksheet = workbook.add_worksheet()
+                worksheet.write_row(0, 0, header, bold)
+                row_index = 1
+            date = row[1]
+            row[1] = None
+            worksheet.write_row(row_index, 0, row)
+            if date:
+                worksheet.write_datetime(row_index, 1, date, date_format)
+            row_index += 1
+        if worksheet is None:
+            workbook.add_worksheet().write_row(0, 0, header, bold)
+        workbook.close()
+
+    @api.model
+    def _export_general_ledger(self, accounts, init_balance, sortby,
+                               display_account, export_format, record):
+        """ Write the general ledger of ``accounts`` to a CSV or XLSX file
+        and return it as an attachment of ``record``, see
+        ``_create_export_attachment``.
+
+        The rows are written to a temporary file as they are read from the
+        database, so that the memory used does not grow with the ledger.
+        """
+        rows = self._iter_export_rows(accounts, init_balance, sortby,
+                                      display_account)
+        with tempfile.TemporaryFile() as export_file:
+            if export_format == 'xlsx':
+                self._write_export_xlsx(export_file, rows)
+                mimetype = 'application/vnd.openxmlformats-officedocument' \
+                           '.spreadsheetml.sheet'
+            else:
+                self._write_export_csv(export_file, rows)
+                mimetype = 'text/csv'
+            return self._create_export_attachment(
+                export_file, '%s.%s' % (_('General Ledger'), export_format),
+                mimetype, record)
+
+    def _create_export_attachment(self, export_file, name, mimetype, record):
+        """ Return a new attachment of ``record`` with the content of
+        ``export_file``, replacing its former exports.
+
+        With the file storage, the file is copied to the filestore by chunks
+        instead of being read whole.
+        """
+        Attachment = self.env['ir.attachment']
+        Attachment.search([('res_model', '=', record._name),
+                           ('res_id', '=', record.id)]).unlink()
+        vals = {
+            'name': name,
+            'mimetype': mimetype,
+            'res_model': record._name,
+            'res_id': record.id,
+        }
+        export_file.seek(0)
+        if Attachment._storage() != 'file':
+            vals['raw'] = export_file.read()
+            return Attachment.create(vals)
+
+        sha = hashlib.sha1()
+        for chunk in iter(lambda: export_file.read(EXPORT_FILE_CHUNK_SIZE),
+                          b''):
+            sha.update(chunk)
+        checksum = sha.hexdigest()
+        file_size = export_file.tell()
+        # the path of ir.attachment's _get_path, whose collision check needs
+        # the whole content
+        fname = checksum[:2] + '/' + checksum
+        full_path = Attachment._full_path(fname)
+        if not os.path.isfile(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            export_file.seek(0)
+            with open(full_path, 'wb') as stored_file:
+                shutil.copyfileobj(export_file, stored_file,
+                                   EXPORT_FILE_CHUNK_SIZE)
+        Attachment._mark_for_gc(fname)
+        attachment = Attachment.create(dict(vals, store_fname=fname))
+        # create only computes them from a content given in the values
+        self.env.cr.execute("""
+            UPDATE ir_attachment SET file_size = %s, checksum = %s
+            WHERE id = %s
+        """, (file_size, checksum, attachment.id))
+        attachment.invalidate_cache(['file_size', 'checksum'])
+        return attachment
+
     @api.model
+    @profiled
     def _get_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get('active_model'):
             raise UserError(
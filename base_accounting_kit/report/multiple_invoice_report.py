@@ -2,12 +2,15 @@
 
 from odoo import models, api
 
+from ..models.account_report_profile import profiled
+
 
 class ReportInvoiceMultiple(models.AbstractModel):
     _name = 'report.base_accounting_kit.report_multiple_invoice'
     _inherit = 'report.account.report_invoice'
 
     @api.model
+    @profiled
     def _get_report_values(self, docids, data=None):
         rslt = super()._get_report_values(docids, data)
 
@@ -29,6 +29,8 @@ from odoo import api, models, _
 from odoo.exceptions import UserError
 from odoo.tools import float_is_zero
 
+from ..models.account_report_profile import profiled
+
 
 class ReportAgedPartnerBalance(models.AbstractModel):
     _name = 'report.base_accounting_kit.report_agedpartnerbalance'
@@ -69,163 +71,135 @@ class ReportAgedPartnerBalance(models.AbstractModel):
         cr = self.env.cr
         user_company = self.env.company
         user_currency = user_company.currency_id
-        ResCurrency = self.env['res.currency'].with_context(date=date_from)
         company_ids = self._context.get('company_ids') or [user_company.id]
         move_state = ['draft', 'posted']
         if target_move == 'posted':
             move_state = ['posted']
-        arg_list = (tuple(move_state), tuple(account_type))
-        # build the reconciliation clause to see what partner needs to be printed
-        reconciliation_clause = '(l.reconciled IS FALSE)'
-        cr.execute(
-            'SELECT debit_move_id, credit_move_id FROM account_partial_reconcile where max_date > %s',
-            (date_from,))
-        reconciled_after_date = []
-        for row in cr.fetchall():
-            reconciled_after_date += [row[0], row[1]]
-        if reconciled_after_date:
-            reconciliation_clause = '(l.reconciled IS FALSE OR l.id IN %s)'
-            arg_list += (tuple(reconciled_after_date),)
-        arg_list += (date_from, tuple(company_ids))
-        query = '''
-            SELECT DISTINCT l.partner_id, UPPER(res_partner.name)
-            FROM account_move_line AS l left join res_partner on l.partner_id = res_partner.id, account_account, account_move am
-            WHERE (l.account_id = account_account.id)
-                AND (l.move_id = am.id)
-                AND (am.state IN %s)
-                AND (account_account.internal_type IN %s)
-                AND ''' + reconciliation_clause + '''
-                AND (l.date <= %s)
-                AND l.company_id IN %s
-            ORDER BY UPPER(res_partner.name)'''
-        cr.execute(query, arg_list)
-
-        partners = cr.dictfetchall()
         # put a total of 0
         for i in range(7):
             total.append(0)
 
-        # Build a string like (1,2,3) for easy use in SQL query
-        partner_ids = [partner['partner_id'] for partner in partners if
-                       partner['partner_id']]
-        lines = dict(
-            (partner['partner_id'] or False, []) for partner in partners)
-        if not partner_ids:
+        # The open amount at date_from of every line still open then, in the
+        # currency of the user company: its balance plus or minus the partial
+        # reconciliations made up to date_from. Every amount is converted
+        # with the rates at date_from and rounded like
+        # res.currency._convert does. The lines reconciled after date_from
+        # count as open, the amounts due after date_from are not due yet
+        # (period 6) and the others go in the period of their due date.
+        query = """
+            WITH currency_rate AS (
+                SELECT c.id AS currency_id, c.rounding,
+                       COALESCE((SELECT r.rate FROM res_currency_rate r
+                                 WHERE r.currency_id = c.id
+                                   AND r.name <= %(date_from)s
+                                   AND (r.company_id IS NULL
+                                        OR r.company_id = %(company_id)s)
+                                 ORDER BY r.company_id, r.name DESC
+                                 LIMIT 1), 1.0) AS rate
+                FROM res_currency c
+            ),
+            user_rate AS (
+                SELECT rate, rounding FROM currency_rate
+                WHERE currency_id = %(currency_id)s
+            ),
+            open_line AS (
+                SELECT l.id, l.partner_id,
+                       CASE WHEN COALESCE(l.date_maturity, l.date) >= %(date_from)s THEN 6
+                            WHEN COALESCE(l.date_maturity, l.date) >= %(start_4)s THEN 5
+                            WHEN COALESCE(l.date_maturity, l.date) >= %(start_3)s THEN 4
+                            WHEN COALESCE(l.date_maturity, l.date) >= %(start_2)s THEN 3
+                            WHEN COALESCE(l.date_maturity, l.date) >= %(start_1)s THEN 2
+                            ELSE 1
+                       END AS period,
+                       ROUND(l.balance * ur.rate / lr.rate / ur.rounding) * ur.rounding AS balance
+                FROM account_move_line l
+                JOIN account_move am ON (l.move_id = am.id)
+                JOIN account_account a ON (l.account_id = a.id)
+                JOIN res_company lc ON (l.company_id = lc.id)
+                JOIN currency_rate lr ON (lr.currency_id = lc.currency_id)
+                CROSS JOIN user_rate ur
+                WHERE am.state IN %(move_state)s
+                    AND a.internal_type IN %(account_type)s
+                    AND (l.reconciled IS FALSE
+                         OR EXISTS (SELECT 1 FROM account_partial_reconcile pr
+                                    WHERE pr.debit_move_id = l.id
+                                      AND pr.max_date > %(date_from)s)
+                         OR EXISTS (SELECT 1 FROM account_partial_reconcile pr
+                                    WHERE pr.credit_move_id = l.id
+                                      AND pr.max_date > %(date_from)s))
+                    AND l.date <= %(date_from)s
+                    AND l.company_id IN %(company_ids)s
+            ),
+            reconciled AS (
+                SELECT p.line_id,
+                       SUM(p.sign * ROUND(p.amount * ur.rate / pcr.rate / ur.rounding) * ur.rounding) AS amount
+                FROM (
+                    SELECT apr.credit_move_id AS line_id, 1 AS sign,
+                           apr.amount, apr.company_id
+                    FROM account_partial_reconcile apr
+                    JOIN open_line ol ON (ol.id = apr.credit_move_id)
+                    WHERE apr.max_date <= %(date_from)s
+                    UNION ALL
+                    SELECT apr.debit_move_id, -1, apr.amount, apr.company_id
+                    FROM account_partial_reconcile apr
+                    JOIN open_line ol ON (ol.id = apr.debit_move_id)
+                    WHERE apr.max_date <= %(date_from)s
+                ) p
+                JOIN res_company pc ON (p.company_id = pc.id)
+                JOIN currency_rate pcr ON (pcr.currency_id = pc.currency_id)
+                CROSS JOIN user_rate ur
+                GROUP BY p.line_id
+            )
+            SELECT ol.id, ol.partner_id, ol.period,
+                   ol.balance + COALESCE(r.amount, 0) AS amount
+            FROM open_line ol
+            LEFT JOIN reconciled r ON (r.line_id = ol.id)
+            LEFT JOIN res_partner rp ON (ol.partner_id = rp.id)
+            WHERE ol.balance != 0
+            ORDER BY UPPER(rp.name), ol.partner_id, ol.id
+        """
+        params = {
+            'date_from': date_from,
+            'company_id': user_company.id,
+            'currency_id': user_currency.id,
+            'move_state': tuple(move_state),
+            'account_type': tuple(account_type),
+            'company_ids': tuple(company_ids),
+        }
+        for i in range(1, 5):
+            params['start_%s' % i] = periods[str(i)]['start']
+        cr.execute(query, params)
+        rows = cr.fetchall()
+        if not rows:
             return [], [], {}
 
-        # This dictionary will store the not due amount of all partners
-        undue_amounts = {}
-        query = '''SELECT l.id
-                FROM account_move_line AS l, account_account, account_move am
-                WHERE (l.account_id = account_account.id) AND (l.move_id = am.id)
-                    AND (am.state IN %s)
-                    AND (account_account.internal_type IN %s)
-                    AND (COALESCE(l.date_maturity,l.date) >= %s)\
-                    AND ((l.partner_id IN %s) OR (l.partner_id IS NULL))
-                AND (l.date <= %s)
-                AND l.company_id IN %s'''
-        cr.execute(query, (
-            tuple(move_state), tuple(account_type), date_from,
-            tuple(partner_ids), date_from, tuple(company_ids)))
-        aml_ids = cr.fetchall()
-        aml_ids = aml_ids and [x[0] for x in aml_ids] or []
-        for line in self.env['account.move.line'].browse(aml_ids):
-            partner_id = line.partner_id.id or False
-            if partner_id not in undue_amounts:
-                undue_amounts[partner_id] = 0.0
-            line_amount = ResCurrency._compute(line.company_id.currency_id,
-                                               user_currency, line.balance)
-            if user_currency.is_zero(line_amount):
-                continue
-            for partial_line in line.matched_debit_ids:
-                if partial_line.max_date <= date_from:
-                    line_amount += ResCurrency._compute(
-                        partial_line.company_id.currency_id, user_currency,
-                        partial_line.amount)
-            for partial_line in line.matched_credit_ids:
-                if partial_line.max_date <= date_from:
-                    line_amount -= ResCurrency._compute(
-                        partial_line.company_id.currency_id, user_currency,
-                        partial_line.amount)
-            if not self.env.company.currency_id.is_zero(line_amount):
-                undue_amounts[partner_id] += line_amount
+        # Sum up the amounts of every partner by period, period 6 being the
+        # not due amount
+        lines = {}
+        partner_amounts = {}
+        move_lines = self.env['account.move.line'].browse(
+            [row[0] for row in rows])
+        for line, (line_id, partner_id, period, amount) in zip(move_lines,
+                                                               rows):
+            partner_id = partner_id or False
+            if partner_id not in lines:
+                lines[partner_id] = []
+                partner_amounts[partner_id] = dict.fromkeys(range(1, 7), 0.0)
+            if not self.env.company.currency_id.is_zero(amount):
+                partner_amounts[partner_id][period] += amount
                 lines[partner_id].append({
                     'line': line,
-                    'amount': line_amount,
-                    'period': 6,
+                    'amount': amount,
+                    'period': period,
                 })
 
-        # Use one query per period and store results in history (a list variable)
-        # Each history will contain: history[1] = {'<partner_id>': <partner_debit-credit>}
-        history = []
-        for i in range(5):
-            args_list = (
-            tuple(move_state), tuple(account_type), tuple(partner_ids),)
-            dates_query = '(COALESCE(l.date_maturity,l.date)'
-
-            if periods[str(i)]['start'] and periods[str(i)]['stop']:
-                dates_query += ' BETWEEN %s AND %s)'
-                args_list += (
-                periods[str(i)]['start'], periods[str(i)]['stop'])
-            elif periods[str(i)]['start']:
-                dates_query += ' >= %s)'
-                args_list += (periods[str(i)]['start'],)
-            else:
-                dates_query += ' <= %s)'
-                args_list += (periods[str(i)]['stop'],)
-            args_list += (date_from, tuple(company_ids))
-
-            query = '''SELECT l.id
-                    FROM account_move_line AS l, account_account, account_move am
-                    WHERE (l.account_id = account_account.id) AND (l.move_id = am.id)
-                        AND (am.state IN %s)
-                        AND (account_account.internal_type IN %s)
-                        AND ((l.partner_id IN %s) OR (l.partner_id IS NULL))
-                        AND ''' + dates_query + '''
-                    AND (l.date <= %s)
-                    AND l.company_id IN %s'''
-            cr.execute(query, args_list)
-            partners_amount = {}
-            aml_ids = cr.fetchall()
-            aml_ids = aml_ids and [x[0] for x in aml_ids] or []
-            for line in self.env['account.move.line'].browse(aml_ids):
-                partner_id = line.partner_id.id or False
-                if partner_id not in partners_amount:
-                    partners_amount[partner_id] = 0.0
-                line_amount = ResCurrency._compute(line.company_id.currency_id,
-                                                   user_currency, line.balance)
-                if user_currency.is_zero(line_amount):
-                    continue
-                for partial_line in line.matched_debit_ids:
-                    if partial_line.max_date <= date_from:
-                        line_amount += ResCurrency._compute(
-                            partial_line.company_id.currency_id, user_currency,
-                            partial_line.amount)
-                for partial_line in line.matched_credit_ids:
-                    if partial_line.max_date <= date_from:
-                        line_amount -= ResCurrency._compute(
-                            partial_line.company_id.currency_id, user_currency,
-                            partial_line.amount)
-
-                if not self.env.company.currency_id.is_zero(
-                        line_amount):
-                    partners_amount[partner_id] += line_amount
-                    lines[partner_id].append({
-                        'line': line,
-                        'amount': line_amount,
-                        'period': i + 1,
-                    })
-            history.append(partners_amount)
-
-        for partner in partners:
-            if partner['partner_id'] is None:
-                partner['partner_id'] = False
+        partners = {partner.id: partner for partner in self.env[
+            'res.partner'].browse([partner_id for partner_id in lines
+                                   if partner_id])}
+        for partner_id in lines:
             at_least_one_amount = False
             values = {}
-            undue_amt = 0.0
-            if partner[
-                'partner_id'] in undue_amounts:  # Making sure this partner actually was found by the query
-                undue_amt = undue_amounts[partner['partner_id']]
+            undue_amt = partner_amounts[partner_id][6]
 
             total[6] = total[6] + undue_amt
             values['direction'] = undue_amt
@@ -234,12 +208,10 @@ class ReportAgedPartnerBalance(models.AbstractModel):
                 at_least_one_amount = True
 
             for i in range(5):
-                during = False
-                if partner['partner_id'] in history[i]:
-                    during = [history[i][partner['partner_id']]]
+                during = partner_amounts[partner_id][i + 1]
                 # Adding counter
-                total[(i)] = total[(i)] + (during and during[0] or 0)
-                values[str(i)] = during and during[0] or 0.0
+                total[(i)] = total[(i)] + during
+                values[str(i)] = during
                 if not float_is_zero(values[str(i)],
                                      precision_rounding=self.env.company.currency_id.rounding):
                     at_least_one_amount = True
@@ -247,10 +219,9 @@ class ReportAgedPartnerBalance(models.AbstractModel):
                 [values['direction']] + [values[str(i)] for i in range(5)])
             ## Add for total
             total[(i + 1)] += values['total']
-            values['partner_id'] = partner['partner_id']
-            if partner['partner_id']:
-                browsed_partner = self.env['res.partner'].browse(
-                    partner['partner_id'])
+            values['partner_id'] = partner_id
+            if partner_id:
+                browsed_partner = partners[partner_id]
                 values['name'] = browsed_partner.name and len(
                     browsed_partner.name) >= 45 and browsed_partner.name[
                                                     0:40] + '...' or browsed_partner.name
@@ -261,12 +232,13 @@ class ReportAgedPartnerBalance(models.AbstractModel):
 
             if at_least_one_amount or (
                     self._context.get('include_nullified_amount') and lines[
-                partner['partner_id']]):
+                partner_id]):
                 res.append(values)
 
         return res, total, lines
 
     @api.model
+    @profiled
     def _get_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get(
                 'active_model') or not self.env.context.get('active_id'):
@@ -25,6 +25,8 @@ import time
 from odoo import api, models, _
 from odoo.exceptions import UserError
 
+from ..models.account_report_profile import profiled
+
 
 class ReportJournal(models.AbstractModel):
     _name = 'report.base_accounting_kit.report_journal_audit'
@@ -51,6 +53,7 @@ class ReportJournal(models.AbstractModel):
         ids = (x[0] for x in self.env.cr.fetchall())
         return self.env['account.move.line'].browse(ids)
 
+    @profiled
     def _sum_debit(self, data, journal_id):
         move_state = ['draft', 'posted']
         if data['form'].get('target_move', 'all') == 'posted':
@@ -66,6 +69,7 @@ class ReportJournal(models.AbstractModel):
                             tuple(params))
         return self.env.cr.fetchone()[0] or 0.0
 
+    @profiled
     def _sum_credit(self, data, journal_id):
         move_state = ['draft', 'posted']
         if data['form'].get('target_move', 'all') == 'posted':
@@ -81,6 +85,7 @@ class ReportJournal(models.AbstractModel):
                             tuple(params))
         return self.env.cr.fetchone()[0] or 0.0
 
+    @profiled
     def _get_taxes(self, data, journal_id):
         move_state = ['draft', 'posted']
         if data['form'].get('target_move', 'all') == 'posted':
@@ -129,6 +134,7 @@ class ReportJournal(models.AbstractModel):
             data['form'].get('used_context', {}))._query_get()
 
     @api.model
+    @profiled
     def _get_report_values(self, docids, data=None):
         if not data.get('form'):
             raise UserError(
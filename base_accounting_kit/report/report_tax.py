@@ -25,12 +25,15 @@ from _datetime import datetime
 from odoo import api, models, _
 from odoo.exceptions import UserError
 
+from ..models.account_report_profile import profiled
+
 
 class ReportTax(models.AbstractModel):
     _name = 'report.base_accounting_kit.report_tax'
     _description = 'Tax Report'
 
     @api.model
+    @profiled
     def _get_report_values(self, docids, data=None):
         if not data.get('form'):
             raise UserError(
@@ -25,6 +25,8 @@ import time
 from odoo import api, models, _
 from odoo.exceptions import UserError
 
+from ..models.account_report_profile import profiled
+
 
 class ReportTrialBalance(models.AbstractModel):
     _name = 'report.base_accounting_kit.report_trial_balance'
@@ -85,6 +87,7 @@ class ReportTrialBalance(models.AbstractModel):
         return account_res
 
     @api.model
+    @profiled
     def _get_report_values(self, docids, data=None):
         if not data.get('form') or not self.env.context.get('active_model'):
             raise UserError(
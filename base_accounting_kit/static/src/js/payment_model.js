@@ -246,7 +246,12 @@ var StatementModel = BasicModel.extend({
                                 return false;
                             }
                         });
+                        if (!(line.reconciliation_proposition && line.reconciliation_proposition.length)) {
+                            return self._performCombination(handle);
+                        }
                     }
+                })
+                .then(function() {
                     return self._computeLine(line);
                 })
                 .then(function () {
@@ -956,15 +961,11 @@ var StatementModel = BasicModel.extend({
                 reconciliation_proposition = _.filter(reconciliation_proposition, function (p) {
                     return !p.tax_repartition_line_id || p.link !== prop.id;
                 });
-                var args = [prop.tax_ids.map(function(el){return el.id;}), prop.base_amount, formatOptions.currency_id];
-                var add_context = {'round': true};
-                if(prop.tax_ids.length === 1 && line.createForm && line.createForm.force_tax_included)
-                    add_context.force_price_include = true;
-                tax_defs.push(self._rpc({
-                        model: 'account.tax',
-                        method: 'json_friendly_compute_all',
-                        args: args,
-                        context: $.extend({}, self.context || {}, add_context),
+                tax_defs.push(self._computeTaxes({
+                        tax_ids: prop.tax_ids.map(function(el){return el.id;}),
+                        amount: prop.base_amount,
+                        currency_id: formatOptions.currency_id,
+                        force_price_include: prop.tax_ids.length === 1 && line.createForm && line.createForm.force_tax_included || false,
                     })
                     .then(function (result) {
                         _.each(result.taxes, function(tax){
@@ -1042,6 +1043,37 @@ var StatementModel = BasicModel.extend({
             line.balance.type = line.balance.amount_currency ? (line.st_line.partner_id ? 0 : -1) : 1;
         });
     },
+    /**
+     * Compute the taxes of a write-off server side. The computations asked
+     * for during the same tick are sent together in a single call.
+     *
+     * @private
+     * @param {Object} request
+     * @param {integer[]} request.tax_ids
+     * @param {number} request.amount
+     * @param {integer} request.currency_id
+     * @param {boolean} request.force_price_include
+     * @returns {Promise<Object>} resolved with the result of compute_all
+     */
+    _computeTaxes: function (request) {
+        var self = this;
+        if (!this.taxBatch) {
+            var batch = this.taxBatch = {requests: []};
+            batch.promise = Promise.resolve().then(function () {
+                self.taxBatch = null;
+                return self._rpc({
+                    model: 'account.reconciliation.widget',
+                    method: 'compute_taxes_batch',
+                    args: [batch.requests],
+                    context: $.extend({}, self.context || {}, {'round': true}),
+                });
+            });
+        }
+        var index = this.taxBatch.requests.push(request) - 1;
+        return this.taxBatch.promise.then(function (results) {
+            return results[index];
+        });
+    },
     /**
      *
      *
@@ -1358,19 +1390,56 @@ var StatementModel = BasicModel.extend({
      * @returns {Promise}
      */
     _performMoveLine: function (handle, mode, limit) {
+        var self = this;
         limit = limit || this.limitMoveLines;
         var line = this.getLine(handle);
         var excluded_ids = _.map(_.union(line.reconciliation_proposition, line.mv_lines_match_rp, line.mv_lines_match_other), function (prop) {
             return _.isNumber(prop.id) ? prop.id : null;
         }).filter(id => id != null);
         var filter = line['filter_'+mode] || "";
+        // continue after the loaded lines, or start over once they are reset
+        var page_token = line['mv_lines_'+mode] && line['mv_lines_'+mode].length && line['page_token_'+mode] || false;
         return this._rpc({
                 model: 'account.reconciliation.widget',
-                method: 'get_move_lines_for_bank_statement_line',
-                args: [line.id, line.st_line.partner_id, excluded_ids, filter, 0, limit, mode === 'match_rp' ? 'rp' : 'other'],
+                method: 'get_move_lines_page_for_bank_statement_line',
+                args: [line.id, line.st_line.partner_id, excluded_ids, filter, limit, mode === 'match_rp' ? 'rp' : 'other'],
+                kwargs: {page_token: page_token, with_count: !page_token},
                 context: this.context,
             })
-            .then(this._formatMoveLine.bind(this, handle, mode));
+            .then(function (page) {
+                line['page_token_'+mode] = page.next_token;
+                return self._formatMoveLine(handle, mode, page.lines);
+            });
+    },
+    /**
+     * Propose the open items of the partner whose amounts sum up to the
+     * statement line amount, if there are some.
+     * overridden in ManualModel
+     *
+     * @private
+     * @param {string} handle
+     * @returns {Promise}
+     */
+    _performCombination: function (handle) {
+        var self = this;
+        var line = this.getLine(handle);
+        return this._rpc({
+                model: 'account.reconciliation.widget',
+                method: 'get_move_line_combinations_for_bank_statement_line',
+                args: [line.id, line.st_line.partner_id],
+                kwargs: {limit: 1},
+                context: this.context,
+            })
+            .then(function (result) {
+                var combinations = result.combinations;
+                if (combinations.length && !combinations[0].difference) {
+                    var props = combinations[0].lines;
+                    self._formatLineProposition(line, props);
+                    line.reconciliation_proposition = (line.reconciliation_proposition || []).concat(props);
+                } else if (result.truncated) {
+                    self.do_notify(_t('Partial search'), _t('Only the oldest open items of this partner were searched for a combination matching the amount.'));
+                }
+            });
     },
     /**
      * format the proposition to send information server side
@@ -1502,6 +1571,7 @@ var ManualModel = StatementModel.extend({
                             model: 'account.reconciliation.widget',
                             method: 'get_data_for_manual_reconciliation',
                             args: args,
+                            kwargs: {lazy: true},
                             context: context,
                         })
                         .then(function (result) {
@@ -1517,6 +1587,7 @@ var ManualModel = StatementModel.extend({
                             model: 'account.reconciliation.widget',
                             method: 'get_data_for_manual_reconciliation',
                             args: ['account', context.account_ids || self.account_ids],
+                            kwargs: {lazy: true},
                             context: context,
                         })
                         .then(function (result) {
@@ -1534,6 +1605,7 @@ var ManualModel = StatementModel.extend({
                             model: 'account.reconciliation.widget',
                             method: 'get_all_data_for_manual_reconciliation',
                             args: [partner_ids, account_ids],
+                            kwargs: {lazy: true},
                             context: context,
                         })
                         .then(function (result) {
@@ -1579,18 +1651,40 @@ var ManualModel = StatementModel.extend({
     },
     /**
      * Method to load informations on lines
+     * The manual lines are loaded without their reconciliation proposition,
+     * which is fetched for the page of lines about to be displayed.
      *
      * @param {Array} lines manualLines to load
      * @returns {Promise}
      */
     loadData: function(lines) {
         var self = this;
-        var defs = [];
-        _.each(lines, function (l) {
-            defs.push(self._formatLine(l.mode, l));
+        var lazyLines = _.filter(lines, function (l) {
+            return !l.reconciliation_proposition;
+        });
+        var def = Promise.resolve();
+        if (lazyLines.length) {
+            def = this._rpc({
+                    model: 'account.reconciliation.widget',
+                    method: 'get_manual_reconciliation_propositions',
+                    args: [_.map(lazyLines, function (l) {
+                        return {mode: l.mode, account_id: l.account_id, partner_id: l.partner_id || false};
+                    })],
+                    context: this.context,
+                })
+                .then(function (propositions) {
+                    _.each(lazyLines, function (l, index) {
+                        l.reconciliation_proposition = propositions[index];
+                    });
+                });
+        }
+        return def.then(function () {
+            var defs = [];
+            _.each(lines, function (l) {
+                defs.push(self._formatLine(l.mode, l));
+            });
+            return Promise.all(defs);
         });
-        return Promise.all(defs);
-
     },
     /**
      * Mark the account or the partner as reconciled
@@ -1647,6 +1741,7 @@ var ManualModel = StatementModel.extend({
                     model: 'account.reconciliation.widget',
                     method: 'process_move_lines',
                     args: [process_reconciliations],
+                    kwargs: {batch: !handle},
                 });
         }
 
@@ -1843,6 +1938,16 @@ var ManualModel = StatementModel.extend({
             .then(this._formatMoveLine.bind(this, handle, ''));
     },
 
+    /**
+     * Combinations are only proposed for bank statement lines.
+     *
+     * @override
+     * @returns {Promise}
+     */
+    _performCombination: function () {
+        return Promise.resolve();
+    },
+
     _formatToProcessReconciliation: function (line, prop) {
         var result = this._super(line, prop);
         result['date'] = prop.date;
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+import json
+import logging
+import os
+import time
+
+from odoo import fields
+from odoo.tests.common import SavepointCase
+from odoo.tools import date_utils
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+_logger = logging.getLogger(__name__)
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name) or default)
+
+
+def _client_data(data):
+    """ Return the report ``data`` the way the web client sends it back to
+    the report, with its dates as strings."""
+    return json.loads(json.dumps(data, default=date_utils.json_default))
+
+
+# size of the synthetic ledger, every move has one debit and one credit line
+LEDGER_COMPANIES = _env_int('ACCOUNTING_KIT_BENCH_COMPANIES', 1)
+LEDGER_PARTNERS = _env_int('ACCOUNTING_KIT_BENCH_PARTNERS', 1000)
+LEDGER_ACCOUNTS = _env_int('ACCOUNTING_KIT_BENCH_ACCOUNTS', 10)
+LEDGER_LINES = _env_int('ACCOUNTING_KIT_BENCH_LINES', 100000)
+LEDGER_YEARS = _env_int('ACCOUNTING_KIT_BENCH_YEARS', 3)
+
+# account roles of the synthetic ledger: (user type, reconcile, accounts)
+LEDGER_ROLES = {
+    'receivable': ('account.data_account_type_receivable', True, 1),
+    'payable': ('account.data_account_type_payable', True, 1),
+    'income': ('account.data_account_type_revenue', False, LEDGER_ACCOUNTS),
+    'expense': ('account.data_account_type_expenses', False, LEDGER_ACCOUNTS),
+    'bank': ('account.data_account_type_liquidity', False, 1),
+}
+
+
+class SyntheticLedgerCase(SavepointCase):
+    """ Test case loading a synthetic ledger through bulk SQL inserts.
+
+    The ledger spreads its moves over ``LEDGER_YEARS`` years up to today:
+    customer invoices, customer refunds, vendor bills and bank entries, one
+    in ten left in draft and one in three paid. The size is read from the
+    ``ACCOUNTING_KIT_BENCH_*`` environment variables.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(SyntheticLedgerCase, cls).setUpClass()
+        cls.companies = cls.env.company
+        for index in range(1, LEDGER_COMPANIES):
+            cls.companies |= cls.env['res.company'].create({
+                'name': 'Benchmark Company %s' % index,
+                'currency_id': cls.env.company.currency_id.id,
+            })
+        cls.env.user.company_ids |= cls.companies
+
+        cls.cr.execute("""
+            CREATE TEMP TABLE bench_company (
+                idx INTEGER, company_id INTEGER, currency_id INTEGER,
+                sale_journal_id INTEGER, purchase_journal_id INTEGER,
+                bank_journal_id INTEGER, misc_journal_id INTEGER)
+        """)
+        cls.cr.execute("""
+            CREATE TEMP TABLE bench_account (
+                company_id INTEGER, role VARCHAR, idx INTEGER,
+                account_id INTEGER, internal_type VARCHAR, reconcile BOOLEAN)
+        """)
+        cls.journals = cls.env['account.journal']
+        cls.accounts = cls.env['account.account']
+        for index, company in enumerate(cls.companies):
+            cls._create_company_ledger(index, company)
+
+        start = time.time()
+        cls._insert_partners()
+        cls._insert_moves()
+        cls.env['account.move'].invalidate_cache()
+        cls.env['account.dashboard.rollup']._rebuild_rollup()
+        cls.cr.execute("ANALYZE account_move")
+        cls.cr.execute("ANALYZE account_move_line")
+        cls.cr.execute("ANALYZE res_partner")
+        cls.cr.execute("ANALYZE account_dashboard_rollup")
+        _logger.info("Synthetic ledger of %s lines loaded in %.2fs",
+                     cls.ledger_lines, time.time() - start)
+
+    @classmethod
+    def _create_company_ledger(cls, index, company):
+        accounts = {}
+        for role, (user_type, reconcile, count) in LEDGER_ROLES.items():
+            accounts[role] = cls.env['account.account'].create([{
+                'name': 'Benchmark %s %s' % (role, number),
+                'code': 'BENCH%s%s' % (role[:3].upper(), number),
+                'user_type_id': cls.env.ref(user_type).id,
+                'reconcile': reconcile,
+                'company_id': company.id,
+            } for number in range(count)])
+            cls.accounts |= accounts[role]
+            for idx in range(LEDGER_ACCOUNTS):
+                account = accounts[role][idx % count]
+                cls.cr.execute("""
+                    INSERT INTO bench_account VALUES (%s, %s, %s, %s, %s, %s)
+                """, (company.id, role, idx, account.id,
+                      account.user_type_id.type, reconcile))
+
+        journals = {}
+        for code, journal_type in (('BSAL', 'sale'), ('BPUR', 'purchase'),
+                                   ('BBNK', 'bank'), ('BMIS', 'general')):
+            vals = {
+                'name': 'Benchmark %s' % journal_type,
+                'code': code,
+                'type': journal_type,
+                'company_id': company.id,
+            }
+            if journal_type == 'bank':
+                vals.update({
+                    'default_account_id': accounts['bank'].id,
+                    'payment_debit_account_id': accounts['bank'].id,
+                    'payment_credit_account_id': accounts['bank'].id,
+                })
+            journals[journal_type] = cls.env['account.journal'].create(vals)
+            cls.journals |= journals[journal_type]
+
+        cls.cr.execute("""
+            INSERT INTO bench_company VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (index, company.id, company.currency_id.id,
+              journals['sale'].id, journals['purchase'].id,
+              journals['bank'].id, journals['general'].id))
+
+    @classmethod
+    def _insert_partners(cls):
+        cls.cr.execute("""
+            INSERT INTO res_partner
+                (name, display_name, active, type, is_company, customer_rank,
+                 supplier_rank, create_uid, create_date, write_uid, write_date)
+            SELECT 'Benchmark Partner ' || s.i, 'Benchmark Partner ' || s.i,
+                   TRUE, 'contact', TRUE, 1, 1,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC',
+                   %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM generate_series(1, %(partners)s) AS s(i)
+            RETURNING id
+        """, {'uid': cls.env.uid, 'partners': LEDGER_PARTNERS})
+        partner_ids = [row[0] for row in cls.cr.fetchall()]
+        cls.cr.execute("""
+            UPDATE res_partner SET commercial_partner_id = id
+            WHERE id = ANY(%s)
+        """, (partner_ids,))
+        cls.cr.execute("""
+            CREATE TEMP TABLE bench_partner AS
+            SELECT ROW_NUMBER() OVER (ORDER BY id) - 1 AS idx, id AS partner_id
+            FROM res_partner WHERE id = ANY(%s)
+        """, (partner_ids,))
+        cls.partners = cls.env['res.partner'].browse(partner_ids)
+
+    @classmethod
+    def _insert_moves(cls):
+        params = {
+            'uid': cls.env.uid,
+            'moves': max(LEDGER_LINES // 2, 1),
+            'companies': LEDGER_COMPANIES,
+            'partners': LEDGER_PARTNERS,
+            'accounts': LEDGER_ACCOUNTS,
+            'days': 365 * LEDGER_YEARS,
+        }
+        cls.cr.execute("""
+            CREATE TEMP TABLE bench_move AS
+            SELECT NEXTVAL('account_move_id_seq') AS id, s.i,
+                   c.company_id, c.currency_id, p.partner_id,
+                   t.move_type, t.sign, t.debit_role, t.credit_role,
+                   CASE t.move_type
+                       WHEN 'in_invoice' THEN c.purchase_journal_id
+                       WHEN 'entry' THEN c.bank_journal_id
+                       ELSE c.sale_journal_id
+                   END AS journal_id,
+                   CASE WHEN s.i %% 10 = 0 THEN 'draft' ELSE 'posted' END AS state,
+                   s.i %% 3 = 0 AS paid,
+                   CURRENT_DATE - ((s.i * 37) %% %(days)s)::INTEGER AS date,
+                   ROUND(((s.i * 7919) %% 100000) / 100.0 + 1, 2) AS amount,
+                   (s.i / 4) %% %(accounts)s AS account_idx
+            FROM generate_series(1, %(moves)s) AS s(i)
+            JOIN bench_company c ON c.idx = s.i %% %(companies)s
+            JOIN bench_partner p ON p.idx = s.i %% %(partners)s
+            JOIN (VALUES (0, 'out_invoice', 1, 'receivable', 'income'),
+                         (1, 'out_refund', -1, 'income', 'receivable'),
+                         (2, 'in_invoice', -1, 'expense', 'payable'),
+                         (3, 'entry', 1, 'bank', 'receivable'))
+                AS t(k, move_type, sign, debit_role, credit_role)
+                ON t.k = s.i %% 4
+        """, params)
+        cls.cr.execute("""
+            INSERT INTO account_move
+                (id, name, date, invoice_date, invoice_date_due, state,
+                 move_type, journal_id, company_id, currency_id, partner_id,
+                 commercial_partner_id, payment_state, amount_untaxed,
+                 amount_tax, amount_total, amount_residual,
+                 amount_untaxed_signed, amount_tax_signed,
+                 amount_total_signed, amount_residual_signed, auto_post,
+                 to_check, create_uid, create_date, write_uid, write_date)
+            SELECT m.id, 'BENCH/' || m.i, m.date,
+                   CASE WHEN m.move_type != 'entry' THEN m.date END,
+                   CASE WHEN m.move_type != 'entry' THEN m.date + 30 END,
+                   m.state, m.move_type, m.journal_id, m.company_id,
+                   m.currency_id, m.partner_id, m.partner_id,
+                   CASE WHEN m.paid THEN 'paid' ELSE 'not_paid' END,
+                   m.amount, 0, m.amount,
+                   CASE WHEN m.paid THEN 0 ELSE m.amount END,
+                   m.sign * m.amount, 0, m.sign * m.amount,
+                   CASE WHEN m.paid THEN 0 ELSE m.sign * m.amount END,
+                   FALSE, FALSE,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC',
+                   %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM bench_move m
+        """, params)
+        cls.cr.execute("""
+            INSERT INTO account_move_line
+                (move_id, move_name, date, date_maturity, parent_state,
+                 journal_id, company_id, company_currency_id, currency_id,
+                 account_id, account_internal_type, account_reconcile,
+                 partner_id, name,
+                 quantity, price_unit, debit, credit, balance,
+                 amount_currency, amount_residual, amount_residual_currency,
+                 reconciled, blocked, tax_exigible, exclude_from_invoice_tab,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT m.id, 'BENCH/' || m.i, m.date, m.date + 30, m.state,
+                   m.journal_id, m.company_id, m.currency_id, m.currency_id,
+                   a.account_id, a.internal_type, a.reconcile,
+                   m.partner_id, 'Benchmark',
+                   1, m.amount,
+                   CASE WHEN side.sign > 0 THEN m.amount ELSE 0 END,
+                   CASE WHEN side.sign > 0 THEN 0 ELSE m.amount END,
+                   side.sign * m.amount, side.sign * m.amount,
+                   CASE WHEN a.reconcile AND NOT m.paid
+                        THEN side.sign * m.amount ELSE 0 END,
+                   CASE WHEN a.reconcile AND NOT m.paid
+                        THEN side.sign * m.amount ELSE 0 END,
+                   a.reconcile AND m.paid, FALSE, TRUE,
+                   a.internal_type IN ('receivable', 'payable'),
+                   %(uid)s, NOW() AT TIME ZONE 'UTC',
+                   %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM bench_move m
+            CROSS JOIN (VALUES (1), (-1)) AS side(sign)
+            JOIN bench_account a
+                ON a.company_id = m.company_id
+                AND a.idx = m.account_idx
+                AND a.role = CASE WHEN side.sign > 0
+                                  THEN m.debit_role ELSE m.credit_role END
+        """, params)
+        cls.ledger_lines = cls.cr.rowcount
+        cls.ledger = {
+            'companies': LEDGER_COMPANIES,
+            'partners': LEDGER_PARTNERS,
+            'accounts': len(cls.accounts),
+            'moves': params['moves'],
+            'lines': cls.ledger_lines,
+            'years': LEDGER_YEARS,
+        }
+
+    def measure(self, func, *args, **kwargs):
+        """ Call ``func`` and return its result with the number of queries,
+        the wall time and the rows scanned by the call."""
+        self.env['account.move'].invalidate_cache()
+        Profile = self.env['account.report.profile']
+        rows_before = Profile._get_rows_scanned()
+        queries_before = self.cr.sql_log_count
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.env['account.move'].flush()
+        wall_time = time.perf_counter() - start
+        queries = self.cr.sql_log_count - queries_before
+        rows_scanned = Profile._get_rows_scanned() - rows_before
+        return result, {
+            'queries': queries,
+            'wall_time': round(wall_time, 6),
+            'rows_scanned': rows_scanned,
+        }
+
+
+class AccountingKitTestCase(AccountTestInvoicingCommon):
+    """ Test case of the behaviour tests, on the company of the standard
+    accounting test data."""
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super(AccountingKitTestCase, cls).setUpClass(
+            chart_template_ref=chart_template_ref)
+        cls.company = cls.company_data['company']
+        cls.today = fields.Date.context_today(cls.env['account.move'])
+
+    @classmethod
+    def _create_invoice(cls, move_type, amount, date=None, partner=None,
+                        post=True):
+        """ Create an invoice of a single line of ``amount`` without taxes."""
+        move = cls.env['account.move'].create({
+            'move_type': move_type,
+            'partner_id': (partner or cls.partner_a).id,
+            'invoice_date': date or cls.today,
+            'date': date or cls.today,
+            'invoice_line_ids': [(0, 0, {
+                'name': 'Test line',
+                'quantity': 1,
+                'price_unit': amount,
+                'tax_ids': [(6, 0, [])],
+            })],
+        })
+        if post:
+            move.action_post()
+        return move
+
+    @classmethod
+    def _create_entry(cls, lines, date=None, journal=None, post=True):
+        """ Create a journal entry from (account, partner, balance) tuples."""
+        move = cls.env['account.move'].create({
+            'move_type': 'entry',
+            'date': date or cls.today,
+            'journal_id': (journal or cls.company_data[
+                'default_journal_misc']).id,
+            'line_ids': [(0, 0, {
+                'name': 'Test entry',
+                'account_id': account.id,
+                'partner_id': partner and partner.id,
+                'debit': balance > 0 and balance or 0.0,
+                'credit': balance < 0 and -balance or 0.0,
+            }) for account, partner, balance in lines],
+        })
+        if post:
+            move.action_post()
+        return move
+
+    @classmethod
+    def _create_statement_line(cls, amount, partner=None, date=None):
+        """ Create a bank statement of a single line of ``amount``."""
+        statement = cls.env['account.bank.statement'].create({
+            'name': 'Test statement',
+            'date': date or cls.today,
+            'journal_id': cls.company_data['default_journal_bank'].id,
+            'line_ids': [(0, 0, {
+                'date': date or cls.today,
+                'payment_ref': 'Test payment',
+                'partner_id': partner and partner.id,
+                'amount': amount,
+            })],
+        })
+        return statement.line_ids
+
+    def _get_report_values(self, report_name, wizard_model, values):
+        """ Return the values of ``report_name`` printed from a wizard of
+        ``wizard_model`` created with ``values``, the way the print button
+        does it."""
+        wizard = self.env[wizard_model].create(values)
+        context = {
+            'active_model': wizard_model,
+            'active_ids': wizard.ids,
+            'active_id': wizard.id,
+        }
+        data = wizard.with_context(context).check_report()['data']
+        return self.env[report_name].with_context(
+            context)._get_report_values(wizard.ids, data=_client_data(data))
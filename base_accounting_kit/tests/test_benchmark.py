@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+""" Benchmark of the accounting dashboard and reports on a synthetic ledger.
+
+It is not part of the standard test run, start it with::
+
+    odoo-bin -d <db> -i base_accounting_kit --stop-after-init \\
+        --test-tags accounting_kit_benchmark
+
+The ledger size is set through the ``ACCOUNTING_KIT_BENCH_COMPANIES``,
+``_PARTNERS``, ``_ACCOUNTS``, ``_LINES`` and ``_YEARS`` environment
+variables, the number of runs per entry point through
+``ACCOUNTING_KIT_BENCH_RUNS``. The baseline is written as JSON to
+``ACCOUNTING_KIT_BENCH_OUTPUT``, by default in the temporary directory.
+"""
+
+import inspect
+import json
+import logging
+import os
+import tempfile
+from datetime import timedelta
+
+from odoo import fields
+from odoo.modules.module import load_information_from_description_file
+from odoo.tests import tagged
+
+from odoo.addons.base_accounting_kit.models.account_dashboard import DashBoard
+from odoo.addons.base_accounting_kit.models.account_dashboard_cache import \
+    dashboard_cache
+
+from .common import SyntheticLedgerCase, _client_data, _env_int
+
+_logger = logging.getLogger(__name__)
+
+BENCH_RUNS = _env_int('ACCOUNTING_KIT_BENCH_RUNS', 3)
+BENCH_OUTPUT = os.environ.get('ACCOUNTING_KIT_BENCH_OUTPUT') or os.path.join(
+    tempfile.gettempdir(), 'base_accounting_kit_benchmark.json')
+
+# arguments of the dashboard methods taking more than the posted flag
+DASHBOARD_ARGS = {
+    'get_top_10_customers_month': [('posted', 'this_month'),
+                                   ('posted', 'last_month')],
+    'get_top_customers': [(10, 'this_month', True), (50, 'this_year', True)],
+    'get_overdues_this_month_and_year': [('posted', 'this_month'),
+                                         ('posted', 'this_year')],
+    'get_latebillss': [('posted', 'this_month'), ('posted', 'this_year')],
+    'get_dashboard_payload': [({'posted': True},), ({'posted': False},)],
+}
+
+# (report model, wizard model, wizard values) of the printed reports
+REPORTS = [
+    ('report.base_accounting_kit.report_general_ledger',
+     'account.report.general.ledger',
+     {'initial_balance': True, 'sortby': 'sort_date',
+      'display_account': 'movement'}),
+    ('report.base_accounting_kit.report_bank_book',
+     'account.bank.book.report', {'initial_balance': True}),
+    ('report.base_accounting_kit.report_cash_book',
+     'account.cash.book.report', {'initial_balance': True}),
+    ('report.base_accounting_kit.day_book_report_template',
+     'account.day.book.report', {}),
+    ('report.base_accounting_kit.report_partnerledger',
+     'account.report.partner.ledger',
+     {'result_selection': 'customer_supplier', 'reconciled': True}),
+    ('report.base_accounting_kit.report_agedpartnerbalance',
+     'account.aged.trial.balance',
+     {'result_selection': 'customer_supplier', 'period_length': 30}),
+    ('report.base_accounting_kit.report_trial_balance',
+     'account.balance.report', {'display_account': 'movement'}),
+    ('report.base_accounting_kit.report_journal_audit',
+     'account.print.journal', {'sort_selection': 'move_name'}),
+    ('report.base_accounting_kit.report_tax', 'kit.account.tax.report', {}),
+    ('report.base_accounting_kit.report_cash_flow', 'cash.flow.report', {}),
+]
+
+# wizards of the books restricted to the liquidity accounts
+BOOK_WIZARDS = ['account.bank.book.report', 'account.cash.book.report']
+
+
+@tagged('post_install', '-at_install', '-standard', 'accounting_kit_benchmark')
+class TestAccountingKitBenchmark(SyntheticLedgerCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestAccountingKitBenchmark, cls).setUpClass()
+        cls.results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        baseline = {
+            'module_version': load_information_from_description_file(
+                'base_accounting_kit')['version'],
+            'created': fields.Datetime.to_string(fields.Datetime.now()),
+            'postgresql': cls.cr._cnx.server_version,
+            'runs': BENCH_RUNS,
+            'ledger': cls.ledger,
+            'results': cls.results,
+        }
+        with open(BENCH_OUTPUT, 'w') as output:
+            json.dump(baseline, output, indent=2, sort_keys=True)
+        _logger.info("Benchmark baseline written to %s", BENCH_OUTPUT)
+        super(TestAccountingKitBenchmark, cls).tearDownClass()
+
+    def _benchmark(self, name, args, func):
+        """ Run ``func`` ``BENCH_RUNS`` times on a cold dashboard cache and
+        keep the fastest run."""
+        runs = []
+        for dummy in range(BENCH_RUNS):
+            dashboard_cache.clear()
+            runs.append(self.measure(func)[1])
+        best = min(runs, key=lambda run: run['wall_time'])
+        self.results.append(dict(best, name=name, args=repr(args),
+                                 wall_times=[run['wall_time'] for run in runs]))
+        _logger.info("%s%r: %s queries, %.3fs, %s rows", name, args,
+                     best['queries'], best['wall_time'], best['rows_scanned'])
+
+    def test_dashboard(self):
+        dashboard = self.env['account.move'].with_context(
+            dashboard_company_ids=self.companies.ids)
+        methods = sorted(
+            name for name, member in vars(DashBoard).items()
+            if not name.startswith('_') and inspect.isfunction(member)
+            and name != 'init')
+        for name in methods:
+            method = getattr(dashboard, name)
+            if name in DASHBOARD_ARGS:
+                calls = DASHBOARD_ARGS[name]
+            elif 'post' in inspect.signature(getattr(DashBoard, name)).parameters:
+                calls = [('posted',), (False,)]
+            else:
+                calls = [()]
+            for args in calls:
+                self._benchmark('account.move.%s' % name, args,
+                                lambda: method(*args))
+
+    def _print_report(self, report_name, wizard_model, values):
+        """ Build the data of ``report_name`` through its wizard, the way
+        the print button does, and return a function rendering it."""
+        today = fields.Date.context_today(self.env['account.move'])
+        wizard_values = dict(values, **{
+            'date_from': today - timedelta(days=365),
+            'date_to': today,
+            'target_move': 'posted',
+            'journal_ids': [(6, 0, self.journals.filtered(
+                lambda journal: journal.company_id == self.env.company).ids)],
+        })
+        Wizard = self.env[wizard_model]
+        if wizard_model in BOOK_WIZARDS:
+            wizard_values['account_ids'] = [(6, 0, self.accounts.filtered(
+                lambda account: account.user_type_id == self.env.ref(
+                    'account.data_account_type_liquidity')).ids)]
+        if 'account_report_id' in Wizard._fields:
+            wizard_values['account_report_id'] = self.env.ref(
+                'base_accounting_kit.account_financial_report_cash_flow0').id
+        wizard = Wizard.create(wizard_values)
+        context = {
+            'active_model': wizard_model,
+            'active_ids': wizard.ids,
+            'active_id': wizard.id,
+        }
+        data = wizard.with_context(context).check_report()['data']
+        report = self.env[report_name].with_context(context)
+        return lambda: self._render_report(report, wizard,
+                                           _client_data(data))
+
+    def _render_report(self, report, wizard, data):
+        values = report._get_report_values(wizard.ids, data=data)
+        # the templates call back into the report for every journal
+        if 'sum_debit' in values:
+            for journal in values['docs']:
+                values['sum_debit'](values['data'], journal)
+                values['sum_credit'](values['data'], journal)
+                values['get_taxes'](values['data'], journal)
+        return values
+
+    def test_reports(self):
+        for report_name, wizard_model, values in REPORTS:
+            self._benchmark(report_name, values,
+                            self._print_report(report_name, wizard_model,
+                                               values))
+
+        invoices = self.env['account.move'].search(
+            [('move_type', '=', 'out_invoice'), ('name', '=like', 'BENCH/%')],
+            limit=20)
+        report = self.env['report.base_accounting_kit.report_multiple_invoice']
+        self._benchmark(report._name, invoices.ids,
+                        lambda: report._get_report_values(invoices.ids))
+
+        assets = self.env['asset.asset.report']
+        self._benchmark(assets._name, 'read_group', lambda: assets.read_group(
+            [], ['gross_value', 'depreciation_value', 'posted_value'],
+            ['asset_category_id', 'date:month'], lazy=False))
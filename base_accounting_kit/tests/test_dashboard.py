@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+from odoo.tests import tagged
+
+from odoo.addons.base_accounting_kit.models.account_dashboard_cache import \
+    _pending_versions, dashboard_cache
+
+from .common import AccountingKitTestCase
+
+
+@tagged('post_install', '-at_install')
+class TestDashboard(AccountingKitTestCase):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super(TestDashboard, cls).setUpClass(
+            chart_template_ref=chart_template_ref)
+        cls.company_ids = (cls.company.id, 0)
+        cls.dashboard = cls.env['account.move'].with_context(
+            dashboard_company_ids=cls.company_ids)
+
+    def setUp(self):
+        super(TestDashboard, self).setUp()
+        dashboard_cache.clear()
+
+    def _month_income_credit(self, payload):
+        return payload['month_income_this_month'][0]['credit']
+
+    def test_dashboard_payload(self):
+        payload = self.dashboard.get_dashboard_payload({'posted': True})
+        for key in ('month_income_this_month', 'get_currency',
+                    'get_total_invoice_current_month', 'bank_balance',
+                    'computed_at'):
+            self.assertIn(key, payload)
+
+    def test_dashboard_payload_cached(self):
+        # no ledger change of this transaction is waiting for a commit
+        _pending_versions.pop(self.env.cr, None)
+        first = self.dashboard.get_dashboard_payload({'posted': False})
+        self.assertTrue(any(key[1] == '_get_dashboard_tiles'
+                            for key in dashboard_cache._data))
+        second = self.dashboard.get_dashboard_payload({'posted': False})
+        self.assertEqual(self._month_income_credit(first),
+                         self._month_income_credit(second))
+
+    def test_dashboard_payload_after_posting(self):
+        before = self.dashboard.get_dashboard_payload({'posted': True})
+        self._create_invoice('out_invoice', 100.0)
+        after = self.dashboard.get_dashboard_payload({'posted': True})
+        self.assertAlmostEqual(self._month_income_credit(after),
+                               self._month_income_credit(before) + 100.0)
+
+    def test_dashboard_payload_refresh(self):
+        payload = self.dashboard.get_dashboard_payload(
+            {'posted': True, 'refresh': True})
+        self.assertIn('month_income_this_month', payload)
+        Snapshot = self.env['account.dashboard.snapshot']
+        snapshots = Snapshot.search([
+            ('company_key', '=', Snapshot._get_company_key(self.company_ids)),
+            ('posted', '=', True),
+        ])
+        self.assertEqual(len(snapshots), 1)
+
+    def test_prewarm_cron(self):
+        Snapshot = self.env['account.dashboard.snapshot']
+        Snapshot._cron_prewarm_dashboard()
+        company_key = Snapshot._get_company_key(self.company_ids)
+        snapshots = Snapshot.search([('company_key', '=', company_key)])
+        self.assertEqual(sorted(snapshots.mapped('posted')), [False, True])
+        versions = self.env['account.dashboard.ledger.version']._get_versions(
+            tuple(sorted(self.company_ids)))
+        payload = Snapshot._get_snapshot(self.company_ids, True, versions)
+        self.assertIsNotNone(payload)
+        self.assertIn('month_income_this_month', payload)
+
+    def test_prewarm_triggered(self):
+        cron = self.env.ref(
+            'base_accounting_kit.account_dashboard_prewarm_cron')
+        Trigger = self.env['ir.cron.trigger'].sudo()
+        for model in ('account.recurring.payments', 'account.asset.asset'):
+            count = Trigger.search_count([('cron_id', '=', cron.id)])
+            # the crons run as superuser
+            self.env[model].sudo()._cron_generate_entries()
+            self.assertEqual(
+                Trigger.search_count([('cron_id', '=', cron.id)]), count + 1)
+
+    def _get_rollup_totals(self, query):
+        self.env['account.dashboard.rollup']._flush_rollup_sources()
+        self.env.cr.execute(query, (self.company.id,))
+        return dict(((group, date, state), (debit, credit))
+                    for group, date, state, debit, credit in self.env.cr.fetchall()
+                    if debit or credit)
+
+    def _assert_rollup_matches_ledger(self):
+        rollup = self._get_rollup_totals("""
+            SELECT internal_group, date, parent_state,
+                   ROUND(SUM(debit)::numeric, 2), ROUND(SUM(credit)::numeric, 2)
+            FROM account_dashboard_rollup
+            WHERE company_id = %s
+            GROUP BY internal_group, date, parent_state
+        """)
+        ledger = self._get_rollup_totals("""
+            SELECT a.internal_group, l.date, l.parent_state,
+                   ROUND(SUM(l.debit), 2), ROUND(SUM(l.credit), 2)
+            FROM account_move_line l
+            JOIN account_account a ON a.id = l.account_id
+            WHERE l.company_id = %s
+            GROUP BY a.internal_group, l.date, l.parent_state
+        """)
+        self.assertEqual(rollup, ledger)
+
+    def test_rollup_follows_ledger(self):
+        invoice = self._create_invoice('out_invoice', 100.0)
+        bill = self._create_invoice('in_invoice', 40.0)
+        draft = self._create_invoice('out_invoice', 25.0, post=False)
+        self._assert_rollup_matches_ledger()
+
+        invoice.button_draft()
+        self._assert_rollup_matches_ledger()
+        invoice.write({'date': self.today.replace(day=1)})
+        invoice.action_post()
+        self._assert_rollup_matches_ledger()
+
+        bill.button_draft()
+        bill.button_cancel()
+        draft.unlink()
+        self._assert_rollup_matches_ledger()
+
+    def test_rollup_follows_account_type(self):
+        self._create_invoice('out_invoice', 100.0)
+        self.company_data['default_account_revenue'].user_type_id = \
+            self.env.ref('account.data_account_type_current_assets')
+        self._assert_rollup_matches_ledger()
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tests.common import new_test_user
+
+from ..models import payment_matching
+from ..models.payment_matching import _find_amount_combinations, \
+    _max_candidates
+from .common import AccountingKitTestCase
+
+
+@tagged('post_install', '-at_install')
+class TestReconcileJob(AccountingKitTestCase):
+
+    def test_job_user_is_requester(self):
+        accountant = new_test_user(
+            self.env, login='reconcile_job_accountant',
+            groups='account.group_account_user',
+            company_id=self.company.id, company_ids=[(6, 0, self.company.ids)])
+        Job = self.env['account.reconcile.job'].with_user(accountant)
+        job = Job.create({
+            'name': 'Test job',
+            'company_id': self.company.id,
+            'user_id': self.env.ref('base.user_admin').id,
+        })
+        self.assertEqual(job.user_id, accountant)
+        with self.assertRaises(UserError):
+            job.write({'user_id': self.env.ref('base.user_admin').id})
+
+
+@tagged('post_install', '-at_install')
+class TestAmountCombinations(AccountingKitTestCase):
+
+    def test_find_amount_combinations(self):
+        # the other amounts are whole units, only the four planted cents
+        # amounts reach the target's 15 cents
+        amounts = dict((index, 1000 * (index + 1)) for index in range(200))
+        planted = {10: 300001, 80: 200002, 150: 100004, 190: 50008}
+        amounts.update(planted)
+        target = sum(planted.values())
+        combinations = _find_amount_combinations(target, amounts, time_budget=10)
+        self.assertEqual(combinations[0], (0, sorted(planted)))
+        self.assertTrue(all(difference == 0 and sum(amounts[key] for key in keys) == target
+                            for difference, keys in combinations))
+
+    def test_find_amount_combinations_tolerance(self):
+        amounts = {1: 1000, 2: 2500, 3: 4000}
+        self.assertEqual(_find_amount_combinations(3490, amounts), [])
+        self.assertEqual(_find_amount_combinations(3490, amounts, tolerance=10), [(10, [1, 2])])
+
+    def test_statement_line_combinations(self):
+        invoices = [self._create_invoice('out_invoice', amount) for amount in (100.0, 250.0, 400.0)]
+        st_line = self._create_statement_line(500.0, partner=self.partner_a)
+        result = self.env['account.reconciliation.widget'].get_move_line_combinations_for_bank_statement_line(st_line.id)
+        receivables = (invoices[0] | invoices[2]).line_ids.filtered(
+            lambda line: line.account_id.internal_type == 'receivable')
+        self.assertFalse(result['truncated'])
+        combinations = result['combinations']
+        self.assertEqual(combinations[0]['difference'], 0)
+        self.assertEqual(sorted(line['id'] for line in combinations[0]['lines']), sorted(receivables.ids))
+
+    def test_statement_line_combinations_truncated(self):
+        self.assertEqual(_max_candidates(4), 199)
+        for amount in (100.0, 250.0, 400.0, 50.0):
+            self._create_invoice('out_invoice', amount)
+        Widget = self.env['account.reconciliation.widget']
+        # 7 halves: the empty one, and the 3 items and 3 pairs of the first 3 items
+        with patch.object(payment_matching, 'COMBINATION_MAX_HALVES', 7):
+            self.assertEqual(_max_candidates(4), 3)
+            # 100 + 400, among the first 3 items
+            st_line = self._create_statement_line(500.0, partner=self.partner_a)
+            result = Widget.get_move_line_combinations_for_bank_statement_line(st_line.id)
+            self.assertTrue(result['truncated'])
+            self.assertEqual(result['combinations'][0]['difference'], 0)
+            # 100 + 50, the last item being left out
+            st_line = self._create_statement_line(150.0, partner=self.partner_a)
+            result = Widget.get_move_line_combinations_for_bank_statement_line(st_line.id)
+            self.assertTrue(result['truncated'])
+            self.assertEqual(result['combinations'], [])
+
+
+@tagged('post_install', '-at_install')
+class TestComputeTaxesBatch(AccountingKitTestCase):
+
+    def test_compute_taxes_batch(self):
+        tax = self.company_data['default_tax_sale']
+        currency_id = self.company.currency_id.id
+        requests = [
+            {'tax_ids': tax.ids, 'amount': 100.0, 'currency_id': currency_id},
+            {'tax_ids': tax.ids, 'amount': 100.0, 'currency_id': currency_id, 'force_price_include': True},
+            {'tax_ids': tax.ids, 'amount': 100.0, 'currency_id': currency_id},
+        ]
+        results = self.env['account.reconciliation.widget'].compute_taxes_batch(requests)
+        expected = tax.json_friendly_compute_all(100.0, currency_id=currency_id)
+        expected_included = tax.with_context(force_price_include=True).json_friendly_compute_all(
+            100.0, currency_id=currency_id)
+        self.assertEqual(results, [expected, expected_included, expected])
+
+
+@tagged('post_install', '-at_install')
+class TestReconciliationWidget(AccountingKitTestCase):
+
+    def test_statement_line_data_deleted_line(self):
+        st_line = self._create_statement_line(100.0, partner=self.partner_a)
+        st_line_id = st_line.id
+        st_line.unlink()
+        self.assertEqual(self.env['account.reconciliation.widget'].get_bank_statement_line_data([st_line_id]), {
+            'lines': [],
+            'value_min': 0,
+            'value_max': 0,
+            'reconciled_aml_ids': [],
+        })
+
+    def test_move_lines_pages(self):
+        invoices = [self._create_invoice('out_invoice', amount)
+                    for amount in (100.0, 200.0, 300.0, 400.0, 500.0)]
+        st_line = self._create_statement_line(300.0, partner=self.partner_a)
+        Widget = self.env['account.reconciliation.widget']
+        expected = [line['id'] for line in Widget.get_move_lines_for_bank_statement_line(
+            st_line.id, excluded_ids=[], mode='rp')]
+        # the line of the statement line's amount comes first
+        self.assertEqual(expected[0], invoices[2].line_ids.filtered(
+            lambda line: line.account_id.internal_type == 'receivable').id)
+
+        page = Widget.get_move_lines_page_for_bank_statement_line(
+            st_line.id, excluded_ids=[], limit=2, mode='rp', with_count=True)
+        self.assertEqual(page['approximate_count'], len(expected))
+        first_token = page['next_token']
+        ids = []
+        while True:
+            self.assertLessEqual(len(page['lines']), 2)
+            ids += [line['id'] for line in page['lines']]
+            if not page['next_token']:
+                break
+            page = Widget.get_move_lines_page_for_bank_statement_line(
+                st_line.id, excluded_ids=[], limit=2, mode='rp', page_token=page['next_token'])
+        self.assertEqual(ids, expected)
+
+        other_line = self._create_statement_line(100.0, partner=self.partner_a)
+        with self.assertRaises(UserError):
+            Widget.get_move_lines_page_for_bank_statement_line(
+                other_line.id, excluded_ids=[], limit=2, mode='rp', page_token=first_token)
+
+    def _prepare_reconciliation(self, partner, amounts):
+        """ Return the receivable lines of an invoice of 100 and a payment
+        of 90 of ``partner``, and the process_move_lines data reconciling
+        them with a write-off of every amount of ``amounts`` on the same
+        journal, None writing off the whole residual."""
+        receivable = self.company_data['default_account_receivable']
+        invoice = self._create_invoice('out_invoice', 100.0, partner=partner)
+        payment = self._create_entry([
+            (receivable, partner, -90.0),
+            (self.company_data['default_account_assets'], partner, 90.0),
+        ])
+        lines = (invoice.line_ids | payment.line_ids).filtered(lambda line: line.account_id == receivable)
+        new_mv_line_dicts = []
+        for amount in amounts:
+            vals = {
+                'name': 'Write-off',
+                'account_id': self.company_data['default_account_expense'].id,
+                'journal_id': self.company_data['default_journal_misc'].id,
+            }
+            if amount is not None:
+                vals.update(debit=0.0, credit=amount)
+            new_mv_line_dicts.append(vals)
+        return lines, {
+            'type': 'partner',
+            'id': partner.id,
+            'mv_line_ids': lines.ids,
+            'new_mv_line_dicts': new_mv_line_dicts,
+        }
+
+    def _get_writeoff(self, lines):
+        """ Return the number of write-off entries reconciled with ``lines``
+        and their lines."""
+        moves = lines.full_reconcile_id.reconciled_line_ids.move_id - lines.move_id
+        return len(moves), sorted((line.account_id.id, line.partner_id.id, line.debit, line.credit)
+                                  for line in moves.line_ids)
+
+    def test_process_move_lines_batch(self):
+        Widget = self.env['account.reconciliation.widget']
+        expected = {}
+        for amounts in ((None,), (6.0, 4.0)):
+            lines, datum = self._prepare_reconciliation(self.partner_a, amounts)
+            Widget.process_move_lines([datum])
+            self.assertTrue(lines.full_reconcile_id)
+            expected[amounts] = self._get_writeoff(lines)
+        self.assertEqual(expected[(None,)][0], 1)
+        self.assertEqual(expected[(6.0, 4.0)][0], 2)
+
+        batch = [(partner, amounts) + self._prepare_reconciliation(partner, amounts)
+                 for partner in (self.partner_a, self.partner_b)
+                 for amounts in ((None,), (6.0, 4.0))]
+        results = Widget.process_move_lines([datum for dummy, dummy, dummy, datum in batch], batch=True)
+        for (partner, amounts, batch_lines, datum), result in zip(batch, results):
+            self.assertTrue(batch_lines.full_reconcile_id)
+            self.assertEqual(len(result['writeoff_line_ids']), len(amounts))
+            self.assertEqual(sorted(result['reconciled_line_ids']),
+                             sorted(batch_lines.ids + result['writeoff_line_ids']))
+            move_count, writeoff_lines = expected[amounts]
+            self.assertEqual(self._get_writeoff(batch_lines), (move_count, [
+                (account_id, partner.id, debit, credit)
+                for account_id, dummy, debit, credit in writeoff_lines]))
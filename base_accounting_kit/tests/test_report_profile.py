@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.base_accounting_kit.models.account_report_profile import \
+    PROFILE_SIZE_PARAM
+
+
+@tagged('post_install', '-at_install')
+class TestReportProfile(TransactionCase):
+
+    def setUp(self):
+        super(TestReportProfile, self).setUp()
+        # the calls are stored through their own cursor
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+
+    def test_ring_buffer_size(self):
+        self.env['ir.config_parameter'].sudo().set_param(PROFILE_SIZE_PARAM, 5)
+        Profile = self.env['account.report.profile']
+        for index in range(8):
+            Profile._store_call({
+                'entry_point': 'test.call_%s' % index,
+                'called_at': fields.Datetime.now(),
+                'total_time': float(index),
+            })
+        profiles = Profile.search([('entry_point', '=like', 'test.call_%')])
+        self.assertEqual(sorted(profiles.mapped('entry_point')),
+                         ['test.call_%s' % index for index in range(3, 8)])
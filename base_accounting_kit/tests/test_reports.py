@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+#############################################################################
+#
+#    Cybrosys Technologies Pvt. Ltd.
+#
+#    Copyright (C) 2019-TODAY Cybrosys Technologies(<https://www.cybrosys.com>)
+#    Author: Cybrosys Techno Solutions(<https://www.cybrosys.com>)
+#
+#    You can modify it under the terms of the GNU LESSER
+#    GENERAL PUBLIC LICENSE (LGPL v3), Version 3.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU LESSER GENERAL PUBLIC LICENSE (LGPL v3) for more details.
+#
+#    You should have received a copy of the GNU LESSER GENERAL PUBLIC LICENSE
+#    (LGPL v3) along with this program.
+#    If not, see <http://www.gnu.org/licenses/>.
+#
+#############################################################################
+
+import csv
+import hashlib
+import io
+from datetime import timedelta
+
+from odoo.tests import tagged
+
+from .common import AccountingKitTestCase
+
+
+@tagged('post_install', '-at_install')
+class TestReports(AccountingKitTestCase):
+    """ The reports rewritten to sum up in the database give the figures of
+    their former line by line computation on a small known ledger."""
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super(TestReports, cls).setUpClass(
+            chart_template_ref=chart_template_ref)
+        cls.revenue = cls.company_data['default_account_revenue']
+        cls.expense = cls.company_data['default_account_expense']
+        cls.receivable = cls.company_data['default_account_receivable']
+        cls.journals = cls.company_data['default_journal_misc'] \
+            | cls.company_data['default_journal_sale'] \
+            | cls.company_data['default_journal_purchase']
+        cls.date_from = cls.today - timedelta(days=20)
+
+    def _create_ledger_entries(self):
+        """ Create entries between the revenue and expense accounts: one
+        before the start date, two in the period and a draft one."""
+        for days, balance, post in ((30, 100.0, True), (10, 30.0, True),
+                                    (5, -10.0, True), (5, 1000.0, False)):
+            self._create_entry([(self.revenue, None, -balance),
+                                (self.expense, None, balance)],
+                               date=self.today - timedelta(days=days),
+                               post=post)
+
+    def _get_ledger_values(self, values):
+        return self._get_report_values(
+            'report.base_accounting_kit.report_general_ledger',
+            'account.report.general.ledger', dict({
+                'date_from': self.date_from,
+                'date_to': self.today,
+                'target_move': 'posted',
+                'journal_ids': [(6, 0, self.journals.ids)],
+                'initial_balance': True,
+                'sortby': 'sort_date',
+                'display_account': 'movement',
+            }, **values))
+
+    def test_general_ledger(self):
+        self._create_ledger_entries()
+        for sortby in ('sort_date', 'sort_journal_partner'):
+            values = self._get_ledger_values({'sortby': sortby})
+            accounts = dict((account['code'], account)
+                            for account in values['Accounts'])
+            self.assertEqual(sorted(accounts),
+                             sorted([self.revenue.code, self.expense.code]))
+            for account, sign in ((self.revenue, -1), (self.expense, 1)):
+                res = accounts[account.code]
+                self.assertEqual(
+                    [(line['lname'], line['debit'] - line['credit'],
+                      line['balance']) for line in res['move_lines']],
+                    [('Initial Balance', sign * 100.0, sign * 100.0),
+                     ('Test entry', sign * 30.0, sign * 130.0),
+                     ('Test entry', sign * -10.0, sign * 120.0)])
+                self.assertEqual(res['debit'] - res['credit'], sign * 120.0)
+                self.assertEqual(res['balance'], sign * 120.0)
+
+    def test_general_ledger_export(self):
+        self._create_ledger_entries()
+        wizard = self.env['account.report.general.ledger'].create({
+            'date_from': self.date_from,
+            'date_to': self.today,
+            'target_move': 'posted',
+            'journal_ids': [(6, 0, self.journals.ids)],
+            'initial_balance': True,
+            'sortby': 'sort_date',
+            'display_account': 'movement',
+        })
+        Attachment = self.env['ir.attachment']
+        first = Attachment.browse(int(
+            wizard.action_export_csv()['url'].split('/')[-1].split('?')[0]))
+        attachment = Attachment.browse(int(
+            wizard.action_export_csv()['url'].split('/')[-1].split('?')[0]))
+        # the wizard keeps its last export only
+        self.assertFalse(first.exists())
+        self.assertEqual((attachment.res_model, attachment.res_id),
+                         (wizard._name, wizard.id))
+        raw = attachment.raw
+        self.assertEqual(attachment.file_size, len(raw))
+        self.assertEqual(attachment.checksum, hashlib.sha1(raw).hexdigest())
+
+        rows = list(csv.reader(io.StringIO(raw.decode('utf-8'))))
+        self.assertEqual(rows[0][0], 'Account')
+        self.assertEqual(
+            [(row[1], row[6], float(row[7]), float(row[8]), float(row[9]))
+             for row in rows if row[0] == self.revenue.code],
+            [('', self.revenue.name, 10.0, 130.0, -120.0),
+             ('', 'Initial Balance', 0.0, 100.0, -100.0),
+             (str(self.today - timedelta(days=10)), 'Test entry', 0.0, 30.0,
+              -130.0),
+             (str(self.today - timedelta(days=5)), 'Test entry', 10.0, 0.0,
+              -120.0)])
+
+    def test_day_book(self):
+        self._create_ledger_entries()
+        values = self._get_report_values(
+            'report.base_accounting_kit.day_book_report_template',
+            'account.day.book.report', {
+                'date_from': self.date_from,
+                'date_to': self.today,
+                'target_move': 'posted',
+                'journal_ids': [(6, 0, self.journals.ids)],
+                'account_ids': [(6, 0, (self.revenue | self.expense).ids)],
+            })
+        self.assertEqual(
+            [(day['date'], day['debit'], day['credit'], day['balance'],
+              [(line['accname'], line['debit'], line['credit'])
+               for line in day['child_lines']])
+             for day in values['Accounts']],
+            [(self.today - timedelta(days=10), 30.0, 30.0, 0.0,
+              [(self.revenue.name, 0.0, 30.0),
+               (self.expense.name, 30.0, 0.0)]),
+             (self.today - timedelta(days=5), 10.0, 10.0, 0.0,
+              [(self.revenue.name, 10.0, 0.0),
+               (self.expense.name, 0.0, 10.0)])])
+
+    def test_partner_ledger(self):
+        invoice = self._create_invoice(
+            'out_invoice', 100.0, date=self.today - timedelta(days=10))
+        self._create_invoice('out_invoice', 50.0,
+                             date=self.today - timedelta(days=5))
+        self._create_invoice('in_invoice', 70.0,
+                             date=self.today - timedelta(days=4),
+                             partner=self.partner_b)
+        self._create_entry([
+            (self.receivable, self.partner_a, -30.0),
+            (self.company_data['default_account_assets'], None, 30.0),
+        ], date=self.today - timedelta(days=3))
+        values = self._get_report_values(
+            'report.base_accounting_kit.report_partnerledger',
+            'account.report.partner.ledger', {
+                'date_from': self.date_from,
+                'date_to': self.today,
+                'target_move': 'posted',
+                'journal_ids': [(6, 0, self.journals.ids)],
+                'result_selection': 'customer_supplier',
+                'reconciled': True,
+            })
+        self.assertEqual(values['docs'], [self.partner_a, self.partner_b])
+        lines = values['partner_lines']
+        self.assertEqual(
+            [(line['date'], line['debit'], line['credit'], line['progress'])
+             for line in lines[self.partner_a.id]],
+            [(self.today - timedelta(days=10), 100.0, 0.0, 100.0),
+             (self.today - timedelta(days=5), 50.0, 0.0, 150.0),
+             (self.today - timedelta(days=3), 0.0, 30.0, 120.0)])
+        self.assertTrue(lines[self.partner_a.id][0]['displayed_name']
+                        .startswith(invoice.name))
+        self.assertEqual(
+            [(line['date'], line['debit'], line['credit'], line['progress'])
+             for line in lines[self.partner_b.id]],
+            [(self.today - timedelta(days=4), 0.0, 70.0, -70.0)])
+        self.assertEqual(values['partner_totals'], {
+            self.partner_a.id: {'debit': 150.0, 'credit': 30.0,
+                                'debit - credit': 120.0},
+            self.partner_b.id: {'debit': 0.0, 'credit': 70.0,
+                                'debit - credit': -70.0},
+        })
+
+    def test_aged_partner_balance(self):
+        for amount, days in ((100.0, 0), (200.0, 45), (300.0, 200)):
+            self._create_invoice('out_invoice', amount,
+                                 date=self.today - timedelta(days=days))
+        self._create_entry([
+            (self.receivable, self.partner_a, -50.0),
+            (self.company_data['default_account_assets'], None, 50.0),
+        ], date=self.today - timedelta(days=5))
+        # paid before the report date, out of the report
+        invoice = self._create_invoice('out_invoice', 80.0,
+                                       date=self.today - timedelta(days=20))
+        payment = self._create_entry([
+            (self.receivable, self.partner_a, -80.0),
+            (self.company_data['default_account_assets'], None, 80.0),
+        ], date=self.today - timedelta(days=15))
+        (invoice.line_ids | payment.line_ids).filtered(
+            lambda line: line.account_id == self.receivable).reconcile()
+        self._create_invoice('in_invoice', 70.0,
+                             date=self.today - timedelta(days=10),
+                             partner=self.partner_b)
+
+        values = self._get_report_values(
+            'report.base_accounting_kit.report_agedpartnerbalance',
+            'account.aged.trial.balance', {
+                'date_from': self.today,
+                'target_move': 'posted',
+                'journal_ids': [(6, 0, self.journals.ids)],
+                'result_selection': 'customer_supplier',
+                'period_length': 30,
+            })
+        keys = ['direction', '4', '3', '2', '1', '0', 'total']
+        self.assertEqual(
+            [[partner['partner_id']] + [partner[key] for key in keys]
+             for partner in values['get_partner_lines']],
+            [[self.partner_a.id, 100.0, -50.0, 200.0, 0.0, 0.0, 300.0, 550.0],
+             [self.partner_b.id, 0.0, -70.0, 0.0, 0.0, 0.0, 0.0, -70.0]])
+        self.assertEqual(values['get_direction'],
+                         [300.0, 0.0, 0.0, 200.0, -120.0, 480.0, 100.0])
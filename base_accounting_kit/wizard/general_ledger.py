@@ -50,6 +50,33 @@ class AccountReportGeneralLedger(models.TransientModel):
                 'date_from'):
             raise UserError(_("You must define a Start Date"))
         records = self.env[data['model']].browse(data.get('ids', []))
+        export_format = self.env.context.get('general_ledger_export')
+        if export_format:
+            return self._export_report(data, records, export_format)
         return self.env.ref(
             'base_accounting_kit.action_report_general_ledger').with_context(
             landscape=True).report_action(records, data=data)
+
+    def action_export_csv(self):
+        return self.with_context(general_ledger_export='csv').check_report()
+
+    def action_export_xlsx(self):
+        return self.with_context(general_ledger_export='xlsx').check_report()
+
+    def _export_report(self, data, records, export_format):
+        """ Export the ledger the report would print, with the same accounts
+        and filters, and download it."""
+        accounts = records if data['model'] == 'account.account' else \
+            self.env['account.account'].search([])
+        report = self.env[
+            'report.base_accounting_kit.report_general_ledger'].with_context(
+            data['form'].get('used_context', {}))
+        attachment = report._export_general_ledger(
+            accounts, data['form'].get('initial_balance', True),
+            data['form'].get('sortby', 'sort_date'),
+            data['form']['display_account'], export_format, self)
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % attachment.id,
+            'target': 'self',
+        }